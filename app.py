@@ -4,6 +4,7 @@ from settings import *
 from startMenu import StartMenu
 from data.gamesDatabase import GamesDatabaseManager
 from data.database import DatabaseManager
+from utils.simulationService import SimulationService
 import sys, signal, logging, os, glob, shutil
 from CTkMessagebox import CTkMessagebox
 from datetime import datetime
@@ -155,6 +156,9 @@ class FootballManager(ctk.CTk):
             else:
                 db.discard_copy()
 
+        # Stop the simulation workers
+        SimulationService().shutdown()
+
         # Finally, quit the app
         self.quit()
         
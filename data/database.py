@@ -1,14 +1,17 @@
-import re, datetime, os, shutil, time, gc, logging, copy, pickle, uuid, json, random
+import re, datetime, os, shutil, time, gc, logging, copy, pickle, uuid, json, random, threading
 from sqlalchemy import Column, Integer, String, BLOB, ForeignKey, Boolean, insert, or_, and_, Float, DateTime, Date, extract
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, func, or_, case
+from sqlalchemy import create_engine, func, or_, case, select, inspect, update, bindparam
 from sqlalchemy.orm import sessionmaker, aliased, scoped_session
 from sqlalchemy.types import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
+from contextlib import contextmanager
 from faker import Faker
 from settings import *
 from utils.util_functions import *
+from utils.playerSimState import PlayerSimState
+from utils.playerConditionStore import PlayerConditionStore
 
 Base = declarative_base()
 
@@ -19,14 +22,38 @@ progressLabel = None
 progressFrame = None
 percentageLabel = None
 
-with open("data/models/first_name_generator.pkl", "rb") as f:
-    first_gen = pickle.load(f)
+_name_generators = None
+_name_generators_lock = threading.Lock()
 
-with open("data/models/last_name_generator.pkl", "rb") as f:
-    last_gen = pickle.load(f)
+def get_name_generators():
+    """
+    Get the first and last name generator models. They are only needed when people are created (players, youths,
+    managers, referees), so they are loaded the first time they are asked for instead of when the module is
+    imported, then kept.
+    """
+
+    global _name_generators
+
+    with _name_generators_lock:
+        if _name_generators is None:
+            with open("data/models/first_name_generator.pkl", "rb") as f:
+                first_gen = pickle.load(f)
+
+            with open("data/models/last_name_generator.pkl", "rb") as f:
+                last_gen = pickle.load(f)
+
+            _name_generators = (first_gen, last_gen)
+
+    return _name_generators
 
 def _wrapped_commit(session, db_manager):
-    if not db_manager.copy_active:
+    if db_manager.unit_session is session:
+        # inside a unit of work: send the changes but leave the commit to the unit
+        session.flush()
+        session.expire_all()
+        return
+
+    if not db_manager.copy_active and not db_manager.read_only:
         db_manager.start_copy()
 
         # Rebind and migrate
@@ -38,6 +65,19 @@ def _wrapped_commit(session, db_manager):
 
     return session._real_commit()
 
+def _wrapped_close(session, db_manager):
+    if db_manager.unit_session is session:
+        return # kept open until the unit of work ends
+
+    return session._real_close()
+
+def _wrapped_rollback(session, db_manager):
+    if db_manager.unit_session is session:
+        # everything done so far in the unit is undone, so nothing of it can be committed anymore
+        db_manager.unit_failed = True
+
+    return session._real_rollback()
+
 class DatabaseManager:
     _instance = None
 
@@ -51,6 +91,9 @@ class DatabaseManager:
             cls._instance.original_path = None
             cls._instance.copy_path = None
             cls._instance.copy_active = False
+            cls._instance.read_only = False
+            cls._instance.unit_session = None
+            cls._instance.unit_failed = False
 
             # game db paths
             cls._instance.game_original = "data/games.db"
@@ -63,6 +106,69 @@ class DatabaseManager:
         self.copy_path = f"data/{database_name}_copy.db"
         self._connect(self.original_path, create_tables)
 
+    def missing_tables(self):
+        """
+        Get the tables a save made before the player totals, team streaks and teams of the week were added is missing,
+        or has without all of their current columns (see migrate). Only reads the schema, so it is cheap enough to call
+        whenever a save is loaded.
+        """
+
+        inspector = inspect(self.engine)
+        tables = inspector.get_table_names()
+
+        missing = []
+        for table in (PlayerCompetitionTotals.__table__, TeamStreaks.__table__, TeamsOfTheWeek.__table__):
+            if table.name not in tables or {column.name for column in table.columns} - {column["name"] for column in inspector.get_columns(table.name)}:
+                missing.append(table)
+
+        return missing
+
+    def migrate(self, progress_callback = None):
+        """
+        Add the tables missing from an older save, or outdated in it (see missing_tables), rebuilding the player totals and team streaks
+        from its matches. This goes through every match event and lineup, so it is only done when the save is actually
+        loaded, not when it is previewed.
+
+        Args:
+            progress_callback (function, optional): Called with (done, total) after each table. Defaults to None.
+        """
+
+        missing = self.missing_tables()
+        for done, table in enumerate(missing, start = 1):
+            if table is PlayerCompetitionTotals.__table__:
+                self.rebuild_player_totals()
+            elif table is TeamStreaks.__table__:
+                self.rebuild_team_streaks()
+            else:
+                # the teams of the week are filled again as matchdays are completed
+                table.drop(bind = self.engine, checkfirst = True)
+                table.create(bind = self.engine)
+
+            if progress_callback:
+                progress_callback(done, len(missing))
+
+    def rebuild_player_totals(self):
+        """
+        Create the player competition totals table again (so an older save gets the current columns), and fill it
+        from the match events and lineups. This is derived data, so it is written straight to the save file (not the
+        working copy) in its own transaction.
+        """
+
+        with self.engine.begin() as connection:
+            PlayerCompetitionTotals.__table__.drop(bind = connection, checkfirst = True)
+            PlayerCompetitionTotals.__table__.create(bind = connection)
+            PlayerCompetitionTotals.rebuild(connection)
+
+    def rebuild_team_streaks(self):
+        """
+        Create the team streaks table again and fill it from the played matches (see rebuild_player_totals).
+        """
+
+        with self.engine.begin() as connection:
+            TeamStreaks.__table__.drop(bind = connection, checkfirst = True)
+            TeamStreaks.__table__.create(bind = connection)
+            TeamStreaks.rebuild(connection)
+
     def _connect(self, db_path, create_tables = False):
         DATABASE_URL = f"sqlite:///{db_path}"
         self.engine = create_engine(DATABASE_URL, connect_args = {"check_same_thread": False})
@@ -72,10 +178,34 @@ class DatabaseManager:
         if create_tables:
             Base.metadata.create_all(bind = self.engine)
 
+    def set_read_only(self, db_path):
+        """
+        Open a database file read-only, without copying it (e.g. the save read by the simulation workers). Any number
+        of read-only connections can read the file at the same time, and nothing can be written through them.
+
+        Args:
+            db_path (str): The path of the database file.
+        """
+
+        self.original_path = db_path
+        self.copy_path = None
+        self.copy_active = False
+        self.read_only = True
+
+        DATABASE_URL = f"sqlite:///file:{db_path}?mode=ro&uri=true"
+        self.engine = create_engine(DATABASE_URL, connect_args = {"check_same_thread": False})
+        self.session_factory = sessionmaker(autocommit = False, autoflush = False, bind = self.engine)
+        self.scoped_session = scoped_session(self.session_factory)
+
+    def current_path(self):
+        """Get the path of the database file the connections currently use (the working copy if there is one)."""
+
+        return self.copy_path if self.copy_active else self.original_path
+
     def start_copy(self):
         """Create working copies of BOTH player DB and games DB, then switch connections to player copy."""
 
-        if self.copy_active:
+        if self.copy_active or self.read_only:
             return
 
         shutil.copy(self.original_path, self.copy_path)
@@ -149,9 +279,47 @@ class DatabaseManager:
         if not hasattr(session, "_real_commit"):
             session._real_commit = session.commit
             session.commit = lambda: _wrapped_commit(session, self)
+            session._real_close = session.close
+            session.close = lambda: _wrapped_close(session, self)
+            session._real_rollback = session.rollback
+            session.rollback = lambda: _wrapped_rollback(session, self)
 
         return session
 
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run several database calls as one transaction. The calls made in the block (in this thread) share the same
+        session as usual, but their commits only flush and their closes are ignored, so everything is committed once
+        at the end of the block, or rolled back together if anything fails. Nested units are part of the outer one.
+        """
+
+        if self.unit_session is not None:
+            yield self.unit_session
+            return
+
+        self.start_copy() # before any change, as starting the copy switches the connection
+        session = self.get_session()
+        self.unit_session = session
+        self.unit_failed = False
+
+        try:
+            yield session
+
+            if self.unit_failed:
+                raise RuntimeError("A call in the unit of work was rolled back")
+
+            self.unit_session = None
+            session.commit()
+        except Exception:
+            self.unit_session = None
+            session.rollback()
+            raise
+        finally:
+            self.unit_session = None
+            self.unit_failed = False
+            session.close()
+
     def has_unsaved_changes(self):
          return os.path.exists(self.copy_path) or os.path.exists(self.game_copy)
 
@@ -173,6 +341,7 @@ class Managers(Base):
 
     @classmethod
     def add_managers(cls, first_name, last_name, nationality, date_of_birth, chosenTeam, loadedLeagues):
+        first_gen, last_gen = get_name_generators()
         session = DatabaseManager().get_session()
         try:
 
@@ -568,6 +737,7 @@ class Players(Base):
 
     @classmethod
     def create_youth_player(cls, team_id, position, required_code, flags, numbers, league_planet, depth, team_strength, attributes_dict):
+        first_gen, last_gen = get_name_generators()
 
         if random.random() < 0.8:
             planet = league_planet
@@ -644,6 +814,7 @@ class Players(Base):
 
     @classmethod
     def add_players(cls, flags):
+        first_gen, last_gen = get_name_generators()
         session = DatabaseManager().get_session()
         teams = Teams.get_all_teams()
 
@@ -1132,6 +1303,79 @@ class Players(Base):
         finally:
             session.close()
 
+    @classmethod
+    def get_conditions_by_teams(cls, team_ids, youths = True):
+        """
+        Get the (id, team id, fitness, sharpness, morale) rows of the players of several teams in one query, for
+        PlayerConditionStore.
+
+        Args:
+            team_ids (list): The IDs of the teams.
+            youths (bool, optional): Include the youth team players. Defaults to True.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            query = session.query(Players.id, Players.team_id, Players.fitness, Players.sharpness, Players.morale).filter(Players.team_id.in_(team_ids))
+
+            if not youths:
+                query = query.filter(Players.player_role != 'Youth Team')
+
+            return query.all()
+        finally:
+            session.close()
+
+    @classmethod
+    def batch_update_conditions(cls, conditions):
+        """
+        Write the fitness, sharpness and morale of a set of players with one executemany UPDATE.
+
+        Args:
+            conditions (list): {"player_id", "fitness", "sharpness", "morale"} dicts.
+        """
+
+        # the statement runs before the commit, so the working copy has to be made first (see _wrapped_commit)
+        DatabaseManager().start_copy()
+
+        session = DatabaseManager().get_session()
+        try:
+            session.execute(update(Players.__table__).where(Players.__table__.c.id == bindparam("player_id")), conditions)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("[DB ERROR] Batch update of player conditions failed")
+            raise e
+        finally:
+            session.close()
+
+    @classmethod
+    def get_sim_states_by_team(cls, team_id):
+        """
+        Get match engine snapshots of all the players of a team (youths included), in the same order as
+        get_all_players_by_team. Only the columns the engine reads are loaded.
+
+        Args:
+            team_id (str): The ID of the team.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            position_order = case(
+                [
+                    (Players.position == 'goalkeeper', 1),
+                    (Players.position == 'defender', 2),
+                    (Players.position == 'midfielder', 3),
+                    (Players.position == 'forward', 4),
+                ],
+                else_ = 5
+            )
+
+            columns = [getattr(Players, column) for column in PlayerSimState.COLUMNS]
+            rows = session.query(*columns).filter(Players.team_id == team_id).order_by(position_order).all()
+            return [PlayerSimState(*row) for row in rows]
+        finally:
+            session.close()
+
     @classmethod
     def get_all_star_players(cls, team_id):
         session = DatabaseManager().get_session()
@@ -1282,58 +1526,9 @@ class Players(Base):
 
     @classmethod
     def update_sharpness_and_fitness(cls, time_in_between, team_id):
-        session = DatabaseManager().get_session()
-        try:
-            # Players eligible for fitness updates (exclude injury bans)
-            fitness_players = (
-                session.query(Players)
-                .outerjoin(
-                    PlayerBans,
-                    and_(
-                        PlayerBans.player_id == Players.id,
-                        PlayerBans.ban_type == 'injury'
-                    )
-                )
-                .filter(PlayerBans.id.is_(None))
-                .filter(Players.team_id == team_id)
-                .all()
-            )
-
-            # All players from this team
-            all_players = (
-                session.query(Players)
-                .filter(Players.team_id == team_id)
-                .all()
-            )
-            fitness_ids = {p.id for p in fitness_players}
-
-            hours = int(time_in_between.total_seconds() // 3600)
-
-            if hours > 0:
-                hourly_rate = DAILY_SHARPNESS_DECAY / 24.0
-
-                for player in all_players:
-                    # sharpness exponential decay
-                    decay_factor = (1 - hourly_rate) ** hours
-                    player.sharpness *= decay_factor
-
-                    # clamp and round sharpness
-                    if player.sharpness < MIN_SHARPNESS:
-                        player.sharpness = MIN_SHARPNESS
-                    player.sharpness = int(round(player.sharpness))
-
-                    # fitness recovery only for non-injured players
-                    if player.id in fitness_ids:
-                        recovery_factor = (1 - DAILY_FITNESS_RECOVERY_RATE) ** hours
-                        new_fitness = 100 - (100 - player.fitness) * recovery_factor
-                        player.fitness = int(math.ceil(min(100, new_fitness)))
-
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        store = PlayerConditionStore.fromTeams([team_id])
+        store.rest([team_id], time_in_between)
+        store.save()
 
     @classmethod
     def update_sharpness_and_fitness_with_values(cls, team_id, fitness_value, sharpness_value):
@@ -1627,6 +1822,27 @@ class Matches(Base):
         finally:
             session.close()
         
+    @classmethod
+    def get_dates_by_ids(cls, match_ids):
+        """
+        Get the dates of several matches in one query.
+
+        Args:
+            match_ids (iterable): The IDs of the matches.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            match_ids = list(set(match_ids))
+            dates = {}
+            for i in range(0, len(match_ids), 500):
+                rows = session.query(Matches.id, Matches.date).filter(Matches.id.in_(match_ids[i:i + 500])).all()
+                dates.update({match_id: date for match_id, date in rows})
+
+            return dates
+        finally:
+            session.close()
+
     @classmethod
     def get_match_by_teams(cls, home_id, away_id):
         session = DatabaseManager().get_session()
@@ -1974,6 +2190,18 @@ class Matches(Base):
         finally:
             session.close()
 
+    @classmethod
+    def get_fixtures_in_range(cls, start_date, end_date):
+        session = DatabaseManager().get_session()
+        try:
+            fixtures = session.query(Matches.home_id, Matches.away_id, Matches.date).filter(
+                Matches.date >= start_date,
+                Matches.date <= end_date
+            ).order_by(Matches.date.asc()).all()
+            return fixtures
+        finally:
+            session.close()
+
     @classmethod
     def get_team_match_no_time(cls, team_id, date):
         session = DatabaseManager().get_session()
@@ -1988,41 +2216,11 @@ class Matches(Base):
 
     @classmethod
     def get_team_winless_streak(cls, team_id, league_id):
-        session = DatabaseManager().get_session()
-        try:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team_id, league_id)
-            current_streak = 0
-            for match in matches:
-                if match.score_home == match.score_away:
-                    current_streak += 1
-                elif match.home_id == team_id and match.score_home < match.score_away:
-                    current_streak += 1
-                elif match.away_id == team_id and match.score_away < match.score_home:
-                    current_streak += 1
-                else:
-                    break
-            return current_streak
-        finally:
-            session.close()
-    
+        return TeamStreaks.get_streak(team_id, league_id, "current_winless")
+
     @classmethod
     def get_team_unbeaten_streak(cls, team_id, league_id):
-        session = DatabaseManager().get_session()
-        try:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team_id, league_id)
-            current_streak = 0
-            for match in matches:
-                if match.score_home == match.score_away:
-                    current_streak += 1
-                elif match.home_id == team_id and match.score_home > match.score_away:
-                    current_streak += 1
-                elif match.away_id == team_id and match.score_away > match.score_home:
-                    current_streak += 1
-                else:
-                    break
-            return current_streak
-        finally:
-            session.close()
+        return TeamStreaks.get_streak(team_id, league_id, "current_unbeaten")
 
 class LinkedMatches(Base):
     __tablename__ = 'linked_matches'
@@ -2158,47 +2356,15 @@ class TeamLineup(Base):
 
     @classmethod
     def get_number_matches_by_player(cls, player_id, league_id):
-        session = DatabaseManager().get_session()
-        try:
-            matches = session.query(TeamLineup).join(Matches).filter(
-                TeamLineup.player_id == player_id,
-                Matches.league_id == league_id,
-                TeamLineup.rating.isnot(None)
-            ).count()
-            return matches
-        finally:
-            session.close()
+        return PlayerCompetitionTotals.get_total(player_id, "appearances", league_id)
 
     @classmethod
     def get_number_matches_by_player_all_comps(cls, player_id):
-        session = DatabaseManager().get_session()
-        try:
-            matches = session.query(TeamLineup).filter(
-                TeamLineup.player_id == player_id,
-                TeamLineup.rating.isnot(None)
-            ).count()
-            return matches
-        finally:
-            session.close()
+        return PlayerCompetitionTotals.get_total(player_id, "appearances")
 
     @classmethod
     def get_player_average_rating(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                rating = session.query(func.avg(TeamLineup.rating)).join(Matches).filter(
-                    TeamLineup.player_id == player_id,
-                    Matches.league_id == comp,
-                    TeamLineup.rating.isnot(None)
-                ).scalar()
-            else:
-                rating = session.query(func.avg(TeamLineup.rating)).filter(
-                    TeamLineup.player_id == player_id,
-                    TeamLineup.rating.isnot(None)
-                ).scalar()
-            return rating if rating else "N/A"
-        finally:
-            session.close()
+        return PlayerCompetitionTotals.get_average_rating(player_id, comp)
 
     @classmethod
     def get_player_rating(cls, player_id, match_id):
@@ -2487,23 +2653,8 @@ class MatchEvents(Base):
 
     @classmethod
     def get_goals_and_pens_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                goals = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    Matches.league_id == comp,
-                    or_(MatchEvents.event_type == "goal", MatchEvents.event_type == "penalty_goal")
-                ).count()
-            else:
-                goals = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    or_(MatchEvents.event_type == "goal", MatchEvents.event_type == "penalty_goal")
-                ).count()
-            return goals
-        finally:
-            session.close()
-        
+        return PlayerCompetitionTotals.get_total(player_id, "goals", comp)
+
     @classmethod
     def get_events_by_match_and_player(cls, match_id, player_id):
         session = DatabaseManager().get_session()
@@ -2544,23 +2695,8 @@ class MatchEvents(Base):
         
     @classmethod
     def get_assists_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                assists = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "assist",
-                    Matches.league_id == comp
-                ).count()
-            else:
-                assists = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "assist"
-                ).count()
-            return assists
-        finally:
-            session.close()
-    
+        return PlayerCompetitionTotals.get_total(player_id, "assists", comp)
+
     @classmethod
     def get_all_assists(cls, league_id):
         session = DatabaseManager().get_session()
@@ -2592,32 +2728,13 @@ class MatchEvents(Base):
 
     @classmethod
     def get_yellow_cards_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                yellow_cards = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "yellow_card",
-                    Matches.league_id == comp
-                ).count()
-            else:
-                yellow_cards = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "yellow_card"
-                ).count()
-            return yellow_cards
-        finally:
-            session.close()
+        return PlayerCompetitionTotals.get_total(player_id, "yellow_cards", comp)
 
     @classmethod
     def check_yellow_card_ban(cls, player_id, comp_id, ban_threshold, currDate):
         session = DatabaseManager().get_session()
         try:
-            yellow_cards = session.query(MatchEvents).join(Matches).filter(
-                MatchEvents.player_id == player_id,
-                MatchEvents.event_type == "yellow_card",
-                Matches.league_id == comp_id
-            ).count()
+            yellow_cards = PlayerCompetitionTotals.get_total(player_id, "yellow_cards", comp_id)
 
             yellow_cards += 1
 
@@ -2664,23 +2781,8 @@ class MatchEvents(Base):
 
     @classmethod
     def get_red_cards_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                red_cards = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "red_card",
-                    Matches.league_id == comp
-                ).count()
-            else:
-                red_cards = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "red_card"
-                ).count()
-            return red_cards
-        finally:
-            session.close()
-        
+        return PlayerCompetitionTotals.get_total(player_id, "red_cards", comp)
+
     @classmethod
     def get_all_red_cards(cls, league_id):
         session = DatabaseManager().get_session()
@@ -2796,23 +2898,8 @@ class MatchEvents(Base):
         
     @classmethod
     def get_penalty_saves_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                penalty_saves = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "penalty_saved",
-                    Matches.league_id == comp
-                ).count()
-            else:
-                penalty_saves = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "penalty_saved"
-                ).count()
-            return penalty_saves
-        finally:
-            session.close()
-        
+        return PlayerCompetitionTotals.get_total(player_id, "penalty_saves", comp)
+
     @classmethod
     def get_all_penalty_saves(cls, league_id):
         session = DatabaseManager().get_session()
@@ -2844,23 +2931,8 @@ class MatchEvents(Base):
 
     @classmethod
     def get_clean_sheets_by_player(cls, player_id, comp = None):
-        session = DatabaseManager().get_session()
-        try:
-            if comp:
-                clean_sheets = session.query(MatchEvents).join(Matches).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "clean_sheet",
-                    Matches.league_id == comp
-                ).count()
-            else:
-                clean_sheets = session.query(MatchEvents).filter(
-                    MatchEvents.player_id == player_id,
-                    MatchEvents.event_type == "clean_sheet"
-                ).count()
-            return clean_sheets
-        finally:
-            session.close()
-    
+        return PlayerCompetitionTotals.get_total(player_id, "clean_sheets", comp)
+
     @classmethod
     def get_all_clean_sheets(cls, league_id):
         session = DatabaseManager().get_session()
@@ -2960,67 +3032,80 @@ class MatchEvents(Base):
         finally:
             session.close()
 
+    # The events that start or end a player's time on the pitch (see game_time)
+    GAME_TIME_EVENTS = ("sub_on", "sub_off", "red_card", "injury")
+
     @classmethod
-    def get_player_game_time(cls, player_id, match_id):
-        session = DatabaseManager().get_session()
-        try:
+    def game_time(cls, times):
+        """
+        Work out the minutes a player who played in a match was on the pitch.
 
-            if TeamLineup.check_player_benched(player_id, match_id):
-                return 0
+        Args:
+            times (dict): The minute of each of the player's GAME_TIME_EVENTS in the match (event type -> minute).
+        """
 
-            sub_on_event = session.query(MatchEvents).filter(
-                MatchEvents.player_id == player_id,
-                MatchEvents.match_id == match_id,
-                MatchEvents.event_type == "sub_on"
-            ).first()
+        subOnTime = times.get("sub_on")
+        subOffTime = times.get("sub_off")
+        redCardTime = times.get("red_card")
+        injuryTime = times.get("injury")
+
+        if not redCardTime and not injuryTime:
+            if subOnTime and subOffTime:
+                game_time = subOffTime - subOnTime
+            elif subOnTime:
+                game_time = 90 - subOnTime
+            elif subOffTime:
+                game_time = subOffTime
+            else:
+                game_time = 90
+        elif redCardTime and not injuryTime:
+            if subOnTime:
+                game_time = redCardTime - subOnTime
+            else:
+                game_time = redCardTime
+        else:
+            if subOnTime:
+                game_time = injuryTime - subOnTime
+            else:
+                game_time = injuryTime
 
-            sub_off_event = session.query(MatchEvents).filter(
-                MatchEvents.player_id == player_id,
-                MatchEvents.match_id == match_id,
-                MatchEvents.event_type == "sub_off"
-            ).first()
+        return game_time
 
-            red_card_event = session.query(MatchEvents).filter(
-                MatchEvents.player_id == player_id,
-                MatchEvents.match_id == match_id,
-                MatchEvents.event_type == "red_card"
-            ).first()
+    @classmethod
+    def get_game_times(cls, player_id, match_ids):
+        """
+        Get the minutes a player was on the pitch in several matches, with one query for the lineups and one for the
+        events (0 for a match the player did not play in).
 
-            injury_event = session.query(MatchEvents).filter(
-                MatchEvents.player_id == player_id,
-                MatchEvents.match_id == match_id,
-                MatchEvents.event_type == "injury"
-            ).first()
+        Args:
+            player_id (str): The ID of the player.
+            match_ids (list): The IDs of the matches.
+        """
 
-            subOnTime = parse_time(sub_on_event.time) if sub_on_event else None
-            subOffTime = parse_time(sub_off_event.time) if sub_off_event else None
-            redCardTime = parse_time(red_card_event.time) if red_card_event else None
-            injuryTime = parse_time(injury_event.time) if injury_event else None
-
-            if not redCardTime and not injuryTime:
-                if subOnTime and subOffTime:
-                    game_time = subOffTime - subOnTime
-                elif subOnTime:
-                    game_time = 90 - subOnTime
-                elif subOffTime:
-                    game_time = subOffTime
-                else:
-                    game_time = 90
-            elif redCardTime and not injuryTime:
-                if subOnTime:
-                    game_time = redCardTime - subOnTime
-                else:
-                    game_time = redCardTime
-            else:
-                if subOnTime:
-                    game_time = injuryTime - subOnTime
-                else:
-                    game_time = injuryTime
+        session = DatabaseManager().get_session()
+        try:
+            played = {match_id for match_id, in session.query(TeamLineup.match_id).filter(
+                TeamLineup.player_id == player_id,
+                TeamLineup.match_id.in_(match_ids),
+                TeamLineup.reason == None
+            ).all()}
 
-            return game_time
+            times = defaultdict(dict)
+            for match_id, event_type, time in session.query(MatchEvents.match_id, MatchEvents.event_type, MatchEvents.time).filter(
+                MatchEvents.player_id == player_id,
+                MatchEvents.match_id.in_(list(played)),
+                MatchEvents.event_type.in_(cls.GAME_TIME_EVENTS)
+            ).all():
+                times[match_id].setdefault(event_type, parse_time(time))
+
+            return {match_id: cls.game_time(times[match_id]) if match_id in played else 0 for match_id in match_ids}
         finally:
             session.close()
 
+    @classmethod
+    def get_player_game_time(cls, player_id, match_id):
+        return cls.get_game_times(player_id, [match_id])[match_id]
+
 class MatchStats(Base):
     __tablename__ = 'match_stats'
 
@@ -3600,6 +3685,239 @@ class MatchStats(Base):
         finally:
             session.close()
 
+class PlayerCompetitionTotals(Base):
+    __tablename__ = 'player_competition_totals'
+
+    player_id = Column(String(128), ForeignKey('players.id'), primary_key = True)
+    competition_id = Column(String(128), ForeignKey('leagues.id'), primary_key = True)
+    goals = Column(Integer, default = 0) # goals and penalty goals
+    penalty_goals = Column(Integer, default = 0)
+    penalty_misses = Column(Integer, default = 0)
+    penalty_saves = Column(Integer, default = 0)
+    own_goals = Column(Integer, default = 0)
+    assists = Column(Integer, default = 0)
+    clean_sheets = Column(Integer, default = 0)
+    yellow_cards = Column(Integer, default = 0)
+    red_cards = Column(Integer, default = 0)
+    appearances = Column(Integer, default = 0) # lineup entries with a rating
+    rating_total = Column(Float, default = 0)
+    minutes = Column(Integer, default = 0) # see MatchEvents.game_time
+
+    # The totals each match event type counts towards
+    EVENT_COLUMNS = {
+        "goal": ("goals",),
+        "penalty_goal": ("goals", "penalty_goals"),
+        "penalty_miss": ("penalty_misses",),
+        "penalty_saved": ("penalty_saves",),
+        "own_goal": ("own_goals",),
+        "assist": ("assists",),
+        "clean_sheet": ("clean_sheets",),
+        "yellow_card": ("yellow_cards",),
+        "red_card": ("red_cards",),
+    }
+    COLUMNS = ("goals", "penalty_goals", "penalty_misses", "penalty_saves", "own_goals", "assists", "clean_sheets", "yellow_cards", "red_cards", "appearances", "rating_total", "minutes")
+
+    @classmethod
+    def count_rows(cls, events, lineups, leagueByMatch):
+        """
+        Add up the totals of match events and lineup entries per player and competition.
+
+        Args:
+            events (iterable): (match ID, event type, time, player ID) rows.
+            lineups (iterable): (match ID, player ID, rating, reason) rows.
+            leagueByMatch (dict): The competition ID of each match.
+        """
+
+        totals = defaultdict(lambda: dict.fromkeys(cls.COLUMNS, 0))
+        times = defaultdict(dict) # (match ID, player ID) -> the minute of each of the player's game time events
+
+        for match_id, event_type, time, player_id in events:
+            if player_id and event_type in cls.EVENT_COLUMNS:
+                for column in cls.EVENT_COLUMNS[event_type]:
+                    totals[(player_id, leagueByMatch[match_id])][column] += 1
+
+            if player_id and event_type in MatchEvents.GAME_TIME_EVENTS:
+                times[(match_id, player_id)].setdefault(event_type, parse_time(time))
+
+        for match_id, player_id, rating, reason in lineups:
+            if not player_id:
+                continue
+
+            if rating is not None:
+                entry = totals[(player_id, leagueByMatch[match_id])]
+                entry["appearances"] += 1
+                entry["rating_total"] += rating
+
+            if reason is None: # played
+                totals[(player_id, leagueByMatch[match_id])]["minutes"] += MatchEvents.game_time(times.get((match_id, player_id), {}))
+
+        return totals
+
+    @classmethod
+    def batch_add_totals(cls, events, lineups):
+        """
+        Add the events and lineups of simulated matches (see process_payload) to the players' totals.
+
+        Args:
+            events (list): The match_events rows of the payload (match ID, event type, time, player ID).
+            lineups (list): The lineup_updates rows of the payload (match ID, player ID, start position, end position, rating, reason).
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            match_ids = list({event[0] for event in events} | {lineup[0] for lineup in lineups})
+            leagueByMatch = {}
+            for i in range(0, len(match_ids), 500):
+                leagueByMatch.update(session.query(Matches.id, Matches.league_id).filter(Matches.id.in_(match_ids[i:i + 500])).all())
+
+            deltas = cls.count_rows(
+                [(event[0], event[1], event[2], event[3]) for event in events],
+                [(lineup[0], lineup[1], lineup[4], lineup[5]) for lineup in lineups],
+                leagueByMatch
+            )
+
+            playerIDs = list({player_id for player_id, _ in deltas})
+            existing = {}
+            for i in range(0, len(playerIDs), 500):
+                for entry in session.query(PlayerCompetitionTotals).filter(PlayerCompetitionTotals.player_id.in_(playerIDs[i:i + 500])).all():
+                    existing[(entry.player_id, entry.competition_id)] = entry
+
+            updates, inserts = [], []
+            for (player_id, competition_id), delta in deltas.items():
+                entry = existing.get((player_id, competition_id))
+                if entry:
+                    updates.append({"player_id": player_id, "competition_id": competition_id, **{column: (getattr(entry, column) or 0) + delta[column] for column in cls.COLUMNS}})
+                else:
+                    inserts.append({"player_id": player_id, "competition_id": competition_id, **delta})
+
+            session.bulk_update_mappings(PlayerCompetitionTotals, updates)
+            session.bulk_insert_mappings(PlayerCompetitionTotals, inserts)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error in batch_add_totals: %s", e)
+            raise e
+        finally:
+            session.close()
+
+    @classmethod
+    def rebuild(cls, connection):
+        """
+        Recompute every player's totals from the match events and lineups (for saves made before the table existed, or
+        to repair it). Runs on the given connection, so the caller decides the transaction.
+
+        Args:
+            connection: The SQLAlchemy connection of the save.
+        """
+
+        events = connection.execute(
+            select([MatchEvents.match_id, MatchEvents.event_type, MatchEvents.time, MatchEvents.player_id]).where(MatchEvents.event_type.in_(list(cls.EVENT_COLUMNS) + list(MatchEvents.GAME_TIME_EVENTS)))
+        ).fetchall()
+        lineups = connection.execute(
+            select([TeamLineup.match_id, TeamLineup.player_id, TeamLineup.rating, TeamLineup.reason]).where(or_(TeamLineup.rating.isnot(None), TeamLineup.reason == None))
+        ).fetchall()
+        leagueByMatch = dict(connection.execute(select([Matches.id, Matches.league_id])).fetchall())
+
+        totals = cls.count_rows(events, lineups, leagueByMatch)
+
+        connection.execute(PlayerCompetitionTotals.__table__.delete())
+        if totals:
+            connection.execute(
+                PlayerCompetitionTotals.__table__.insert(),
+                [{"player_id": player_id, "competition_id": competition_id, **entry} for (player_id, competition_id), entry in totals.items()]
+            )
+
+        logger.info("Rebuilt the competition totals of %d players", len(totals))
+
+    @classmethod
+    def get_totals_by_players(cls, players):
+        """
+        Get the totals of several players in a competition each (None if a player has none yet).
+
+        Args:
+            players (iterable): (player ID, competition ID) pairs.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            players = set(players)
+            playerIDs = list({player_id for player_id, _ in players})
+
+            totals = {}
+            for i in range(0, len(playerIDs), 500):
+                for entry in session.query(PlayerCompetitionTotals).filter(PlayerCompetitionTotals.player_id.in_(playerIDs[i:i + 500])).all():
+                    totals[(entry.player_id, entry.competition_id)] = entry
+
+            return {player: totals.get(player) for player in players}
+        finally:
+            session.close()
+
+    @classmethod
+    def get_total(cls, player_id, column, comp = None):
+        """
+        Get one of a player's totals, in a competition (a primary key lookup) or summed over all of them.
+
+        Args:
+            player_id (str): The ID of the player.
+            column (str): The total to get (one of COLUMNS).
+            comp (str, optional): The ID of the competition. Defaults to None (all competitions).
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            if comp:
+                entry = session.query(PlayerCompetitionTotals).get((player_id, comp))
+                return (getattr(entry, column) or 0) if entry else 0
+
+            total = session.query(func.sum(getattr(PlayerCompetitionTotals, column))).filter(PlayerCompetitionTotals.player_id == player_id).scalar()
+            return total or 0
+        finally:
+            session.close()
+
+    @classmethod
+    def get_average_rating(cls, player_id, comp = None):
+        """
+        Get a player's average rating, in a competition or over all of them ("N/A" if they have not played).
+
+        Args:
+            player_id (str): The ID of the player.
+            comp (str, optional): The ID of the competition. Defaults to None (all competitions).
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            query = session.query(func.sum(PlayerCompetitionTotals.rating_total), func.sum(PlayerCompetitionTotals.appearances)).filter(PlayerCompetitionTotals.player_id == player_id)
+            if comp:
+                query = query.filter(PlayerCompetitionTotals.competition_id == comp)
+
+            rating_total, appearances = query.one()
+            rating = rating_total / appearances if appearances else None
+            return rating if rating else "N/A"
+        finally:
+            session.close()
+
+    @classmethod
+    def get_totals_by_team(cls, team_id):
+        """
+        Get the totals of a team's players, summed over all competitions.
+
+        Args:
+            team_id (str): The ID of the team.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            rows = session.query(
+                PlayerCompetitionTotals.player_id,
+                *[func.sum(getattr(PlayerCompetitionTotals, column)) for column in cls.COLUMNS]
+            ).join(Players, PlayerCompetitionTotals.player_id == Players.id).filter(
+                Players.team_id == team_id
+            ).group_by(PlayerCompetitionTotals.player_id).all()
+
+            return {row[0]: dict(zip(cls.COLUMNS, row[1:])) for row in rows}
+        finally:
+            session.close()
+
 class League(Base):
     __tablename__ = 'leagues'
     
@@ -3780,33 +4098,74 @@ class League(Base):
             session.close()
 
     @classmethod
-    def team_of_the_week(cls, league_id, matchday, team = None):
+    def team_of_the_week(cls, league_id, matchday, team = None, cache = False):
+        """
+        Get the team of the week of a league's matchday: the best rated player of each position of the "4-3-3 DM"
+        formation. It is read from TeamsOfTheWeek if it was saved, otherwise worked out from the matchday's lineups in
+        one query.
+
+        Args:
+            league_id (str): The ID of the league.
+            matchday (int): The matchday.
+            team (str, optional): A team ID, to also check if one of its players is in the team of the week. Defaults to None.
+            cache (bool, optional): Save the team of the week if all the matchday's matches were played (done for the
+                manager's league when a matchday is completed, and for the others the first time they are read).
+                Defaults to False.
+        """
+
         session = DatabaseManager().get_session()
         try:
-            matches = session.query(Matches).filter(
-                Matches.league_id == league_id,
-                Matches.matchday == matchday
-            ).all()
-
             positions = FORMATIONS_POSITIONS["4-3-3 DM"]
-            teamOTW = {}
-
-            for position in positions:
-                player, rating = get_best_player_for_position(matches, position)
-                teamOTW[position] = [player, rating]
 
-            if team:
-                player_in_team = any(Players.get_player_by_id(player).team_id == team for player, _ in teamOTW.values())
+            saved = session.query(TeamsOfTheWeek).filter(TeamsOfTheWeek.league_id == league_id, TeamsOfTheWeek.matchday == matchday).all()
+            if saved:
+                entries = {entry.position: entry for entry in saved}
+                teamOTW = {position: [entries[position].player_id, entries[position].rating] if position in entries else [None, -1] for position in positions}
+                teamIDs = {entry.team_id for entry in saved}
             else:
-                player_in_team = False
+                lineups = session.query(TeamLineup.player_id, TeamLineup.start_position, TeamLineup.end_position, TeamLineup.rating, TeamLineup.match_id, Players.team_id).join(
+                    Matches, TeamLineup.match_id == Matches.id
+                ).join(
+                    Players, TeamLineup.player_id == Players.id
+                ).filter(
+                    Matches.league_id == league_id,
+                    Matches.matchday == matchday,
+                    TeamLineup.rating.isnot(None)
+                ).all()
+
+                teamOTW = get_best_players_for_positions([lineup[:4] for lineup in lineups], positions)
+                teamByPlayer = {lineup.player_id: lineup.team_id for lineup in lineups}
+                teamIDs = {teamByPlayer[player] for player, _ in teamOTW.values() if player}
+
+                if cache:
+                    numMatches = session.query(Matches).filter(Matches.league_id == league_id, Matches.matchday == matchday).count()
+                    if numMatches and numMatches == len({lineup.match_id for lineup in lineups}):
+                        session.bulk_insert_mappings(TeamsOfTheWeek, [
+                            {"league_id": league_id, "matchday": matchday, "position": position, "player_id": player, "rating": rating, "team_id": teamByPlayer[player]}
+                            for position, (player, rating) in teamOTW.items() if player
+                        ])
+                        session.commit()
+
+            player_in_team = team in teamIDs if team else False
 
             return teamOTW, player_in_team
         except Exception as e:
+            session.rollback()
             logger.exception("Error in team_of_the_week: %s", e)
             raise e
         finally:
             session.close()
-            
+
+class TeamsOfTheWeek(Base):
+    __tablename__ = 'teams_of_the_week'
+
+    league_id = Column(String(128), ForeignKey('leagues.id'), primary_key = True)
+    matchday = Column(Integer, primary_key = True)
+    position = Column(String(128), primary_key = True)
+    player_id = Column(String(128), ForeignKey('players.id'))
+    rating = Column(Float)
+    team_id = Column(String(128), ForeignKey('teams.id')) # the team of the player at the time
+
 class LeagueTeams(Base):
     __tablename__ = 'league_teams'
     
@@ -4004,32 +4363,213 @@ class LeagueTeams(Base):
         finally:
             session.close()
 
-    @classmethod
-    def get_total_goals_scored(cls, league_id):
+    @classmethod
+    def get_total_goals_scored(cls, league_id):
+        session = DatabaseManager().get_session()
+        try:
+            total_goals = session.query(func.sum(LeagueTeams.goals_scored)).filter(LeagueTeams.league_id == league_id).scalar()
+            return total_goals if total_goals else 0
+        finally:
+            session.close()
+
+    @classmethod
+    def get_total_goals_conceded(cls, league_id):
+        session = DatabaseManager().get_session()
+        try:
+            total_goals = session.query(func.sum(LeagueTeams.goals_conceded)).filter(LeagueTeams.league_id == league_id).scalar()
+            return total_goals if total_goals else 0
+        finally:
+            session.close()
+
+    @classmethod
+    def get_total_of_matches_played(cls, league_id):
+        session = DatabaseManager().get_session()
+        try:
+            total_matches = session.query(
+                func.sum(LeagueTeams.games_won + LeagueTeams.games_drawn + LeagueTeams.games_lost)
+            ).filter(LeagueTeams.league_id == league_id).scalar()
+            return total_matches if total_matches else 0
+        finally:
+            session.close()
+
+class TeamStreaks(Base):
+    __tablename__ = 'team_streaks'
+
+    team_id = Column(String(128), ForeignKey('teams.id'), primary_key = True)
+    league_id = Column(String(128), ForeignKey('leagues.id'), primary_key = True)
+    current_winning = Column(Integer, default = 0)
+    current_unbeaten = Column(Integer, default = 0)
+    current_winless = Column(Integer, default = 0)
+    current_losing = Column(Integer, default = 0)
+    current_scoring = Column(Integer, default = 0)
+    current_scoreless = Column(Integer, default = 0)
+    longest_winning = Column(Integer, default = 0)
+    longest_unbeaten = Column(Integer, default = 0)
+    longest_winless = Column(Integer, default = 0)
+    longest_losing = Column(Integer, default = 0)
+    longest_scoring = Column(Integer, default = 0)
+    longest_scoreless = Column(Integer, default = 0)
+
+    # Whether a result (goals for, goals against) continues each kind of streak
+    STREAKS = {
+        "winning": lambda scored, conceded: scored > conceded,
+        "unbeaten": lambda scored, conceded: scored >= conceded,
+        "winless": lambda scored, conceded: scored <= conceded,
+        "losing": lambda scored, conceded: scored < conceded,
+        "scoring": lambda scored, conceded: scored > 0,
+        "scoreless": lambda scored, conceded: scored == 0,
+    }
+    COLUMNS = (
+        "current_winning", "current_unbeaten", "current_winless", "current_losing", "current_scoring", "current_scoreless",
+        "longest_winning", "longest_unbeaten", "longest_winless", "longest_losing", "longest_scoring", "longest_scoreless"
+    )
+
+    @classmethod
+    def add_results(cls, streaks, results):
+        """
+        Move the streaks on by some results, in place.
+
+        Args:
+            streaks (dict): (team ID, league ID) -> dict of the COLUMNS values, missing teams are added.
+            results (iterable): (league ID, home ID, away ID, home score, away score) rows, oldest first.
+        """
+
+        for league_id, home_id, away_id, score_home, score_away in results:
+            for team_id, scored, conceded in ((home_id, score_home, score_away), (away_id, score_away, score_home)):
+                entry = streaks.setdefault((team_id, league_id), dict.fromkeys(cls.COLUMNS, 0))
+
+                for streak, continues in cls.STREAKS.items():
+                    entry[f"current_{streak}"] = entry[f"current_{streak}"] + 1 if continues(scored, conceded) else 0
+                    entry[f"longest_{streak}"] = max(entry[f"longest_{streak}"], entry[f"current_{streak}"])
+
+    @classmethod
+    def batch_add_results(cls, scores):
+        """
+        Add the results of simulated matches (see process_payload) to the streaks of their teams.
+
+        Args:
+            scores (list): The score_updates rows of the payload (match ID, home score, away score).
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            scoreByMatch = {match_id: (score_home, score_away) for match_id, score_home, score_away in scores}
+            match_ids = list(scoreByMatch)
+
+            matches = []
+            for i in range(0, len(match_ids), 500):
+                matches.extend(session.query(Matches.id, Matches.league_id, Matches.home_id, Matches.away_id, Matches.date).filter(Matches.id.in_(match_ids[i:i + 500])).all())
+            matches.sort(key = lambda match: match.date)
+
+            team_ids = list({team_id for match in matches for team_id in (match.home_id, match.away_id)})
+            existing = {}
+            for i in range(0, len(team_ids), 500):
+                for entry in session.query(TeamStreaks).filter(TeamStreaks.team_id.in_(team_ids[i:i + 500])).all():
+                    existing[(entry.team_id, entry.league_id)] = entry
+
+            streaks = {key: {column: getattr(entry, column) or 0 for column in cls.COLUMNS} for key, entry in existing.items()}
+            cls.add_results(streaks, [(match.league_id, match.home_id, match.away_id, *scoreByMatch[match.id]) for match in matches])
+
+            updates, inserts = [], []
+            for (team_id, league_id), entry in streaks.items():
+                (updates if (team_id, league_id) in existing else inserts).append({"team_id": team_id, "league_id": league_id, **entry})
+
+            session.bulk_update_mappings(TeamStreaks, updates)
+            session.bulk_insert_mappings(TeamStreaks, inserts)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Error in batch_add_results: %s", e)
+            raise e
+        finally:
+            session.close()
+
+    @classmethod
+    def rebuild(cls, connection):
+        """
+        Recompute every team's streaks from the played matches (for saves made before the table existed, or to repair
+        it). Runs on the given connection, so the caller decides the transaction.
+
+        Args:
+            connection: The SQLAlchemy connection of the save.
+        """
+
+        played = select([TeamLineup.match_id]).distinct()
+        results = connection.execute(
+            select([Matches.league_id, Matches.home_id, Matches.away_id, Matches.score_home, Matches.score_away]).where(Matches.id.in_(played)).order_by(Matches.date)
+        ).fetchall()
+
+        streaks = {}
+        cls.add_results(streaks, results)
+
+        connection.execute(TeamStreaks.__table__.delete())
+        if streaks:
+            connection.execute(
+                TeamStreaks.__table__.insert(),
+                [{"team_id": team_id, "league_id": league_id, **entry} for (team_id, league_id), entry in streaks.items()]
+            )
+
+        logger.info("Rebuilt the streaks of %d teams", len(streaks))
+
+    @classmethod
+    def get_streaks_by_teams(cls, teams):
+        """
+        Get the streaks of several teams in a league each (None if a team has not played yet).
+
+        Args:
+            teams (iterable): (team ID, league ID) pairs.
+        """
+
         session = DatabaseManager().get_session()
         try:
-            total_goals = session.query(func.sum(LeagueTeams.goals_scored)).filter(LeagueTeams.league_id == league_id).scalar()
-            return total_goals if total_goals else 0
+            teams = set(teams)
+            team_ids = list({team_id for team_id, _ in teams})
+
+            streaks = {}
+            for i in range(0, len(team_ids), 500):
+                for entry in session.query(TeamStreaks).filter(TeamStreaks.team_id.in_(team_ids[i:i + 500])).all():
+                    streaks[(entry.team_id, entry.league_id)] = entry
+
+            return {team: streaks.get(team) for team in teams}
         finally:
             session.close()
 
     @classmethod
-    def get_total_goals_conceded(cls, league_id):
+    def get_streak(cls, team_id, league_id, column):
+        """
+        Get one of a team's streaks in a league (0 if it has not played yet).
+
+        Args:
+            team_id (str): The ID of the team.
+            league_id (str): The ID of the league.
+            column (str): The streak to get (one of COLUMNS, e.g. "current_winless").
+        """
+
         session = DatabaseManager().get_session()
         try:
-            total_goals = session.query(func.sum(LeagueTeams.goals_conceded)).filter(LeagueTeams.league_id == league_id).scalar()
-            return total_goals if total_goals else 0
+            entry = session.query(TeamStreaks).get((team_id, league_id))
+            return (getattr(entry, column) or 0) if entry else 0
         finally:
             session.close()
 
     @classmethod
-    def get_total_of_matches_played(cls, league_id):
+    def get_league_streaks(cls, leagueTeams, league_id, column):
+        """
+        Get one of the streaks of the teams of a league, longest first.
+
+        Args:
+            leagueTeams (list): The LeagueTeams entries of the teams.
+            league_id (str): The ID of the league.
+            column (str): The streak to get (one of COLUMNS, e.g. "longest_winning").
+        """
+
         session = DatabaseManager().get_session()
         try:
-            total_matches = session.query(
-                func.sum(LeagueTeams.games_won + LeagueTeams.games_drawn + LeagueTeams.games_lost)
-            ).filter(LeagueTeams.league_id == league_id).scalar()
-            return total_matches if total_matches else 0
+            streaks = dict(session.query(TeamStreaks.team_id, getattr(TeamStreaks, column)).filter(TeamStreaks.league_id == league_id).all())
+
+            results = [(team.team_id, streaks.get(team.team_id) or 0) for team in leagueTeams]
+            results.sort(key = lambda x: x[1], reverse = True)
+            return results
         finally:
             session.close()
 
@@ -4152,6 +4692,7 @@ class Referees(Base):
     
     @classmethod
     def add_referees(cls, leagues, flags):
+        first_gen, last_gen = get_name_generators()
         session = DatabaseManager().get_session()
         try:
             referees_dict = []
@@ -4801,6 +5342,15 @@ class PlayerBans(Base):
         finally:
             session.close()
 
+    @classmethod
+    def get_injured_player_ids(cls):
+        session = DatabaseManager().get_session()
+        try:
+            bans = session.query(PlayerBans.player_id).filter(PlayerBans.ban_type == "injury").all()
+            return {ban.player_id for ban in bans}
+        finally:
+            session.close()
+
     @classmethod
     def get_team_injured_player_ids(cls, team_id):
         session = DatabaseManager().get_session()
@@ -5292,6 +5842,10 @@ class Settings(Base):
             )
             
             session.add(setting)
+            session.add(Settings(
+                setting_name = "simulation_seed",
+                setting_value = str(random.getrandbits(63))
+            ))
             session.commit()
         except Exception as e:
             session.rollback()
@@ -5342,6 +5896,29 @@ class Settings(Base):
         finally:
             session.close()
 
+    @classmethod
+    def get_simulation_seed(cls):
+        """
+        Get the save-level seed the match random number generators are derived from. Saves created before the seed
+        existed get one the first time it is asked for.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            setting = session.query(Settings).filter(Settings.setting_name == "simulation_seed").first()
+            if setting:
+                return int(setting.setting_value)
+
+            seed = random.getrandbits(63)
+            session.add(Settings(setting_name = "simulation_seed", setting_value = str(seed)))
+            session.commit()
+            return seed
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
 class LeagueNews(Base):
     __tablename__ = 'league_news'
 
@@ -5464,6 +6041,29 @@ class LeagueNews(Base):
         finally:
             session.close()
 
+    @classmethod
+    def get_first_news_by_teams(cls, news_types, team_ids):
+        """
+        Get the first news entry of each type for several teams, in one query (per 500 teams).
+
+        Args:
+            news_types (list): The news types (e.g. ["winless_form", "unbeaten_form"]).
+            team_ids (iterable): The IDs of the teams.
+        """
+
+        session = DatabaseManager().get_session()
+        try:
+            team_ids = list(set(team_ids))
+
+            news = {}
+            for i in range(0, len(team_ids), 500):
+                for entry in session.query(LeagueNews).filter(LeagueNews.news_type.in_(news_types), LeagueNews.team_id.in_(team_ids[i:i + 500])).all():
+                    news.setdefault((entry.news_type, entry.team_id), entry)
+
+            return news
+        finally:
+            session.close()
+
     @classmethod
     def batch_remove_news(cls, news_ids):
         session = DatabaseManager().get_session()
@@ -6404,139 +7004,27 @@ class StatsManager:
 
     @staticmethod
     def get_longest_unbeaten_run(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            unbeaten_run = 0
-            current_run = 0
-            for match in matches:
-                if match.score_home == match.score_away:
-                    current_run += 1
-                elif match.home_id == team.team_id and match.score_home > match.score_away:
-                    current_run += 1
-                elif match.away_id == team.team_id and match.score_away > match.score_home:
-                    current_run += 1
-                else:
-                    if current_run > unbeaten_run:
-                        unbeaten_run = current_run
-                    current_run = 0
-            if current_run > unbeaten_run:
-                unbeaten_run = current_run
-            results.append((team.team_id, unbeaten_run))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_unbeaten")
 
     @staticmethod
     def get_longest_winning_streak(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            winning_streak = 0
-            current_streak = 0
-            for match in matches:
-                if match.home_id == team.team_id and match.score_home > match.score_away:
-                    current_streak += 1
-                elif match.away_id == team.team_id and match.score_away > match.score_home:
-                    current_streak += 1
-                else:
-                    if current_streak > winning_streak:
-                        winning_streak = current_streak
-                    current_streak = 0
-            if current_streak > winning_streak:
-                winning_streak = current_streak
-            results.append((team.team_id, winning_streak))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_winning")
 
     @staticmethod
     def get_longest_losing_streak(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            losing_streak = 0
-            current_streak = 0
-            for match in matches:
-                if match.home_id == team.team_id and match.score_home < match.score_away:
-                    current_streak += 1
-                elif match.away_id == team.team_id and match.score_away < match.score_home:
-                    current_streak += 1
-                else:
-                    if current_streak > losing_streak:
-                        losing_streak = current_streak
-                    current_streak = 0
-            if current_streak > losing_streak:
-                losing_streak = current_streak
-            results.append((team.team_id, losing_streak))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_losing")
 
     @staticmethod
     def get_longest_winless_streak(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            winless_streak = 0
-            current_streak = 0
-            for match in matches:
-                if match.score_home == match.score_away:
-                    current_streak += 1
-                elif match.home_id == team.team_id and match.score_home < match.score_away:
-                    current_streak += 1
-                elif match.away_id == team.team_id and match.score_away < match.score_home:
-                    current_streak += 1
-                else:
-                    if current_streak > winless_streak:
-                        winless_streak = current_streak
-                    current_streak = 0
-            if current_streak > winless_streak:
-                winless_streak = current_streak
-            results.append((team.team_id, winless_streak))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_winless")
 
     @staticmethod
     def get_longest_scoring_streak(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            scoring_streak = 0
-            current_streak = 0
-            for match in matches:
-                if match.home_id == team.team_id and match.score_home > 0:
-                    current_streak += 1
-                elif match.away_id == team.team_id and match.score_away > 0:
-                    current_streak += 1
-                else:
-                    if current_streak > scoring_streak:
-                        scoring_streak = current_streak
-                    current_streak = 0
-            if current_streak > scoring_streak:
-                scoring_streak = current_streak
-            results.append((team.team_id, scoring_streak))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_scoring")
 
     @staticmethod
     def get_longest_scoreless_streak(leagueTeams, league_id):
-        results = []
-        for team in leagueTeams:
-            matches = Matches.get_all_played_matches_by_team_and_comp(team.team_id, league_id)
-            scoreless_streak = 0
-            current_streak = 0
-            for match in matches:
-                if match.home_id == team.team_id and match.score_home == 0:
-                    current_streak += 1
-                elif match.away_id == team.team_id and match.score_away == 0:
-                    current_streak += 1
-                else:
-                    if current_streak > scoreless_streak:
-                        scoreless_streak = current_streak
-                    current_streak = 0
-            if current_streak > scoreless_streak:
-                scoreless_streak = current_streak
-            results.append((team.team_id, scoreless_streak))
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return TeamStreaks.get_league_streaks(leagueTeams, league_id, "longest_scoreless")
 
     @staticmethod
     def get_highest_possession(leagueTeams, league_id):
@@ -6680,66 +7168,31 @@ class StatsManager:
         sorted in descending order and limited to the top N players
         """
 
-        # Create a dict of all players with entries for goals, assists, clean sheets, yellow and red cards
-        player_stats = defaultdict(lambda: {"goal": 0, "assist": 0, "cleanSheet": 0, "yellowCard": 0, "redCard": 0})
-        
-        session = DatabaseManager().get_session()
-        try:
-            # Get team's players
-            team_players = session.query(Players.id).filter(Players.team_id == teamID).all()
-            team_player_ids = [p.id for p in team_players]
-
-            # Get all matches played by the team
-            matches = session.query(Matches.id).filter(
-                or_(Matches.home_id == teamID, Matches.away_id == teamID)
-            ).all()
-            match_ids = [m.id for m in matches]
-
-            # Get events for these matches but only for players in the team
-            events = session.query(
-                MatchEvents.player_id,
-                MatchEvents.event_type
-            ).filter(
-                MatchEvents.match_id.in_(match_ids),
-                MatchEvents.player_id.in_(team_player_ids)
-            ).all()
+        # The season totals of the team's players (see PlayerCompetitionTotals)
+        columns = {"goal": "goals", "assist": "assists", "cleanSheet": "clean_sheets", "yellowCard": "yellow_cards", "redCard": "red_cards"}
+        player_stats = {pid: {stat: totals[column] or 0 for stat, column in columns.items()} for pid, totals in PlayerCompetitionTotals.get_totals_by_team(teamID).items()}
+
+        # Convert to dictionary of lists sorted by each stat value
+        result = {
+            "goal": [],
+            "assist": [],
+            "cleanSheet": [],
+            "yellowCard": [],
+            "redCard": []
+        }
 
-            # Process all events
-            for player_id, event_type in events:
-                if event_type in ["goal", "penalty_goal"]:
-                    player_stats[player_id]["goal"] += 1
-                elif event_type == "assist":
-                    player_stats[player_id]["assist"] += 1
-                elif event_type == "clean_sheet":
-                    player_stats[player_id]["cleanSheet"] += 1
-                elif event_type == "yellow_card":
-                    player_stats[player_id]["yellowCard"] += 1
-                elif event_type == "red_card":
-                    player_stats[player_id]["redCard"] += 1
-
-            # Convert to dictionary of lists sorted by each stat value
-            result = {
-                "goal": [],
-                "assist": [],
-                "cleanSheet": [],
-                "yellowCard": [],
-                "redCard": []
-            }
-
-            # For each stat category, get the top N players
-            for stat in result.keys():
-                # Sort players by the stat value in descending order
-                top_players = sorted(
-                    [(pid, stats[stat]) for pid, stats in player_stats.items()],
-                    key = lambda x: x[1],
-                    reverse = True
-                )
-                # Take only the top N players with non-zero stats
-                result[stat] = [(pid, val) for pid, val in top_players[:num] if val > 0]
+        # For each stat category, get the top N players
+        for stat in result.keys():
+            # Sort players by the stat value in descending order
+            top_players = sorted(
+                [(pid, stats[stat]) for pid, stats in player_stats.items()],
+                key = lambda x: x[1],
+                reverse = True
+            )
+            # Take only the top N players with non-zero stats
+            result[stat] = [(pid, val) for pid, val in top_players[:num] if val > 0]
 
-            return result
-        finally:
-            session.close()
+        return result
 
 
 def updateProgress(textIndex):
@@ -6973,8 +7426,15 @@ def getDefaultLineup(players, youths):
 
     return bestLineup
 
-def getPredictedLineup(opponent_id, currDate):
-    session = DatabaseManager().get_session()
+def getPredictedLineup(opponent_id, currDate, bundle = None):
+    if bundle:
+        # everything was loaded up front (simulation workers)
+        league_id = bundle.leagueByTeam[opponent_id]
+        available_players = bundle.get_all_non_banned_players_for_comp(opponent_id, league_id)
+        youths = bundle.get_all_non_banned_youth_players_for_comp(opponent_id, league_id)
+        lineups = bundle.lastLineups[opponent_id]
+        return predictLineup(lineups, available_players, youths)
+
     team = Teams.get_team_by_id(opponent_id)
     league = LeagueTeams.get_league_by_team(team.id)
     matches = Matches.get_team_last_5_matches(team.id, currDate)
@@ -6982,17 +7442,34 @@ def getPredictedLineup(opponent_id, currDate):
     available_players = PlayerBans.get_all_non_banned_players_for_comp(team.id, league.league_id)
     youths = PlayerBans.get_all_non_banned_youth_players_for_comp(team.id, league.league_id)
 
-    if len(matches) == 0:
+    lineups = []
+    for match in matches:
+        lineup = TeamLineup.get_lineup_by_match_and_team(match.id, team.id)
+        lineups.append([(entry.start_position, entry.player_id) for entry in lineup])
+
+    return predictLineup(lineups, available_players, youths)
+
+def predictLineup(lineups, available_players, youths):
+    """
+    Predict a team's lineup from its last lineups: the formation it used most, with the players who started the most
+    in each position (or the best available ones).
+
+    Args:
+        lineups (list): The lineups of the team's last matches, most recent first, each a list of (start position, player ID).
+        available_players (list): The non banned senior players of the team.
+        youths (list): The non banned youth players of the team.
+    """
+
+    if len(lineups) == 0:
         bestLineup = getDefaultLineup(available_players, youths)
         return bestLineup
 
     # Step 1: Find the most used formation
     formation_counts = defaultdict(int)
     most_used_formation = None
-    for match in matches:
-        lineup = TeamLineup.get_lineup_by_match_and_team(match.id, team.id)
+    for lineup in lineups:
         if lineup:
-            positions = [entry.start_position for entry in lineup if entry.start_position is not None]
+            positions = [start_position for start_position, _ in lineup if start_position is not None]
 
             if not positions or len(positions) < 11:
                 continue
@@ -7024,12 +7501,10 @@ def getPredictedLineup(opponent_id, currDate):
         else:
             # Count starts in this position
             player_starts = defaultdict(int)
-            for match in matches:
-                lineup = TeamLineup.get_lineup_by_match_and_team(match.id, team.id)
-                if lineup:
-                    for entry in lineup:
-                        if entry.start_position == position and entry.player_id in [p.id for p in position_players]:
-                            player_starts[entry.player_id] += 1
+            for lineup in lineups:
+                for start_position, player_id in lineup:
+                    if start_position == position and player_id in [p.id for p in position_players]:
+                        player_starts[player_id] += 1
 
             # Select most started player
             if player_starts:
@@ -7041,24 +7516,24 @@ def getPredictedLineup(opponent_id, currDate):
 
             predicted_lineup[position] = selected_player.id
 
-    session.close()
-
     return predicted_lineup
 
-def getProposedLineup(team_id, opponent_id, comp_id, currDate, players = None, youths = None):
+def getProposedLineup(team_id, opponent_id, comp_id, currDate, players = None, youths = None, bundle = None):
+    bans = bundle if bundle else PlayerBans
+
     if not players:
-        players = PlayerBans.get_all_non_banned_players_for_comp(team_id, comp_id)
+        players = bans.get_all_non_banned_players_for_comp(team_id, comp_id)
     
     if not youths:
-        youths = PlayerBans.get_all_non_banned_youth_players_for_comp(team_id, comp_id)
+        youths = bans.get_all_non_banned_youth_players_for_comp(team_id, comp_id)
 
-    predictedLineup = getPredictedLineup(opponent_id, currDate)
+    predictedLineup = getPredictedLineup(opponent_id, currDate, bundle)
 
     attackingScore = 0
     defendingScore = 0
 
     for position, playerID in predictedLineup.items():
-        player = Players.get_player_by_id(playerID)
+        player = bundle.players[playerID] if bundle else Players.get_player_by_id(playerID)
         if position in DEFENSIVE_POSITIONS:
             defendingScore += effective_ability(player)
         elif position in ATTACKING_POSITIONS:
@@ -7137,7 +7612,7 @@ def score_formation(sortedPlayers, positions, youths):
 
             lineup[pos] = youthID
             used.add(youthID)
-            chosen = Players.get_player_by_id(youthID)
+            chosen = next(p for p in youths if p.id == youthID)
         else:
             # Find candidates that are "specialists" for this position, given the rest of the lineup
             specialists = []
@@ -7185,12 +7660,14 @@ def getYouthPlayer(position, players, youthPlayers):
     available_youths.sort(key = effective_ability, reverse = True)
     return available_youths[0].id if available_youths else None
 
-def getSubstitutes(teamID, lineup, compID, allPlayers, allYouths):
+def getSubstitutes(teamID, lineup, compID, allPlayers, allYouths, rng = random, bundle = None):
+    bans = bundle if bundle else PlayerBans
+
     if not allPlayers:
-        allPlayers = PlayerBans.get_all_non_banned_players_for_comp(teamID, compID)
+        allPlayers = bans.get_all_non_banned_players_for_comp(teamID, compID)
 
     if not allYouths:
-        allYouths = PlayerBans.get_all_non_banned_youth_players_for_comp(teamID, compID)
+        allYouths = bans.get_all_non_banned_youth_players_for_comp(teamID, compID)
 
     usedPlayers = set(lineup.values())
     substitutes = []
@@ -7241,7 +7718,7 @@ def getSubstitutes(teamID, lineup, compID, allPlayers, allYouths):
         for _ in range(2 - len([s for s in substitutes if s in [p.id for p in defenders]])):
             uncovered_positions = [p for p in DEFENDER_POSITIONS if p not in covered_positions]
             if uncovered_positions:
-                specific_position = random.choice(uncovered_positions)
+                specific_position = rng.choice(uncovered_positions)
                 youthID = getYouthPlayer(specific_position, substitutes, allYouths)
                 if youthID:
                     substitutes.append(youthID)
@@ -7251,7 +7728,7 @@ def getSubstitutes(teamID, lineup, compID, allPlayers, allYouths):
         for _ in range(2 - len([s for s in substitutes if s in [p.id for p in midfielders]])):
             uncovered_positions = [p for p in MIDFIELD_POSITIONS if p not in covered_positions]
             if uncovered_positions:
-                specific_position = random.choice(uncovered_positions)
+                specific_position = rng.choice(uncovered_positions)
                 youthID = getYouthPlayer(specific_position, substitutes, allYouths)
                 if youthID:
                     substitutes.append(youthID)
@@ -7261,7 +7738,7 @@ def getSubstitutes(teamID, lineup, compID, allPlayers, allYouths):
         for _ in range(2 - len([s for s in substitutes if s in [p.id for p in attackers]])):
             uncovered_positions = [p for p in FORWARD_POSITIONS if p not in covered_positions]
             if uncovered_positions:
-                specific_position = random.choice(uncovered_positions)
+                specific_position = rng.choice(uncovered_positions)
                 youthID = getYouthPlayer(specific_position, substitutes, allYouths)
                 if youthID:
                     substitutes.append(youthID)
@@ -7350,7 +7827,7 @@ def check_player_games_happy(teamID, currDate):
             continue
 
         last_matches = matches[-matchesToCheck:]  # last n matches
-        avg_minutes = sum(MatchEvents.get_player_game_time(player.id, match.id) for match in last_matches) / matchesToCheck
+        avg_minutes = sum(MatchEvents.get_game_times(player.id, [match.id for match in last_matches]).values()) / matchesToCheck
 
         if player_gametime(avg_minutes, player):
             # reduced = Players.reduce_morale_to_25(player.id)
@@ -7363,72 +7840,160 @@ def check_player_games_happy(teamID, currDate):
 
     return payload
 
-def create_events_for_other_teams(team_id, start_date, managing_team):
-    end_date = start_date + timedelta(days=7)
-    matches = Matches.get_match_by_team_and_date_range(team_id, start_date, end_date)
+def create_events_for_teams(team_ids, start_date, managing_team = None, progress_callback = None, seed = None):
+    """
+    Plan the calendar events of a week for a set of teams. The shape of the week (see plan_week_slots) only depends on
+    which days a team plays on and whether those matches are home or away, so it is worked out once per distinct
+    pattern of match days; the random picks are then drawn for every team from its own generator, seeded from the save
+    seed, the team and the week. The fixtures are read with one query.
+
+    Args:
+        team_ids (list): The IDs of the teams.
+        start_date (datetime): The start of the week.
+        managing_team (str, optional): The ID of the user's team, if its events are planned too (its events of the
+            week are deleted first). Defaults to None.
+        progress_callback (callable, optional): Called once per team. Defaults to None.
+        seed (int, optional): The seed of the teams' generators. Defaults to the save seed (see
+            Settings.get_simulation_seed).
+    """
+
+    end_date = start_date + timedelta(days = 7)
+    firstDay = start_date.date() - timedelta(days = 1) # the day before, for the review of a match played just before
+
+    if seed is None:
+        seed = Settings.get_simulation_seed()
+
+    match_days = {team_id: 0 for team_id in team_ids} # bitmask of the days of the week with a match
+    home_by_date = {team_id: {} for team_id in team_ids} # date -> whether the team's (first) match that day is at home
+
+    fixtures = Matches.get_fixtures_in_range(datetime.datetime.combine(firstDay, datetime.time.min), end_date + timedelta(days = 1))
+    for home_id, away_id, date in fixtures:
+        for team_id, is_home in ((home_id, True), (away_id, False)):
+            if team_id in home_by_date:
+                home_by_date[team_id].setdefault(date.date(), is_home)
+                if start_date <= date <= end_date:
+                    match_days[team_id] |= 1 << getDayIndex(date)
+
+    if managing_team in home_by_date:
+        CalendarEvents.delete_events_for_team_in_date_range(managing_team, start_date, end_date)
+
+    weeks = {}
+    return_events = []
+    for team_id in team_ids:
+        homes = home_by_date[team_id]
+        pattern = (match_days[team_id], tuple(homes.get(firstDay + timedelta(days = i)) for i in range(9)))
 
-    match_days = {getDayIndex(match.date) for match in matches}
-    weekly_usage = {event: 0 for event in MAX_EVENTS}
-    planned_events = defaultdict(list)  # store per day
+        try:
+            if pattern not in weeks:
+                weeks[pattern] = plan_week_slots(start_date, match_days[team_id], homes)
 
-    if managing_team:
-        CalendarEvents.delete_events_for_team_in_date_range(team_id, start_date, end_date)
+            rng = random.Random(f"{seed}:{team_id}:{start_date.date()}")
+            return_events.extend((team_id, *event) for event in plan_week_events(weeks[pattern], rng))
+        except Exception:
+            logger.exception("Could not plan the week of %s for team %s", start_date, team_id)
 
-    current_date = start_date
-    while current_date.date() < end_date.date():
-        events = []
+        if progress_callback:
+            progress_callback()
 
-        templates = [TEMPLATES_2.copy(), TEMPLATES_3.copy()]
+    logger.info("Planned %d calendar events for %d teams from %d week patterns", len(return_events), len(team_ids), len(weeks))
+    return return_events
+
+def plan_week_slots(start_date, match_days, home_by_date):
+    """
+    Work out the shape of a team's week: for every day without a match, whether it is the day after a match (review),
+    the day before one (preparation) or a training day, and whether the match is at home.
+
+    Args:
+        start_date (datetime): The start of the week.
+        match_days (int): Bitmask of the days of the week (0 is Monday) the team plays on.
+        home_by_date (dict): Date -> whether the team plays at home, for the days it plays on (the day before the week
+            and the day after included).
 
+    Returns:
+        list: (date, kind, is_home) per day without a match, kind being "review", "prep" or "training" (is_home is None
+            for training days).
+    """
+
+    end_date = start_date + timedelta(days=7)
+    match_days = {day for day in range(7) if match_days & 1 << day}
+
+    slots = []
+    current_date = start_date
+    while current_date.date() < end_date.date():
         is_prep = getDayIndex(current_date + timedelta(days=1)) in match_days
         is_match = getDayIndex(current_date) in match_days
 
         if getDayIndex(current_date) == 0:
-            is_review = Matches.check_if_game_date(team_id, current_date - timedelta(days=1))
+            is_review = (current_date - timedelta(days=1)).date() in home_by_date
         else:
             is_review = getDayIndex(current_date - timedelta(days=1)) in match_days
 
         if not is_match:
             if is_review or is_prep:
                 date_check = current_date - timedelta(days=1) if is_review else current_date + timedelta(days=1)
-                is_home = Matches.get_team_match_no_time(team_id, date_check).home_id == team_id
+                slots.append((current_date.date(), "review" if is_review else "prep", home_by_date[date_check.date()]))
+            else:
+                slots.append((current_date.date(), "training", None))
 
-                if is_home:
-                    possible = [e for e in MAX_EVENTS if weekly_usage[e] < MAX_EVENTS[e] and e != "Recovery"]
-                    event = random.choice(possible) if possible else None
+        current_date += timedelta(days=1)
 
-                    if is_review:
-                        events = ["Match Review", "Recovery"] + ([event] if event else [])
-                    elif is_prep:
-                        events = ([event] if event else []) + ["Recovery", "Match Preparation"]
+    return slots
 
-                        weekly_usage["Recovery"] += 1
-                else:
-                    if is_review:
-                        events = ["Travel", "Match Review", "Recovery"]
-                    elif is_prep:
-                        events = ["Recovery", "Travel", "Match Preparation"]
-                    
-                        weekly_usage["Recovery"] += 1
+def plan_week_events(slots, rng):
+    """
+    Plan the events of a team's week from its slots (see plan_week_slots): match preparation, travel and review around
+    its matches, and training templates on the other days, with at least two recoveries.
+
+    Args:
+        slots (list): The (date, kind, is_home) days without a match.
+        rng (random.Random): The generator the random picks are drawn from.
+    """
+
+    weekly_usage = {event: 0 for event in MAX_EVENTS}
+    planned_events = defaultdict(list)  # store per day
+
+    for day, kind, is_home in slots:
+        events = []
+
+        templates = [TEMPLATES_2.copy(), TEMPLATES_3.copy()]
+
+        if kind != "training":
+            is_review = kind == "review"
+            is_prep = kind == "prep"
+
+            if is_home:
+                possible = [e for e in MAX_EVENTS if weekly_usage[e] < MAX_EVENTS[e] and e != "Recovery"]
+                event = rng.choice(possible) if possible else None
+
+                if is_review:
+                    events = ["Match Review", "Recovery"] + ([event] if event else [])
+                elif is_prep:
+                    events = ([event] if event else []) + ["Recovery", "Match Preparation"]
+
+                    weekly_usage["Recovery"] += 1
             else:
-                template_group = random.choice(templates)
+                if is_review:
+                    events = ["Travel", "Match Review", "Recovery"]
+                elif is_prep:
+                    events = ["Recovery", "Travel", "Match Preparation"]
 
-                if len(template_group) == 0:
-                    template_group = templates[0] if templates[0] != template_group else templates[1]
-                if len(template_group) == 0:
-                    current_date += timedelta(days=1)
-                    continue
+                    weekly_usage["Recovery"] += 1
+        else:
+            template_group = rng.choice(templates)
 
-                template = random.choice(template_group)
-                for t_event in template:
-                    if weekly_usage[t_event] < MAX_EVENTS[t_event]:
-                        events.append(t_event)
-                        weekly_usage[t_event] += 1
-                template_group.remove(template)
+            if len(template_group) == 0:
+                template_group = templates[0] if templates[0] != template_group else templates[1]
+            if len(template_group) == 0:
+                continue
 
-            planned_events[current_date.date()] = events[:3]
+            template = rng.choice(template_group)
+            for t_event in template:
+                if weekly_usage[t_event] < MAX_EVENTS[t_event]:
+                    events.append(t_event)
+                    weekly_usage[t_event] += 1
+            template_group.remove(template)
 
-        current_date += timedelta(days=1)
+        planned_events[day] = events[:3]
 
     # === SECOND PASS: fill in recoveries and insert ===
     return_events = []
@@ -7460,7 +8025,7 @@ def create_events_for_other_teams(team_id, start_date, managing_team):
             endDate = datetime.datetime.combine(day, datetime.datetime.min.time()).replace(hour=endHour)
 
             eventsToAdd.append(
-                (team_id, event, startDate, endDate, True if event == "Travel" else False)
+                (event, startDate, endDate, True if event == "Travel" else False)
             )
 
         if len(eventsToAdd) != 0:
@@ -7479,107 +8044,379 @@ def teamStrength(playerIDs, role, playerOBJs):
     geom_mean = math.exp(sum(math.log(a + 1e-9) for a in abilities) / len(abilities))
     return geom_mean * (1 + 0.1 * math.log(len(abilities) + 1))
 
-def process_payload(payload):
+class SimulationContext():
+    def __init__(self, currDate, userManagerID, userTeamID, leagueByTeam, refereeSeverities, seed):
+        """
+        The save-wide values a simulation run needs, looked up once instead of by every match (and every ban in
+        process_payload). Plain data only, so it can be sent to the worker processes as it is.
+
+        Args:
+            currDate (datetime): The current date in the game world.
+            userManagerID (str): The ID of the user's manager.
+            userTeamID (str): The ID of the user's team.
+            leagueByTeam (dict): Team ID -> ID of the league the team plays in.
+            refereeSeverities (dict): Referee ID -> severity ("low", "medium", "high").
+            seed (int): The save-level simulation seed (see Settings.get_simulation_seed).
+        """
+
+        self.currDate = currDate
+        self.userManagerID = userManagerID
+        self.userTeamID = userTeamID
+        self.leagueByTeam = leagueByTeam
+        self.refereeSeverities = refereeSeverities
+        self.seed = seed
+
+    @classmethod
+    def build(cls, currDate = None):
+        """
+        Build the context from the current save.
+
+        Args:
+            currDate (datetime, optional): The current date in the game world, read from the games database if not given.
+        """
+
+        from data.gamesDatabase import Game
+
+        session = DatabaseManager().get_session()
+        try:
+            userManagerID = session.query(Managers.id).filter(Managers.user == True).first()[0]
+            userTeamID = session.query(Teams.id).filter(Teams.manager_id == userManagerID).first()[0]
+
+            leagueByTeam = {}
+            for teamID, leagueID in session.query(LeagueTeams.team_id, LeagueTeams.league_id).all():
+                leagueByTeam.setdefault(teamID, leagueID)
+
+            refereeSeverities = dict(session.query(Referees.id, Referees.severity).all())
+        finally:
+            session.close()
+
+        if currDate is None:
+            currDate = Game.get_game_date(userManagerID)
+
+        return cls(currDate, userManagerID, userTeamID, leagueByTeam, refereeSeverities, Settings.get_simulation_seed())
+
+class TeamSnapshot():
+    __slots__ = ("id", "manager_id")
+
+    def __init__(self, id, manager_id):
+        """
+        The columns of a team the match engine reads, without the logo.
+
+        Args:
+            id (str): The ID of the team.
+            manager_id (str): The ID of the team's manager.
+        """
+
+        self.id = id
+        self.manager_id = manager_id
+
+class MatchBundle():
+    def __init__(self, match, homeTeam, awayTeam, squads, bans, lastLineups, leagueByTeam, overthrowThreshold):
+        """
+        Everything the match engine reads from the save for one fixture, loaded up front (see build_all) so a
+        simulation worker can play the match without touching the database. It stands in for the Matches row (same
+        column attributes) and answers the ban lookups the engine makes with the same methods as PlayerBans.
+
+        Args:
+            match (Matches): The fixture. Only the column values are kept.
+            homeTeam (TeamSnapshot): The home team.
+            awayTeam (TeamSnapshot): The away team.
+            squads (dict): Team ID -> PlayerSimState snapshots of the team's players, ordered as get_sim_states_by_team.
+            bans (dict): Player ID -> list of (ban type, competition ID) of the player's bans.
+            lastLineups (dict): Team ID -> lineups of the team's last 5 matches, most recent first, each a list of
+                (start position, player ID).
+            leagueByTeam (dict): Team ID -> ID of the league the team plays in, for both teams.
+            overthrowThreshold (float): The overthrow threshold of the league (see get_overthrow_threshold).
+        """
+
+        self.id = match.id
+        self.league_id = match.league_id
+        self.home_id = match.home_id
+        self.away_id = match.away_id
+        self.referee_id = match.referee_id
+        self.matchday = match.matchday
+        self.date = match.date
+
+        self.homeTeam = homeTeam
+        self.awayTeam = awayTeam
+        self.squads = squads
+        self.players = {p.id: p for squad in squads.values() for p in squad}
+        self.bans = bans
+        self.lastLineups = lastLineups
+        self.leagueByTeam = leagueByTeam
+        self.overthrowThreshold = overthrowThreshold
+
+    def check_bans_for_player(self, player_id, competition_id):
+        """
+        Same as PlayerBans.check_bans_for_player.
+
+        Args:
+            player_id (str): The ID of the player.
+            competition_id (str): The ID of the competition.
+        """
+
+        return any(ban_type == "injury" or ban_competition == competition_id for ban_type, ban_competition in self.bans.get(player_id, ()))
+
+    def get_all_non_banned_players_for_comp(self, team_id, competition_id):
+        """
+        Same as PlayerBans.get_all_non_banned_players_for_comp, with snapshots instead of player rows.
+
+        Args:
+            team_id (str): The ID of the team.
+            competition_id (str): The ID of the competition.
+        """
+
+        return [p for p in self.squads[team_id] if p.player_role != "Youth Team" and not self.check_bans_for_player(p.id, competition_id)]
+
+    def get_all_non_banned_youth_players_for_comp(self, team_id, competition_id):
+        """
+        Same as PlayerBans.get_all_non_banned_youth_players_for_comp, with snapshots instead of player rows.
+
+        Args:
+            team_id (str): The ID of the team.
+            competition_id (str): The ID of the competition.
+        """
+
+        return [p for p in self.squads[team_id] if p.player_role == "Youth Team" and not self.check_bans_for_player(p.id, competition_id)]
+
+    @classmethod
+    def build_all(cls, matches, context):
+        """
+        Load the bundles of a set of fixtures with a handful of set-based queries (teams, squads, bans, last matches
+        and their lineups, league averages), instead of the per-player and per-match queries a Match makes.
+        Returns a dict of match ID -> MatchBundle.
+
+        Args:
+            matches (list): The Matches rows of the fixtures.
+            context (SimulationContext): The save-wide values of the simulation run.
+        """
+
+        teamIDs = list({teamID for match in matches for teamID in (match.home_id, match.away_id)})
+        leagueByTeam = {teamID: context.leagueByTeam[teamID] for teamID in teamIDs}
+
+        session = DatabaseManager().get_session()
+        try:
+            teams = {teamID: TeamSnapshot(teamID, managerID) for teamID, managerID in session.query(Teams.id, Teams.manager_id).filter(Teams.id.in_(teamIDs)).all()}
+
+            position_order = case(
+                [
+                    (Players.position == 'goalkeeper', 1),
+                    (Players.position == 'defender', 2),
+                    (Players.position == 'midfielder', 3),
+                    (Players.position == 'forward', 4),
+                ],
+                else_ = 5
+            )
+
+            squads = {teamID: [] for teamID in teamIDs}
+            columns = [getattr(Players, column) for column in PlayerSimState.COLUMNS]
+            for row in session.query(Players.team_id, *columns).filter(Players.team_id.in_(teamIDs)).order_by(Players.team_id, position_order).all():
+                squads[row[0]].append(PlayerSimState(*row[1:]))
+
+            bans = defaultdict(list)
+            for playerID, banType, competitionID in session.query(PlayerBans.player_id, PlayerBans.ban_type, PlayerBans.competition_id).join(Players).filter(Players.team_id.in_(teamIDs)).all():
+                bans[playerID].append((banType, competitionID))
+
+            # Last 5 matches of every team (a team plays at most once a day, so the order is the same as get_team_last_5_matches)
+            lastMatches = {teamID: [] for teamID in teamIDs}
+            pastMatches = session.query(Matches.id, Matches.home_id, Matches.away_id).filter(
+                Matches.date < context.currDate,
+                or_(Matches.home_id.in_(teamIDs), Matches.away_id.in_(teamIDs))
+            ).order_by(Matches.date.desc()).all()
+
+            for matchID, homeID, awayID in pastMatches:
+                for teamID in (homeID, awayID):
+                    if teamID in lastMatches and len(lastMatches[teamID]) < 5:
+                        lastMatches[teamID].append(matchID)
+
+            entries = defaultdict(list)
+            lastMatchIDs = list({matchID for matchIDs in lastMatches.values() for matchID in matchIDs})
+            if lastMatchIDs:
+                for matchID, teamID, startPosition, playerID in session.query(TeamLineup.match_id, Players.team_id, TeamLineup.start_position, TeamLineup.player_id).join(Players).filter(
+                    TeamLineup.match_id.in_(lastMatchIDs),
+                    TeamLineup.rating.isnot(None)
+                ).all():
+                    entries[(matchID, teamID)].append((startPosition, playerID))
+
+            lastLineups = {teamID: [entries[(matchID, teamID)] for matchID in matchIDs] for teamID, matchIDs in lastMatches.items()}
+
+            # Average current ability of every team of the leagues, for the overthrow thresholds
+            leagueAverages = defaultdict(list)
+            leagueIDs = list({match.league_id for match in matches})
+            for leagueID, _, avgCA in session.query(LeagueTeams.league_id, Teams.id, func.avg(Players.current_ability)).join(
+                Teams, Teams.id == LeagueTeams.team_id
+            ).join(Players, Players.team_id == Teams.id).filter(LeagueTeams.league_id.in_(leagueIDs)).group_by(LeagueTeams.league_id, Teams.id).all():
+                leagueAverages[leagueID].append(float(avgCA or 0.0))
+        finally:
+            session.close()
+
+        thresholds = {leagueID: 0.55 * (max(averages) - min(averages)) for leagueID, averages in leagueAverages.items()}
+
+        bundles = {}
+        for match in matches:
+            playerIDs = [p.id for teamID in (match.home_id, match.away_id) for p in squads[teamID]]
+
+            bundles[match.id] = cls(
+                match,
+                teams[match.home_id],
+                teams[match.away_id],
+                {teamID: squads[teamID] for teamID in (match.home_id, match.away_id)},
+                {playerID: bans[playerID] for playerID in playerIDs if playerID in bans},
+                {teamID: lastLineups[teamID] for teamID in (match.home_id, match.away_id)},
+                {teamID: leagueByTeam[teamID] for teamID in (match.home_id, match.away_id)},
+                thresholds.get(match.league_id, 0.0),
+            )
+
+        return bundles
+
+def process_payload(payload, context = None):
+    """
+    Save the results of simulated matches (see run_match_simulation) to the database. Everything is written in one
+    transaction: either the whole payload is saved or, if anything fails, none of it is and the error is raised again
+    so the caller can skip what depends on the results. The time taken by each stage is logged.
+
+    Args:
+        payload (dict): The pooled payload of the matches.
+        context (SimulationContext, optional): The save-wide values of the simulation run. Defaults to None.
+    """
+
+    timings = []
+    lastLap = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        timings.append((stage, now - lastLap[0]))
+        lastLap[0] = now
+
     try: 
-        goalsBefore = {}
-        for playerID, competitionID, matchID, goals in payload["player_goals_to_check"]:
-            player_goals = MatchEvents.get_goals_and_pens_by_player(playerID, competitionID)
-            goalsBefore[(playerID, competitionID, matchID, goals)] = player_goals
-
-        assistsBefore = {}
-        for playerID, competitionID, matchID in payload["player_assists_to_check"]:
-            player_assists = MatchEvents.get_assists_by_player(playerID, competitionID)
-            assistsBefore[(playerID, competitionID, matchID)] = player_assists
-    
-        cleanSheetsBefore = {}
-        for playerID, competitionID, matchID in payload["player_clean_sheets_to_check"]:
-            player_clean_sheets = MatchEvents.get_clean_sheets_by_player(playerID, competitionID)
-            cleanSheetsBefore[(playerID, competitionID, matchID)] = player_clean_sheets
-
-        call_if_not_empty(payload["team_updates"], LeagueTeams.batch_update_teams)
-        call_if_not_empty(payload["manager_updates"], Managers.batch_update_managers)
-        call_if_not_empty(payload["match_events"], MatchEvents.batch_add_events)
-        call_if_not_empty(payload["score_updates"], Matches.batch_update_scores)
-        call_if_not_empty(payload["fitness_updates"], Players.batch_update_fitness)
-        call_if_not_empty(payload["sharpness_updates"], Players.batch_update_sharpnesses)
-        call_if_not_empty(payload["morale_updates"], Players.batch_update_morales)
-        call_if_not_empty(payload["lineup_updates"], TeamLineup.batch_add_lineups)
-        call_if_not_empty(payload["stats_updates"], MatchStats.batch_add_stats)
-
-        if "players_to_update" in payload:
-            call_if_not_empty(payload["players_to_update"], Players.batch_reduce_morales_to_25)
-            call_if_not_empty(payload["emails_to_send"], Emails.batch_add_emails)
-
-        for ban in payload["player_bans"]:
-
-            player_id, competition_id, ban_length, ban_type, date = ban
-
-            sendEmail = PlayerBans.add_player_ban(player_id, competition_id, ban_length, ban_type, date)
-            player = Players.get_player_by_id(player_id)
-            userTeam = Teams.get_teams_by_manager(Managers.get_all_user_managers()[0].id)[0]
-
-            if player.team_id == userTeam.id and sendEmail:
-                emailDate = date + timedelta(days = 1)
-                if ban_type == "injury":
-                    Emails.add_email("player_injury", None, player_id, ban_length, None, emailDate.replace(hour = 8, minute = 0, second = 0, microsecond = 0), important = True)
-                else:
-                    Emails.add_email("player_ban", None, player_id, ban_length, competition_id, emailDate.replace(hour = 8, minute = 0, second = 0, microsecond = 0))
+        with DatabaseManager().unit_of_work():
+            # The totals of the scorers, assisters and keepers before this payload's events are added
+            milestonePlayers = [check[:2] for key in ("player_goals_to_check", "player_assists_to_check", "player_clean_sheets_to_check") for check in payload[key]]
+            totalsBefore = {player: (entry.goals, entry.assists, entry.clean_sheets) if entry else (0, 0, 0) for player, entry in PlayerCompetitionTotals.get_totals_by_players(milestonePlayers).items()}
+
+            lap("milestone totals before")
+
+            call_if_not_empty(payload["team_updates"], LeagueTeams.batch_update_teams)
+            lap("team updates")
+            call_if_not_empty(payload["manager_updates"], Managers.batch_update_managers)
+            lap("manager updates")
+            call_if_not_empty(payload["match_events"], MatchEvents.batch_add_events)
+            lap("match events")
+            call_if_not_empty(payload["score_updates"], Matches.batch_update_scores)
+            call_if_not_empty(payload["score_updates"], TeamStreaks.batch_add_results)
+            lap("score updates")
+            call_if_not_empty(payload["fitness_updates"], Players.batch_update_fitness)
+            lap("fitness updates")
+            call_if_not_empty(payload["sharpness_updates"], Players.batch_update_sharpnesses)
+            lap("sharpness updates")
+            call_if_not_empty(payload["morale_updates"], Players.batch_update_morales)
+            lap("morale updates")
+            call_if_not_empty(payload["lineup_updates"], TeamLineup.batch_add_lineups)
+            lap("lineup updates")
+            call_if_not_empty(payload["stats_updates"], MatchStats.batch_add_stats)
+            lap("stats updates")
+            if payload["match_events"] or payload["lineup_updates"]:
+                PlayerCompetitionTotals.batch_add_totals(payload["match_events"], payload["lineup_updates"])
+            lap("player totals")
+
+            if "players_to_update" in payload:
+                call_if_not_empty(payload["players_to_update"], Players.batch_reduce_morales_to_25)
+                call_if_not_empty(payload["emails_to_send"], Emails.batch_add_emails)
+
+            lap("unhappy players")
+
+            userTeamID = context.userTeamID if context else Teams.get_teams_by_manager(Managers.get_all_user_managers()[0].id)[0].id
+            for ban in payload["player_bans"]:
 
-        for check in payload["yellow_card_checks"]:
+                player_id, competition_id, ban_length, ban_type, date = ban
 
-            player_id, competition_id, threshold, date = check
-            MatchEvents.check_yellow_card_ban(player_id, competition_id, threshold, date)
+                sendEmail = PlayerBans.add_player_ban(player_id, competition_id, ban_length, ban_type, date)
+                player = Players.get_player_by_id(player_id)
 
-        for (playerID, competitionID, matchID, goals), before in goalsBefore.items():
-            after = before + goals
-            matchDate = Matches.get_match_by_id(matchID).date
+                if player.team_id == userTeamID and sendEmail:
+                    emailDate = date + timedelta(days = 1)
+                    if ban_type == "injury":
+                        Emails.add_email("player_injury", None, player_id, ban_length, None, emailDate.replace(hour = 8, minute = 0, second = 0, microsecond = 0), important = True)
+                    else:
+                        Emails.add_email("player_ban", None, player_id, ban_length, competition_id, emailDate.replace(hour = 8, minute = 0, second = 0, microsecond = 0))
 
-            if any(before < i <= after for i in range(10, after + 1, 10)):
-                payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "goals", after, None))
-            
-            if goals >= 3:
-                payload["news_to_add"].append(("player_goals", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, None, goals, None))
+            lap("bans")
 
-        for (playerID, competitionID, matchID), before in assistsBefore.items():
-            after = MatchEvents.get_assists_by_player(playerID, competitionID)
-            matchDate = Matches.get_match_by_id(matchID).date
+            for check in payload["yellow_card_checks"]:
 
-            if any(before < i <= after for i in range(10, after + 1, 10)):
-                payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "assists", after, None))
+                player_id, competition_id, threshold, date = check
+                MatchEvents.check_yellow_card_ban(player_id, competition_id, threshold, date)
 
-        for (playerID, competitionID, matchID), before in cleanSheetsBefore.items():
-            after = MatchEvents.get_clean_sheets_by_player(playerID, competitionID)
-            matchDate = Matches.get_match_by_id(matchID).date
+            lap("yellow card checks")
 
-            if any(before < i <= after for i in range(10, after + 1, 10)):
-                payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "clean sheets", after, None))
+            totalsAfter = {player: (entry.goals, entry.assists, entry.clean_sheets) if entry else (0, 0, 0) for player, entry in PlayerCompetitionTotals.get_totals_by_players(milestonePlayers).items()}
+            matchDates = Matches.get_dates_by_ids([check[2] for key in ("player_goals_to_check", "player_assists_to_check", "player_clean_sheets_to_check") for check in payload[key]])
 
-        payload["news_to_remove"] = []
-        for teamID, matchID, leagueID in payload["form_to_check"]:
-            winless = Matches.get_team_winless_streak(teamID, leagueID)
-            unbeatean = Matches.get_team_unbeaten_streak(teamID, leagueID)
+            for playerID, competitionID, matchID, goals in payload["player_goals_to_check"]:
+                before = totalsBefore[(playerID, competitionID)][0]
+                after = before + goals
+                matchDate = matchDates[matchID]
 
-            current_news = LeagueNews.get_news_by_type_and_team("winless_form", teamID)
-            if current_news:
-                payload["news_to_remove"].append(current_news[0].id)
+                if any(before < i <= after for i in range(10, after + 1, 10)):
+                    payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "goals", after, None))
+            
+                if goals >= 3:
+                    payload["news_to_add"].append(("player_goals", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, None, goals, None))
+
+            for playerID, competitionID, matchID in payload["player_assists_to_check"]:
+                before = totalsBefore[(playerID, competitionID)][1]
+                after = totalsAfter[(playerID, competitionID)][1]
+                matchDate = matchDates[matchID]
+
+                if any(before < i <= after for i in range(10, after + 1, 10)):
+                    payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "assists", after, None))
+
+            for playerID, competitionID, matchID in payload["player_clean_sheets_to_check"]:
+                before = totalsBefore[(playerID, competitionID)][2]
+                after = totalsAfter[(playerID, competitionID)][2]
+                matchDate = matchDates[matchID]
+
+                if any(before < i <= after for i in range(10, after + 1, 10)):
+                    payload["news_to_add"].append(("milestone", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), competitionID, None, playerID, matchID, "clean sheets", after, None))
+
+            payload["news_to_remove"] = []
+            formStreaks = TeamStreaks.get_streaks_by_teams([(teamID, leagueID) for teamID, _, leagueID in payload["form_to_check"]])
+            formNews = LeagueNews.get_first_news_by_teams(["winless_form", "unbeaten_form"], [teamID for teamID, _, _ in payload["form_to_check"]])
+            matchDates.update(Matches.get_dates_by_ids([matchID for _, matchID, _ in payload["form_to_check"]]))
+
+            for teamID, matchID, leagueID in payload["form_to_check"]:
+                streaks = formStreaks[(teamID, leagueID)]
+                winless = streaks.current_winless if streaks else 0
+                unbeatean = streaks.current_unbeaten if streaks else 0
+
+                current_news = formNews.get(("winless_form", teamID))
+                if current_news:
+                    payload["news_to_remove"].append(current_news.id)
             
-            current_news = LeagueNews.get_news_by_type_and_team("unbeaten_form", teamID)
-            if current_news:
-                payload["news_to_remove"].append(current_news[0].id)
+                current_news = formNews.get(("unbeaten_form", teamID))
+                if current_news:
+                    payload["news_to_remove"].append(current_news.id)
 
-            if winless >= 5:
-                matchDate = Matches.get_match_by_id(matchID).date
-                payload["news_to_add"].append(("winless_form", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), leagueID, None, None, matchID, None, winless, teamID))
+                if winless >= 5:
+                    matchDate = matchDates[matchID]
+                    payload["news_to_add"].append(("winless_form", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), leagueID, None, None, matchID, None, winless, teamID))
 
-            if unbeatean >= 5:
-                matchDate = Matches.get_match_by_id(matchID).date
-                payload["news_to_add"].append(("unbeaten_form", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), leagueID, None, None, matchID, None, unbeatean, teamID))
-                
-        call_if_not_empty(payload["news_to_add"], LeagueNews.batch_add_news)
-        call_if_not_empty(payload["news_to_remove"], LeagueNews.batch_remove_news)
+                if unbeatean >= 5:
+                    matchDate = matchDates[matchID]
+                    payload["news_to_add"].append(("unbeaten_form", (matchDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), leagueID, None, None, matchID, None, unbeatean, teamID))
+
+            lap("milestones and form")
+
+            call_if_not_empty(payload["news_to_add"], LeagueNews.batch_add_news)
+            call_if_not_empty(payload["news_to_remove"], LeagueNews.batch_remove_news)
+            lap("news")
+
+        lap("commit")
+        logger.info("Processed payload in %.3f seconds (%s)", sum(t for _, t in timings), ", ".join(f"{stage} {t:.3f}s" for stage, t in timings))
 
     except Exception as e:
-        print(f"Error updating teams: {e}")
+        logger.exception("Error processing the payload, nothing was saved: %s", e)
+        raise e
 
 def call_if_not_empty(data, func):
     if data:
@@ -0,0 +1,20 @@
+"""
+Rebuild the player competition totals and the team streaks of a save from its matches, match events and lineups.
+
+Usage: python rebuildTotals.py <save name>
+"""
+
+import sys
+import settings
+from data.database import DatabaseManager
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python rebuildTotals.py <save name>")
+        sys.exit(1)
+
+    db_manager = DatabaseManager()
+    db_manager.set_database(sys.argv[1])
+    db_manager.rebuild_player_totals()
+    db_manager.rebuild_team_streaks()
+    print(f"Rebuilt the player totals and team streaks of {sys.argv[1]}")
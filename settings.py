@@ -261,6 +261,13 @@ BASE_INJURY = 0.0005
 MAX_INJURY_PROB = 0.0015 # This gives P(X = 1) = 20%, P(X > 1) = 3%
 
 TICK = 30
+EVENT_DRIVEN_CLOCK = True # jump straight to the next second with work to do instead of stepping every second
+PRESAMPLE_TICKS = True # draw the per-tick chances of auto matches in NumPy blocks instead of one at a time
+BATCH_SIMULATION = True # simulate the fixtures of each worker in lockstep (MatchBatch) instead of one match at a time
+SIMULATION_WORKERS = None # number of simulation worker processes (None: one per CPU core, minus one for the game)
+SIMULATION_CHUNK_SIZE = 16 # maximum number of matches sent to a worker at once
+SIMULATION_HEALTH_TIMEOUT = 10 # seconds the simulation workers have to answer a health check before they are restarted
+SIMULATION_SHUTDOWN_TIMEOUT = 5 # seconds the simulation workers have to finish when the app closes before they are terminated
 
 PENALTY_SCORE_CHANCE = 0.8
 
@@ -974,6 +974,93 @@ class StartMenu(ctk.CTkFrame):
         """
         Starts the main game menu.
         """
+
+        if not created and self.db_manager.missing_tables():
+            self.migrateSave()
+            return
         
         self.pack_forget()
-        self.main = MainMenu(self.parent, self.chosenManagerID, created)
\ No newline at end of file
+        self.main = MainMenu(self.parent, self.chosenManagerID, created)
+
+    def migrateSave(self):
+        """
+        Adds the tables an older save is missing before it is loaded (see DatabaseManager.migrate), in a thread with
+        a progress frame since the rebuild goes through all of the save's matches.
+        """
+
+        self.disableWidgets()
+
+        self.migrationFrame = ctk.CTkFrame(self, fg_color = TKINTER_BACKGROUND, height = 200, width = 500, corner_radius = 15, border_width = 2, border_color = APP_BLUE)
+        self.migrationFrame.place(relx = 0.5, rely = 0.5, anchor = "center")
+
+        ctk.CTkLabel(self.migrationFrame, text = "Updating Save...", font = (APP_FONT_BOLD, 30), bg_color = TKINTER_BACKGROUND).place(relx = 0.5, rely = 0.2, anchor = "center")
+
+        self.migrationProgressBar = ctk.CTkSlider(
+            self.migrationFrame, 
+            fg_color = GREY_BACKGROUND, 
+            bg_color = TKINTER_BACKGROUND, 
+            corner_radius = 10, 
+            width = 400, 
+            height = 50, 
+            orientation = "horizontal", 
+            from_ = 0, 
+            to = 100, 
+            state = "disabled", 
+            button_length = 0,
+            button_color = APP_BLUE,
+            progress_color = APP_BLUE,
+            border_width = 0,
+            border_color = GREY_BACKGROUND
+        )
+
+        self.migrationProgressBar.place(relx = 0.5, rely = 0.52, anchor = "center")
+        self.migrationProgressBar.set(0)
+
+        self.migrationPercentageLabel = ctk.CTkLabel(self.migrationFrame, text = "0%", font = (APP_FONT, 20), bg_color = TKINTER_BACKGROUND)
+        self.migrationPercentageLabel.place(relx = 0.5, rely = 0.76, anchor = "center")
+
+        ctk.CTkLabel(self.migrationFrame, text = "This is only done once for this save", font = (APP_FONT, 10), bg_color = TKINTER_BACKGROUND).place(relx = 0.5, rely = 0.9, anchor = "center")
+
+        def runMigration():
+            failed = False
+            try:
+                self.db_manager.migrate(progress_callback = self.showMigrationProgress)
+            except Exception as e:
+                failed = True
+                print(f"Error updating save: {e}")
+            finally:
+                self.parent.after(0, lambda: self.migrationComplete(failed))
+
+        threading.Thread(target = runMigration, daemon = True).start()
+
+    def showMigrationProgress(self, done, total):
+        """
+        Updates the save update progress bar.
+
+        Args:
+            done (int): The number of tables added.
+            total (int): The number of tables to add.
+        """
+
+        progress = done / total
+        self.parent.after(0, lambda: [
+            self.migrationProgressBar.set(progress * 100),
+            self.migrationPercentageLabel.configure(text = f"{round(progress * 100)}%")
+        ])
+
+    def migrationComplete(self, failed):
+        """
+        Hides the save update frame and loads the save, or reports the error.
+
+        Args:
+            failed (bool): Whether the save could not be updated.
+        """
+
+        self.migrationFrame.destroy()
+        self.enableWidgets()
+
+        if failed:
+            CTkMessagebox(title = "Error", message = "This save could not be updated to the current version.", icon = "cancel")
+            return
+
+        self.startGame()
\ No newline at end of file
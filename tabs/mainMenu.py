@@ -1,12 +1,13 @@
 import threading
-import logging, time
+import logging
 import customtkinter as ctk
 from settings import *
 from data.database import *
 from data.gamesDatabase import *
 from PIL import Image
+from CTkMessagebox import CTkMessagebox
 from utils.util_functions import *
-from concurrent.futures import as_completed, ThreadPoolExecutor
+from utils.playerConditionStore import PlayerConditionStore
 
 from tabs.hub import Hub
 from tabs.inbox import Inbox
@@ -380,22 +381,7 @@ class MainMenu(ctk.CTkFrame):
                 if not Settings.get_setting("events_delegated") and self.team.id in team_list:
                     team_list.remove(self.team.id)
 
-                max_workers = len(team_list)
-                all_events_to_add = []
-                with ThreadPoolExecutor(max_workers = max_workers) as ex:
-                    self._logger.info("Preparing futures for creating calendar events (count=%d)", len(team_list))
-                    futures = [ex.submit(create_events_for_other_teams, team_id, start_day, managing_team = team_id == self.team.id) for team_id in team_list]
-                    self._logger.info("Prepared futures for creating calendar events")
-
-                    for fut in as_completed(futures):
-                        try:
-                            events = fut.result()
-                            if events:
-                                all_events_to_add.extend(events)
-                            self._logger.info("Finished creating events for a team (returned %d events)", len(events) if events else 0)
-                            self.updateProgressBar()
-                        except Exception:
-                            self._logger.exception("Calendar events worker raised an exception")
+                all_events_to_add = create_events_for_teams(team_list, start_day, managing_team = self.team.id, progress_callback = self.updateProgressBar)
                 try:
                     if all_events_to_add:
                         CalendarEvents.batch_add_events(all_events_to_add)
@@ -407,108 +393,52 @@ class MainMenu(ctk.CTkFrame):
 
         # -------------------Figuring out intervals -------------------
 
+        # All the events of the window in one query, grouped by team
+        teamEvents = {teamID: [] for teamID in teamIDs}
+        for event in CalendarEvents.get_events_dates_all(self.currDate, stopDate):
+            if event.team_id in teamEvents:
+                teamEvents[event.team_id].append(event)
+
         self._logger.debug("Computing intervals between %s and %s for %d teams", self.currDate, stopDate, len(teamIDs))
-        intervals = self.getIntervals(self.currDate, stopDate, teamIDs)
+        intervals = self.getIntervals(self.currDate, stopDate, teamEvents)
         self._logger.debug("Computed intervals count=%d", len(intervals))
 
         # ------------------- Update player attributes and carry out events ------------
 
         self._logger.info("Starting player attribute updates and event processing across %d intervals", len(intervals))
 
-        def _process_team(teamID):
-            start_time = time.perf_counter()
-            try:
-                # Set up the player attribute dictionaries
-                injuredPlayers = PlayerBans.get_team_injured_player_ids(teamID)
-                players = Players.get_all_players_by_team(teamID, youths = False)
-
-                playerFitnesses = {player.id: [player.fitness, True if player.id in injuredPlayers else False] for player in players}
-                playerSharpnesses = {player.id: player.sharpness for player in players}
-                playerMorales = {player.id: player.morale for player in players}
-
-                events_to_update = []
-                reduce_intervals = []
-
-                for start, end in intervals:
-                    timeInBetween = end - start
-
-                    events = CalendarEvents.get_events_dates(teamID, start, end)
-
-                    if len(events) == 0:
-                        # No events: update sharpness/fitness for the interval
-                        apply_attribute_changes(playerFitnesses, playerSharpnesses, timeInBetween)
-                        continue
-
-                    for event in events:
-                        # Update the player attributes based on the event type
-                        events_to_update.append(event.id)
-                        if event.event_type == "Team Building":
-                            update_dict_values(playerMorales, 10, 0, 100)
-                        elif event.event_type in EVENT_CHANGES.keys():
-                            fitness, sharpness = EVENT_CHANGES[event.event_type]
-                            update_fitness_dict_values(playerFitnesses, fitness, 0, 100)
-                            update_dict_values(playerSharpnesses, sharpness, 10, 100)
-
-                    # Record interval to later reduce injuries for this team
-                    reduce_intervals.append(timeInBetween)
-
-                elapsed = time.perf_counter() - start_time
-                self._logger.info("Finished preparing team %s in %.3f seconds", teamID, elapsed)
-
-                return {
-                    'team_id': teamID,
-                    'events': events_to_update,
-                    'fitness': playerFitnesses,
-                    'sharpness': playerSharpnesses,
-                    'morale': playerMorales,
-                    'reduce_intervals': reduce_intervals,
-                }
-            except Exception:
-                self._logger.exception("Error while processing team %s", teamID)
-                return {
-                    'team_id': teamID,
-                    'events': [],
-                    'fitness': {},
-                    'sharpness': {},
-                    'morale': {},
-                    'reduce_intervals': [],
-                }
-
-        # Run workers in a ThreadPoolExecutor (reads and in-memory computations)
-        combined_events = []
-        combined_fitness = {}
-        combined_sharpness = {}
-        combined_morale = {}
-        reduce_tasks = []
+        store = PlayerConditionStore.fromTeams(teamIDs, youths = False)
 
-        with ThreadPoolExecutor(max_workers = len(teamIDs)) as ex:
-            futures = {ex.submit(_process_team, tid): tid for tid in teamIDs}
+        restingTeams = [[] for _ in intervals] # the teams with no event going on, per interval
+        intervalEvents = [[] for _ in intervals] # (team ID, event type) of the events carried out, per interval
+        combined_events = []
 
-            for fut in as_completed(futures):
-                res = fut.result()
+        for teamID in teamIDs:
+            resting, carriedOut = walk_team_events(intervals, teamEvents[teamID])
+            for i in resting:
+                restingTeams[i].append(teamID)
 
-                # Aggregate events
-                combined_events.extend(res.get('events', []))
-                combined_fitness.update(res.get('fitness', {}))
-                combined_sharpness.update(res.get('sharpness', {}))
-                combined_morale.update(res.get('morale', {}))
+            for i, events in carriedOut.items():
+                for event in events:
+                    combined_events.append(event.id)
+                    intervalEvents[i].append((teamID, event.event_type))
 
-                # collect reduce intervals to call PlayerBans.reduce_injuries_for_team in main thread
-                if res.get('reduce_intervals'):
-                    reduce_tasks.append((res['team_id'], res['reduce_intervals']))
+            self.updateProgressBar()
 
-                self.updateProgressBar()
+        # Update the player attributes interval by interval, for all the teams at once
+        for i, (start, end) in enumerate(intervals):
+            store.rest(restingTeams[i], end - start)
+            store.applyEvents(intervalEvents[i])
 
-        # After all workers finished, perform DB writes in main thread (timed)
+        # Perform the DB writes once all the teams were processed
         try:
             if combined_events:
                 unique_events = list(set(combined_events))
                 CalendarEvents.batch_update_events(unique_events)
             self._logger.info("Applied batch calendar event updates via CalendarEvents.batch_update_events")
 
-            if combined_fitness or combined_sharpness or combined_morale:
-                Players.batch_update_player_stats(combined_fitness, combined_sharpness, combined_morale)
-                self._logger.info("Applied batch player stats updates via Players.batch_update_player_stats")
+            saved = store.save()
+            self._logger.info("Saved the fitness, sharpness and morale of %d players via PlayerConditionStore", saved)
                 
             try:
                 PlayerBans.batch_reduce_injuries(overallTimeInBetween, stopDate)
@@ -528,11 +458,16 @@ class MainMenu(ctk.CTkFrame):
             SavedLineups.delete_current_lineup()
             self.tabs[4].saveLineup()
     
-        run_match_simulation([self.currDate, stopDate], self.currDate, progress_callback = self.updateProgressBar)
+        try:
+            run_match_simulation([self.currDate, stopDate], self.currDate, progress_callback = self.updateProgressBar)
 
-        self.currDate += overallTimeInBetween
-        Game.set_game_date(self.manager_id, stopDate)
-        self._logger.debug("Updated game date to %s with %s difference", self.currDate, overallTimeInBetween)
+            self.currDate += overallTimeInBetween
+            Game.set_game_date(self.manager_id, stopDate)
+            self._logger.debug("Updated game date to %s with %s difference", self.currDate, overallTimeInBetween)
+        except Exception:
+            # none of the results were saved: the date stays where it is so the matches are played on the next try
+            self._logger.exception("The match results could not be saved, the game date was not moved")
+            self.after(0, lambda: CTkMessagebox(title = "Error", message = "The match results could not be saved. The game date was not moved.", icon = "cancel"))
 
         # ------------------- Reset/End -------------------
 
@@ -542,53 +477,23 @@ class MainMenu(ctk.CTkFrame):
         self.dateLabel.configure(text = f"Date: {self.currDate}")
         self.removeMovingFrame()
         
-    def getIntervals(self, start_date, end_date, teamIDs):
+    def getIntervals(self, start_date, end_date, teamEvents):
         """
-        Get the intervals of events for the specified teams within the given date range.
-        """
-
-        intervals = set()
-
-        # Aggregate all event intervals for the teams
-        for team_id in teamIDs:
-            teamEvents = CalendarEvents.get_events_dates(team_id, start_date, end_date)
-            for event in teamEvents:
-                intervals.add((event.start_date, event.end_date))
+        Split the given date range into consecutive intervals, cutting it at every start and end of the teams' events
+        and at every injury date (a sweep over the sorted boundaries).
 
-        # Fill in gaps between intervals (time in between events)
-        intervals = sorted(intervals)
-        numIntervals = len(intervals)
-        for i in range(numIntervals):
-            _, currIntervalEnd = intervals[i]
+        Args:
+            start_date (datetime): The start of the range.
+            end_date (datetime): The end of the range.
+            teamEvents (dict): The calendar events in the range, by team ID.
+        """
 
-            if i + 1 >= numIntervals:
-                break
+        cuts = [date for events in teamEvents.values() for event in events for date in (event.start_date, event.end_date)]
 
-            nextIntervalStart, _ = intervals[i + 1]
-            if currIntervalEnd != nextIntervalStart:
-                intervals.insert(i + 1, (currIntervalEnd, nextIntervalStart))
-                numIntervals += 1
+        # Any injuries that happen in between events split the interval in two
+        cuts.extend(inj.injury for inj in PlayerBans.get_injuries_dates(start_date, end_date))
 
-        # Add the start and end dates
-        if len(intervals) != 0:
-            intervals.insert(0, (start_date, intervals[0][0]))
-            intervals.append((intervals[-1][1], end_date))
-        else:
-            intervals.append((start_date, end_date))
-
-        # Insert injury intervals (any injuries that happen in between intervals will split the interval in two)
-        injuries = PlayerBans.get_injuries_dates(start_date, end_date)
-        for inj in injuries:
-            for i in range(len(intervals)):
-                start, end = list(intervals)[i]
-                injuryDate = inj.injury
-                if start <= injuryDate <= end:
-                    intervals.remove((start, end))
-                    intervals.append((start, injuryDate))
-                    intervals.append((injuryDate, end))
-                    break
-
-        return sorted(intervals)
+        return split_intervals(start_date, end_date, cuts)
 
     def resetMenu(self):
         """
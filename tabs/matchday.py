@@ -5,6 +5,7 @@ from data.gamesDatabase import *
 from utils.frames import MatchDayMatchFrame, FootballPitchMatchDay, FootballPitchLineup, LineupPlayerFrame, SubstitutePlayer, FormGraph, InGamePlayerFrame, InGameStatFrame, LiveTableFrame
 from utils.shouts import ShoutFrame
 from utils.util_functions import *
+from CTkMessagebox import CTkMessagebox
 import threading, time, logging, math, io
 from PIL import Image, ImageTk
 
@@ -271,6 +272,9 @@ class MatchDay(ctk.CTkFrame):
         """
         Add match frames for the current matchday, including the team match and other matches.
         """
+
+        # the save-wide values are looked up once for all the matches of the matchday
+        self.context = SimulationContext.build()
         
         for match in self.matchDay:
             if match.home_id == self.team.id or match.away_id == self.team.id:
@@ -279,7 +283,7 @@ class MatchDay(ctk.CTkFrame):
 
                 # TEAM MATCH
                 self.teamMatch = match
-                self.matchFrame = MatchDayMatchFrame(self.teamMatchFrame, match, TKINTER_BACKGROUND, 150, 400, imageSize = 70, relx =  0.5, rely =  0.03, anchor = "n", border_width = 3, border_color = GREY_BACKGROUND, pack = False)
+                self.matchFrame = MatchDayMatchFrame(self.teamMatchFrame, match, TKINTER_BACKGROUND, 150, 400, imageSize = 70, relx =  0.5, rely =  0.03, anchor = "n", border_width = 3, border_color = GREY_BACKGROUND, pack = False, context = self.context)
                 
                 self.matchDataFrame = ctk.CTkScrollableFrame(self.teamMatchFrame, width = 370, height = 300, fg_color = TKINTER_BACKGROUND, border_width = 3, border_color = GREY_BACKGROUND)
                 self.matchDataFrame.place(relx = 0.5, rely = 0.27, anchor = "n")
@@ -301,7 +305,7 @@ class MatchDay(ctk.CTkFrame):
                     self.matchFrame.matchInstance.homeFitness = {playerID: Players.get_player_by_id(playerID).fitness for playerID in list(self.teamLineup.values()) + self.teamSubstitutes}
             else:
                 # OTHER MATCHES
-                frame = MatchDayMatchFrame(self.otherMatchesFrame, match, TKINTER_BACKGROUND, 60, 300)
+                frame = MatchDayMatchFrame(self.otherMatchesFrame, match, TKINTER_BACKGROUND, 60, 300, context = self.context)
                 if not frame.played and not frame.laterGame:
                     self.playingTeams.append(match.home_id)
                     self.playingTeams.append(match.away_id)
@@ -493,28 +497,28 @@ class MatchDay(ctk.CTkFrame):
                     if frame.matchInstance:
                         for playerID, fitness in frame.matchInstance.homeFitness.items():
                             if fitness > 0 and playerID in frame.matchInstance.homeCurrentLineup.values():
-                                frame.matchInstance.homeFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness)
+                                frame.matchInstance.homeFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness, frame.matchInstance.rng)
 
                                 if frame.matchInstance.homeFitness[playerID] < 0:
                                     frame.matchInstance.homeFitness[playerID] = 0
 
                         for playerID, fitness in frame.matchInstance.awayFitness.items():
                             if fitness > 0 and playerID in frame.matchInstance.awayCurrentLineup.values():
-                                frame.matchInstance.awayFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness)
+                                frame.matchInstance.awayFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness, frame.matchInstance.rng)
 
                                 if frame.matchInstance.awayFitness[playerID] < 0:
                                     frame.matchInstance.awayFitness[playerID] = 0
 
                 for playerID, fitness in self.matchFrame.matchInstance.homeFitness.items():
                     if fitness > 0 and playerID in self.matchFrame.matchInstance.homeCurrentLineup.values():
-                        self.matchFrame.matchInstance.homeFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness)
+                        self.matchFrame.matchInstance.homeFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness, self.matchFrame.matchInstance.rng)
 
                         if self.matchFrame.matchInstance.homeFitness[playerID] < 0:
                             self.matchFrame.matchInstance.homeFitness[playerID] = 0
 
                 for playerID, fitness in self.matchFrame.matchInstance.awayFitness.items():
                     if fitness > 0 and playerID in self.matchFrame.matchInstance.awayCurrentLineup.values():
-                        self.matchFrame.matchInstance.awayFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness)
+                        self.matchFrame.matchInstance.awayFitness[playerID] = fitness - getFitnessDrop(Players.get_player_by_id(playerID), fitness, self.matchFrame.matchInstance.rng)
 
                         if self.matchFrame.matchInstance.awayFitness[playerID] < 0:
                             self.matchFrame.matchInstance.awayFitness[playerID] = 0
@@ -556,50 +560,14 @@ class MatchDay(ctk.CTkFrame):
                 for frame in self.otherMatchesFrame.winfo_children():
                     if frame.matchInstance:
                         frame.matchInstance.halfTime = True
-                        eventsExtraTime = 0
-                        maxMinute = 0
-                        firstHalfEvents = 0
-                        combined_events = {**frame.matchInstance.homeEvents, **frame.matchInstance.awayEvents}
-                        for event_time, event_details in list(combined_events.items()):
-                            minute = int(event_time.split(":")[0])
-                            if event_details["extra"] and minute < 90: # first half extra time events
-                                eventsExtraTime += 1
-                                
-                                if minute + 1 > maxMinute:
-                                    maxMinute = minute + 1
-
-                            elif minute < 45 and event_details["type"] != "substitution":
-                                firstHalfEvents += 1
-
-                        if maxMinute - 45 < firstHalfEvents:
-                            extraTime = min(firstHalfEvents, 5)
-                        else:
-                            extraTime = maxMinute - 45
+                        extraTime = frame.matchInstance.getExtraTime(firstHalf = True)
 
                         if extraTime > self.maxExtraTimeHalf:
                             self.maxExtraTimeHalf = extraTime
 
                         frame.matchInstance.extraTimeHalf = extraTime
 
-                eventsExtraTime = 0
-                maxMinute = 0
-                firstHalfEvents = 0
-                combined_events = {**self.matchFrame.matchInstance.homeEvents, **self.matchFrame.matchInstance.awayEvents}
-                for event_time, event_details in list(combined_events.items()):
-                    minute = int(event_time.split(":")[0])
-                    if event_details["extra"] and minute < 90: # first hald extra time events
-                        eventsExtraTime += 1
-                        
-                        if minute + 1 > maxMinute:
-                            maxMinute = minute + 1
-
-                    elif minute < 45 and event_details["type"] != "susbtitution":
-                        firstHalfEvents += 1
-                
-                if maxMinute - 45 < firstHalfEvents:
-                    extraTime = min(firstHalfEvents, 5)
-                else:
-                    extraTime = maxMinute - 45
+                extraTime = self.matchFrame.matchInstance.getExtraTime(firstHalf = True)
 
                 if extraTime > self.maxExtraTimeHalf:
                     self.maxExtraTimeHalf = extraTime
@@ -654,50 +622,14 @@ class MatchDay(ctk.CTkFrame):
                 for frame in self.otherMatchesFrame.winfo_children():
                     if frame.matchInstance:
                         frame.matchInstance.fullTime = True
-                        eventsExtraTime = 0
-                        maxMinute = 0
-                        secondHalfEvents = 0
-                        combined_events = {**frame.matchInstance.homeEvents, **frame.matchInstance.awayEvents}
-                        for event_time, event_details in list(combined_events.items()):
-                            minute = int(event_time.split(":")[0])
-                            if event_details["extra"] and minute > 90: # second half extra time events
-                                eventsExtraTime += 1
-                                
-                                if minute + 1 > maxMinute:
-                                    maxMinute = minute + 1
-
-                            elif minute > 45 and not event_details["extra"] and event_details["type"] != "substitution":
-                                secondHalfEvents += 1
-
-                        if maxMinute - 90 < secondHalfEvents:
-                            extraTime = min(secondHalfEvents, 5)
-                        else:
-                            extraTime = maxMinute - 90
+                        extraTime = frame.matchInstance.getExtraTime(firstHalf = False)
 
                         if extraTime > self.maxExtraTimeFull:
                             self.maxExtraTimeFull = extraTime
 
                         frame.matchInstance.extraTimeFull = extraTime
 
-                eventsExtraTime = 0
-                maxMinute = 0
-                secondHalfEvents = 0
-                combined_events = {**self.matchFrame.matchInstance.homeEvents, **self.matchFrame.matchInstance.awayEvents}
-                for event_time, event_details in list(combined_events.items()):
-                    minute = int(event_time.split(":")[0])
-                    if event_details["extra"] and minute > 90: # first hald extra time events
-                        eventsExtraTime += 1
-                        
-                        if minute + 1 > maxMinute:
-                            maxMinute = minute + 1
-
-                    elif minute > 45 and not event_details["extra"] and event_details["type"] != "susbtitution":
-                        secondHalfEvents += 1
-
-                if maxMinute - 90 < secondHalfEvents:
-                    extraTime = min(secondHalfEvents, 5)
-                else:
-                    extraTime = maxMinute - 90
+                extraTime = self.matchFrame.matchInstance.getExtraTime(firstHalf = False)
 
                 if extraTime > self.maxExtraTimeFull:
                     self.maxExtraTimeFull = extraTime
@@ -763,7 +695,7 @@ class MatchDay(ctk.CTkFrame):
                     frame.FTLabel()
                 
                 for event_time, event_details in list(frame.matchInstance.homeEvents.items()):
-                    if event_time == str(minutes) + ":" + str(seconds) and event_time not in frame.matchInstance.homeProcessedEvents:
+                    if parse_event_time(event_time) == minutes * 60 + seconds and event_time not in frame.matchInstance.homeProcessedEvents:
                         if event_details["extra"]:
                             if self.halfTime or self.fullTime:
                                 if event_details["type"] in ["own_goal", "goal", "penalty_goal"]:
@@ -782,7 +714,7 @@ class MatchDay(ctk.CTkFrame):
                                 frame.matchInstance.homeProcessedEvents[event_time] = event_details
                 
                 for event_time, event_details in list(frame.matchInstance.awayEvents.items()):
-                    if event_time == str(minutes) + ":" + str(seconds) and event_time not in frame.matchInstance.awayProcessedEvents:
+                    if parse_event_time(event_time) == minutes * 60 + seconds and event_time not in frame.matchInstance.awayProcessedEvents:
                         if event_details["extra"]:
                             if self.halfTime or self.fullTime:
                                 if event_details["type"] in ["own_goal", "goal", "penalty_goal"]:
@@ -900,7 +832,7 @@ class MatchDay(ctk.CTkFrame):
             - If injury or red card and your team is the home team, make a substitution
             """
             for event_time, event_details in list(self.matchFrame.matchInstance.homeEvents.items()):
-                if event_time == str(minutes) + ":" + str(seconds) and event_time not in self.matchFrame.matchInstance.homeProcessedEvents:
+                if parse_event_time(event_time) == minutes * 60 + seconds and event_time not in self.matchFrame.matchInstance.homeProcessedEvents:
                     if event_details["extra"]:
                         if self.halfTime or self.fullTime:
                             if event_details["type"] in ["own_goal", "goal", "penalty_goal"]:
@@ -944,7 +876,7 @@ class MatchDay(ctk.CTkFrame):
             - If injury or red card and your team is the away team, make a substitution
             """
             for event_time, event_details in list(self.matchFrame.matchInstance.awayEvents.items()):
-                if event_time == str(minutes) + ":" + str(seconds) and event_time not in self.matchFrame.matchInstance.awayProcessedEvents:
+                if parse_event_time(event_time) == minutes * 60 + seconds and event_time not in self.matchFrame.matchInstance.awayProcessedEvents:
                     if event_details["extra"]:
                         if self.halfTime or self.fullTime:
                             if event_details["type"] in ["own_goal", "goal", "penalty_goal"]:
@@ -1021,6 +953,7 @@ class MatchDay(ctk.CTkFrame):
 
         playerOBJs = matchInstance.homePlayersOBJ if side == "home" else matchInstance.awayPlayersOBJ 
         oppPlayersOBJ = matchInstance.awayPlayersOBJ if side == "home" else matchInstance.homePlayersOBJ
+        rng = matchInstance.rng
 
         if teamMatch:
             pitch = self.homeLineupPitch if side == "home" else self.awayLineupPitch
@@ -1049,14 +982,14 @@ class MatchDay(ctk.CTkFrame):
         defendingLevel = teamStrength(defendingPlayers, "defend", oppPlayersOBJ)
 
         # ------------------ GOAL ------------------
-        event = goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper)
+        event = goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper, rng = rng)
 
         if event == "goal":
 
-            goalType = random.choices(list(GOAL_TYPE_CHANCES.keys()), weights = list(GOAL_TYPE_CHANCES.values()), k = 1)[0]
+            goalType = GOAL_TYPE_SAMPLER.sample(rng)
 
             if goalType == "penalty":
-                if random.random() < PENALTY_SCORE_CHANCE or "Goalkeeper" not in oppLineup:
+                if rng.random() < PENALTY_SCORE_CHANCE or "Goalkeeper" not in oppLineup:
                     goalType = "penalty_goal"
                     matchInstance.appendScore(1, True if side == "home" else False)
                 else:
@@ -1066,13 +999,13 @@ class MatchDay(ctk.CTkFrame):
             
             eventsToAdd.append(goalType)
 
-            if random.random() < GOAL_BIG_CHANCE:
+            if rng.random() < GOAL_BIG_CHANCE:
                 statsToAdd.append("Big chances created")
         elif event != "nothing":
             statsToAdd.append(event)
 
         # ------------------ FOUL ------------------
-        event = foulChances(avgSharpnessWthKeeper, matchInstance.referee.severity)
+        event = foulChances(avgSharpnessWthKeeper, matchInstance.refereeSeverity, rng)
 
         if event in ["yellow_card", "red_card"]:
             eventsToAdd.append(event)
@@ -1080,26 +1013,26 @@ class MatchDay(ctk.CTkFrame):
             statsToAdd.append(event)
         else:
             # If nothing, get tackles and interceptions
-            tacklesInterceptions = random.choices(population = list(DEFENSIVE_ACTIONS_CHANCES.keys()), weights = list(DEFENSIVE_ACTIONS_CHANCES.values()), k = 1)[0]
+            tacklesInterceptions = DEFENSIVE_ACTIONS_SAMPLER.sample(rng)
 
             if tacklesInterceptions != "nothing":
                 statsToAdd.append(tacklesInterceptions)
 
         # ------------------ INJURY ------------------
-        event = injuryChances(avgFitness)
+        event = injuryChances(avgFitness, rng)
 
         if event == "injury":
             eventsToAdd.append(event)
 
         # ------------------ SUBSTITUTIONS ------------------
         if not teamMatch:
-            subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, int(self.timeLabel.cget("text").split(":")[0]), fitness, playerOBJs, ratings)
+            subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, int(self.timeLabel.cget("text").split(":")[0]), fitness, playerOBJs, ratings, rng)
             for _ in range(len(subsChosen)):
                 eventsToAdd.append("substitution")
 
         else:
             if (self.home and side == "away") or (not self.home and side == "home"):
-                subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, int(self.timeLabel.cget("text").split(":")[0]), fitness, playerOBJs, ratings)
+                subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, int(self.timeLabel.cget("text").split(":")[0]), fitness, playerOBJs, ratings, rng)
                 for _ in range(len(subsChosen)):
                     eventsToAdd.append("substitution")
 
@@ -1125,30 +1058,26 @@ class MatchDay(ctk.CTkFrame):
         subsChosenCount = 0
         for event in eventsToAdd:
             try:
-                eventTotalSecs = random.randint(currTotalSecs + 10, endTotalSecs)
+                eventTotalSecs = rng.randint(currTotalSecs + 10, endTotalSecs)
             except ValueError:
                 break
 
-            # Convert back to mm:ss
-            eventMin = eventTotalSecs // 60
-            eventSec = eventTotalSecs % 60
-            eventTime = f"{eventMin}:{eventSec:02d}"
-
             if event == "substitution":
                 # substitution event needs entries such as player off/on and positions
-                matchEvents[eventTime] = {"type": "substitution", "extra": extraTime, "player_off": subsChosen[subsChosenCount][0], "player_on": subsChosen[subsChosenCount][2], "old_position": subsChosen[subsChosenCount][1], "new_position": subsChosen[subsChosenCount][3], "injury": False}
+                matchEvents.add(eventTotalSecs, {"type": "substitution", "extra": extraTime, "player_off": subsChosen[subsChosenCount][0], "player_on": subsChosen[subsChosenCount][2], "old_position": subsChosen[subsChosenCount][1], "new_position": subsChosen[subsChosenCount][3], "injury": False})
                 subsChosenCount += 1
             elif event == "penalty_miss":
                 # penalty miss needs to know the opponent keeper
-                matchEvents[eventTime] = {"type": event, "extra": extraTime, "keeper": oppLineup["Goalkeeper"] if "Goalkeeper" in oppLineup else None}
+                matchEvents.add(eventTotalSecs, {"type": event, "extra": extraTime, "keeper": oppLineup["Goalkeeper"] if "Goalkeeper" in oppLineup else None})
             else:
-                matchEvents[eventTime] = {"type": event, "extra": extraTime}
+                matchEvents.add(eventTotalSecs, {"type": event, "extra": extraTime})
 
+        lineupIndex = matchInstance.getLineupIndex(side == "home")
         for stat in statsToAdd:
 
             if stat in PLAYER_STATS:
                 # Get the player associated with the stat
-                playerID, rating = getStatPlayer(stat, lineup, playerOBJs)
+                playerID, rating = getStatPlayer(stat, lineup, playerOBJs, rng, lineupIndex)
                 ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
             
                 if teamMatch:
@@ -1166,23 +1095,23 @@ class MatchDay(ctk.CTkFrame):
                     case "Shots":
                         # For shots, get the direction, outcome, xG and big chance created/missed
 
-                        shotDirection = random.choices(population = list(SHOT_DIRECTION_CHANCES.keys()), weights = list(SHOT_DIRECTION_CHANCES.values()), k = 1)[0]
+                        shotDirection = SHOT_DIRECTION_SAMPLER.sample(rng)
                         if not playerID in stats[shotDirection]:
                             stats[shotDirection][playerID] = 0
 
                         stats[shotDirection][playerID] += 1
 
-                        shotOutcome = random.choices(population = list(SHOT_CHANCES.keys()), weights = list(SHOT_CHANCES.values()), k = 1)[0]
+                        shotOutcome = SHOT_SAMPLER.sample(rng)
                         if shotOutcome != "wide":
                             stats[shotOutcome] += 1
 
-                        if random.random() < SHOT_BIG_CHANCE:
+                        if rng.random() < SHOT_BIG_CHANCE:
                             if not playerID in stats["Big chances missed"]:
                                 stats["Big chances missed"][playerID] = 0
 
                             stats["Big chances missed"][playerID] += 1
 
-                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs)
+                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs, rng, lineupIndex)
                             ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                             if teamMatch:
@@ -1193,7 +1122,7 @@ class MatchDay(ctk.CTkFrame):
 
                             stats["Big chances created"][playerID] += 1
 
-                        stats["xG"] += round(random.uniform(0.02, MAX_XG), 2)
+                        stats["xG"] += round(rng.uniform(0.02, MAX_XG), 2)
                         stats["xG"] = round(stats["xG"], 2)
                     case "Shots on target":
                         # For shots on target, add to shots, xG, big chance created/missed, and add a save to opponent keeper stats
@@ -1203,19 +1132,19 @@ class MatchDay(ctk.CTkFrame):
                         
                         stats["Shots"][playerID] += 1
 
-                        shotDirection = random.choices(population = list(SHOT_DIRECTION_CHANCES.keys()), weights = list(SHOT_DIRECTION_CHANCES.values()), k = 1)[0]
+                        shotDirection = SHOT_DIRECTION_SAMPLER.sample(rng)
                         if not playerID in stats[shotDirection]:
                             stats[shotDirection][playerID] = 0
                         
                         stats[shotDirection][playerID] += 1
 
-                        if random.random() < SHOT_BIG_CHANCE:
+                        if rng.random() < SHOT_BIG_CHANCE:
                             if not playerID in stats["Big chances missed"]:
                                 stats["Big chances missed"][playerID] = 0
 
                             stats["Big chances missed"][playerID] += 1
 
-                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs)
+                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs, rng, lineupIndex)
                             ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                             if teamMatch:
@@ -1226,7 +1155,7 @@ class MatchDay(ctk.CTkFrame):
 
                             stats["Big chances created"][playerID] += 1
 
-                        playerID, rating = getStatPlayer("Saves", oppLineup, oppPlayersOBJ)
+                        playerID, rating = getStatPlayer("Saves", oppLineup, oppPlayersOBJ, rng)
                         if playerID:
                             if playerID not in oppStats["Saves"]:
                                 oppStats["Saves"][playerID] = 0
@@ -1237,7 +1166,7 @@ class MatchDay(ctk.CTkFrame):
                             if teamMatch:
                                 self.updateRatingOval(oppPitch, playerID, oppLineup, oppRatings)
 
-                        stats["xG"] += round(random.uniform(0.02, MAX_XG), 2)
+                        stats["xG"] += round(rng.uniform(0.02, MAX_XG), 2)
                         stats["xG"] = round(stats["xG"], 2)
             else:
                 stats[stat] += 1
@@ -2187,14 +2116,14 @@ class MatchDay(ctk.CTkFrame):
             
             events = matchInstance.homeEvents if home else matchInstance.awayEvents
             addEvent = True
-            for event_time, event_data in events.items():
-                eventMinute = int(event_time.split(":")[0])
+            for eventSeconds, event_data in events.entries():
+                eventMinute = eventSeconds // 60
                 if eventMinute < 55 and eventMinute > 45 and (event_data["type"] == "goal" or event_data["type"] == "penalty_goal" or event_data["type"] == "own_goal") and not event_data["extra"]:
                     addEvent = False
                     break
 
             if addEvent:
-                type_ = random.choices(list(GOAL_TYPE_CHANCES.keys()), weights = [GOAL_TYPE_CHANCES[goalType] for goalType in GOAL_TYPE_CHANCES])[0]
+                type_ = GOAL_TYPE_SAMPLER.sample()
                 if type_ == "penalty":
                     type_ = "penalty_goal"
 
@@ -2205,7 +2134,7 @@ class MatchDay(ctk.CTkFrame):
                 if minute >= 90:
                     extra = True
 
-                events[str(minute) + ":" + str(second)] = {"type": type_, "extra": extra}
+                events.add(minute * 60 + second, {"type": type_, "extra": extra})
                 matchInstance.appendScore(1, home)
 
         homeScore = int(self.matchFrame.score.split("-")[0])
@@ -2478,7 +2407,18 @@ class MatchDay(ctk.CTkFrame):
                     payload[k].append(p[k])
 
         logger.debug("Processing combined payload.")
-        process_payload(payload)
+        try:
+            process_payload(payload, self.matchFrame.matchInstance.context)
+        except Exception:
+            # nothing of the matchday was saved: leave without the post match updates and without moving the date
+            logger.exception("The matchday results could not be saved")
+            CTkMessagebox(title = "Error", message = "The results of the matchday could not be saved. The game date was not moved.", icon = "cancel")
+
+            self.pack_forget()
+            self.update_idletasks()
+            self.parent.resetMenu()
+            return
+
         logger.debug("Payload processing complete.")
 
         ## Post match updates
@@ -2489,7 +2429,7 @@ class MatchDay(ctk.CTkFrame):
         logger.debug("Checking if all matches are complete for the matchday.")
         if League.check_all_matches_complete(self.league.id, currDate):
             logger.debug("All matches complete, creating team of the week and team history.")
-            _, email = League.team_of_the_week(self.league.id, self.matchFrame.matchInstance.matchday, team = self.matchFrame.matchInstance.homeTeam.id if self.home else self.matchFrame.matchInstance.awayTeam.id)
+            _, email = League.team_of_the_week(self.league.id, self.matchFrame.matchInstance.matchday, team = self.matchFrame.matchInstance.homeTeam.id if self.home else self.matchFrame.matchInstance.awayTeam.id, cache = True)
             logger.debug("Team of the week created.")
             for team in LeagueTeams.get_teams_by_league(self.league.id):
                 matchday = League.get_current_matchday(self.league.id)
@@ -2514,8 +2454,13 @@ class MatchDay(ctk.CTkFrame):
 
         ## Simulate other leagues' matches in the given interval
         logger.debug("Simulating matches for other leagues.")
-        run_match_simulation([currDate, currDate + timedelta(hours = 2)], currDate, exclude_leagues = [self.league.id])
-        logger.debug("Match simulation complete.")
+        try:
+            run_match_simulation([currDate, currDate + timedelta(hours = 2)], currDate, exclude_leagues = [self.league.id])
+            logger.debug("Match simulation complete.")
+        except Exception:
+            # the matchday itself was saved, only the other leagues' results of the interval were lost
+            logger.exception("The other leagues' results could not be saved")
+            CTkMessagebox(title = "Error", message = "The results of the other leagues' matches could not be saved.", icon = "cancel")
 
         SavedLineups.delete_current_lineup()
         Players.reset_talked_to()
@@ -0,0 +1,45 @@
+import unittest
+import settings
+from data.database import MatchEvents, PlayerCompetitionTotals
+
+class TestGameTime(unittest.TestCase):
+    def test_exits_and_entries(self):
+        self.assertEqual(MatchEvents.game_time({}), 90)
+        self.assertEqual(MatchEvents.game_time({"sub_off": 60}), 60)
+        self.assertEqual(MatchEvents.game_time({"sub_on": 60}), 30)
+        self.assertEqual(MatchEvents.game_time({"sub_on": 20, "sub_off": 75}), 55)
+        self.assertEqual(MatchEvents.game_time({"red_card": 40}), 40)
+        self.assertEqual(MatchEvents.game_time({"sub_on": 50, "red_card": 80}), 30)
+        self.assertEqual(MatchEvents.game_time({"injury": 33}), 33)
+        self.assertEqual(MatchEvents.game_time({"sub_on": 46, "injury": 70}), 24)
+
+class TestCountRows(unittest.TestCase):
+    def test_minutes(self):
+        leagueByMatch = {"m1": "league", "m2": "league", "m3": "cup"}
+        events = [
+            ("m1", "sub_off", "60", "a"),
+            ("m1", "sub_on", "60", "b"),
+            ("m1", "goal", "70", "b"),
+            ("m2", "red_card", "45+2", "a"),
+            ("m3", "injury", "12", "a"),
+        ]
+        lineups = [
+            ("m1", "a", 6.5, None),
+            ("m1", "b", 7.0, None),
+            ("m1", "c", None, "benched"),
+            ("m2", "a", 5.0, None),
+            ("m3", "a", 6.0, None),
+        ]
+
+        totals = PlayerCompetitionTotals.count_rows(events, lineups, leagueByMatch)
+
+        self.assertEqual(totals[("a", "league")]["minutes"], 60 + 47)
+        self.assertEqual(totals[("a", "cup")]["minutes"], 12)
+        self.assertEqual(totals[("b", "league")]["minutes"], 30)
+        self.assertEqual(totals[("b", "league")]["goals"], 1)
+        self.assertEqual(totals[("a", "league")]["red_cards"], 1)
+        self.assertEqual(totals[("a", "league")]["appearances"], 2)
+        self.assertNotIn(("c", "league"), totals)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest, subprocess, sys, os, json, pickle, tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET = 3.0 # seconds importing settings and data.database may take (about 0.5s on a recent machine)
+
+def runScript(script, cwd = REPO):
+    """
+    Run a script in a fresh interpreter (nothing imported yet) with the repo on the path, recording the .pkl files it
+    opens, and return the JSON it prints on its last line.
+    """
+
+    prelude = (
+        "import sys, json, time\n"
+        f"sys.path.insert(0, {REPO!r})\n"
+        "opened = []\n"
+        "sys.addaudithook(lambda event, args: opened.append(str(args[0])) if event == 'open' and str(args[0]).endswith('.pkl') else None)\n"
+    )
+
+    output = subprocess.run([sys.executable, "-c", prelude + script], cwd = cwd, capture_output = True, text = True, timeout = 120)
+    if output.returncode != 0:
+        raise AssertionError(output.stderr)
+
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+class TestImportBudget(unittest.TestCase):
+    def test_database_import_time(self):
+        result = runScript(
+            "start = time.perf_counter()\n"
+            "import settings\n"
+            "import data.database\n"
+            "print(json.dumps({'seconds': time.perf_counter() - start, 'opened': opened}))\n"
+        )
+
+        self.assertLess(result["seconds"], IMPORT_BUDGET)
+        self.assertEqual(result["opened"], [], "the name generator models were opened at import")
+
+    def test_name_generators_loaded_once_on_first_use(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "data", "models"))
+            for name in ("first", "last"):
+                with open(os.path.join(directory, "data", "models", f"{name}_name_generator.pkl"), "wb") as f:
+                    pickle.dump({"model": name}, f)
+
+            result = runScript(
+                "import settings\n"
+                "import data.database as database\n"
+                "before = list(opened)\n"
+                "first = database.get_name_generators()\n"
+                "second = database.get_name_generators()\n"
+                "print(json.dumps({'before': before, 'opened': opened, 'models': first, 'same': first is second}))\n",
+                cwd = directory
+            )
+
+        self.assertEqual(result["before"], [])
+        self.assertEqual([os.path.basename(path) for path in result["opened"]], ["first_name_generator.pkl", "last_name_generator.pkl"])
+        self.assertEqual(result["models"], [{"model": "first"}, {"model": "last"}])
+        self.assertTrue(result["same"])
+
+if __name__ == "__main__":
+    unittest.main()
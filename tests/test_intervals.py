@@ -0,0 +1,159 @@
+import unittest, datetime
+import settings
+from types import SimpleNamespace
+from utils.util_functions import split_intervals, walk_team_events
+
+DAY = datetime.datetime(2025, 8, 1)
+
+def at(hour, minute = 0):
+    return DAY + datetime.timedelta(hours = hour, minutes = minute)
+
+def event(id, start, end, event_type = "Medium Training"):
+    return SimpleNamespace(id = id, start_date = start, end_date = end, event_type = event_type)
+
+# The interval split and per-interval event lookup moveDate did before the sweep (the reference for the new walk)
+
+def baseline_intervals(start_date, end_date, teamEvents, injuries):
+    intervals = set()
+    for events in teamEvents.values():
+        for e in events:
+            intervals.add((e.start_date, e.end_date))
+
+    intervals = sorted(intervals)
+    numIntervals = len(intervals)
+    for i in range(numIntervals):
+        _, currIntervalEnd = intervals[i]
+
+        if i + 1 >= numIntervals:
+            break
+
+        nextIntervalStart, _ = intervals[i + 1]
+        if currIntervalEnd != nextIntervalStart:
+            intervals.insert(i + 1, (currIntervalEnd, nextIntervalStart))
+            numIntervals += 1
+
+    if len(intervals) != 0:
+        intervals.insert(0, (start_date, intervals[0][0]))
+        intervals.append((intervals[-1][1], end_date))
+    else:
+        intervals.append((start_date, end_date))
+
+    for injuryDate in injuries:
+        for i in range(len(intervals)):
+            start, end = list(intervals)[i]
+            if start <= injuryDate <= end:
+                intervals.remove((start, end))
+                intervals.append((start, injuryDate))
+                intervals.append((injuryDate, end))
+                break
+
+    return sorted(intervals)
+
+def baseline_walk(intervals, events):
+    resting, carriedOut = [], {}
+    for i, (start, end) in enumerate(intervals):
+        overlapping = [e for e in events if e.start_date < end and e.end_date > start]
+        if len(overlapping) == 0:
+            resting.append(i)
+        else:
+            carriedOut[i] = overlapping
+
+    return resting, carriedOut
+
+def intervals_cuts(teamEvents, injuries):
+    return [date for events in teamEvents.values() for e in events for date in (e.start_date, e.end_date)] + injuries
+
+class TestIntervals(unittest.TestCase):
+    def setUp(self):
+        self.start, self.end = at(8), at(32)
+
+    def assertPartition(self, intervals):
+        self.assertEqual(intervals[0][0], self.start)
+        self.assertEqual(intervals[-1][1], self.end)
+        for (_, end), (nextStart, nextEnd) in zip(intervals, intervals[1:]):
+            self.assertEqual(end, nextStart)
+            self.assertLess(nextStart, nextEnd)
+
+    def test_same_as_baseline(self):
+        """
+        Teams training at the same times, with an injury that ends in the middle of the rest between two sessions: the
+        baseline intervals don't overlap here, so the split and the walk must give exactly the same result.
+        """
+
+        teamEvents = {
+            "a": [event("a1", at(9), at(11)), event("a2", at(14), at(16), "Recovery")],
+            "b": [event("b1", at(9), at(11)), event("b2", at(14), at(16), "Intense Training")],
+            "c": [],
+        }
+        injuries = [at(12, 30)]
+
+        intervals = split_intervals(self.start, self.end, intervals_cuts(teamEvents, injuries))
+        self.assertEqual(intervals, baseline_intervals(self.start, self.end, teamEvents, injuries))
+        self.assertIn((at(11), at(12, 30)), intervals)
+        self.assertIn((at(12, 30), at(14)), intervals)
+
+        for teamID, events in teamEvents.items():
+            self.assertEqual(walk_team_events(intervals, events), baseline_walk(intervals, events), teamID)
+
+    def test_overlapping_events(self):
+        """
+        Events of different teams that overlap each other, and injuries ending mid-rest and mid-event. The baseline
+        intervals overlap (and some are reversed) there, so the result is checked against them where they agree: the
+        same cut points and the same events carried out. Each event is carried out once, where the baseline did it again
+        in every interval it overlapped.
+        """
+
+        teamEvents = {
+            "a": [event("a1", at(9), at(11)), event("a2", at(14), at(16))],
+            "b": [event("b1", at(10), at(12)), event("b2", at(11), at(13), "Team Building"), event("b3", at(14), at(16))],
+            "c": [],
+        }
+        injuries = [at(13, 30), at(15)]
+
+        intervals = split_intervals(self.start, self.end, intervals_cuts(teamEvents, injuries))
+        baseline = baseline_intervals(self.start, self.end, teamEvents, injuries)
+
+        self.assertPartition(intervals)
+
+        # the baseline stopped filling the gaps after as many intervals as it started with: it lost the rest between
+        # 13:00 and 14:00, and the injury ending in it
+        self.assertNotIn((at(13), at(14)), baseline)
+        self.assertIn((at(13), at(13, 30)), intervals)
+        self.assertEqual({date for interval in intervals for date in interval}, {date for interval in baseline for date in interval} | {at(13, 30)})
+
+        for teamID, events in teamEvents.items():
+            resting, carriedOut = walk_team_events(intervals, events)
+
+            applied = [e.id for i in sorted(carriedOut) for e in carriedOut[i]]
+            self.assertEqual(sorted(applied), sorted(e.id for e in events))
+
+            _, baselineCarriedOut = baseline_walk(baseline, events)
+            self.assertEqual(set(applied), {e.id for overlapping in baselineCarriedOut.values() for e in overlapping})
+
+            # the team rests exactly over the intervals none of its events cover
+            covered = [i for i, (start, end) in enumerate(intervals) if any(e.start_date < end and e.end_date > start for e in events)]
+            self.assertEqual(resting, [i for i in range(len(intervals)) if i not in covered], teamID)
+
+            # each event in the interval it starts in (or the first one, if it started before the range)
+            for i, overlapping in carriedOut.items():
+                for e in overlapping:
+                    self.assertTrue(intervals[i][0] <= e.start_date < intervals[i][1], e.id)
+
+        # the injury at 15:00 splits the afternoon session, which is still carried out once
+        resting, carriedOut = walk_team_events(intervals, teamEvents["a"])
+        self.assertNotIn(intervals.index((at(15), at(16))), resting)
+        self.assertEqual([e.id for e in carriedOut[intervals.index((at(14), at(15)))]], ["a2"])
+
+    def test_event_started_before_the_range(self):
+        events = [event("early", at(6), at(9)), event("late", at(31), at(34))]
+        intervals = split_intervals(self.start, self.end, [date for e in events for date in (e.start_date, e.end_date)])
+
+        self.assertEqual(intervals, [(at(8), at(9)), (at(9), at(31)), (at(31), at(32))])
+        self.assertEqual(walk_team_events(intervals, events), ([1], {0: [events[0]], 2: [events[1]]}))
+
+    def test_no_events(self):
+        self.assertEqual(split_intervals(self.start, self.end, []), [(self.start, self.end)])
+        self.assertEqual(walk_team_events([(self.start, self.end)], []), ([0], {}))
+
+if __name__ == "__main__":
+    unittest.main()
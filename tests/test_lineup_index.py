@@ -0,0 +1,36 @@
+import unittest, random
+import settings
+from types import SimpleNamespace
+from utils.lineupIndex import LineupIndex
+from utils.sampler import PASSING_POSITIONS_SAMPLER, SCORER_SAMPLER, TableSampler
+
+def snapshot(position, ability):
+    return SimpleNamespace(position = position, effective_ability = ability)
+
+class TestLineupIndex(unittest.TestCase):
+    def test_weighted_positions(self):
+        playerOBJs = {"gk": snapshot("goalkeeper", 80), "d": snapshot("defender", 60), "m": snapshot("midfielder", 70)}
+        index = LineupIndex({"Goalkeeper": "gk", "Center Back": "d", "Central Midfielder": "m"}, playerOBJs)
+
+        rng = random.Random(1)
+        picks = {index.choose(TableSampler({"defender": 1, "forward": 5}), rng) for _ in range(200)}
+        self.assertEqual(picks, {"d"})
+
+    def test_falls_back_to_the_lineup(self):
+        # only players of positions with no weight are left (e.g. after red cards and injuries)
+        playerOBJs = {"gk": snapshot("goalkeeper", 80), "d": snapshot("defender", 0), "x": snapshot("defender", 0)}
+        index = LineupIndex({"Goalkeeper": "gk", "Center Back": "d"}, playerOBJs)
+
+        rng = random.Random(2)
+        for sampler in (TableSampler({"forward": 1}), PASSING_POSITIONS_SAMPLER, SCORER_SAMPLER):
+            picks = [index.choose(sampler, rng) for _ in range(200)]
+            self.assertTrue(set(picks) <= {"gk", "d"})
+
+        # weighted by effective ability: the defender has none
+        self.assertEqual({index.choose(TableSampler({"forward": 1}), rng) for _ in range(200)}, {"gk"})
+
+    def test_empty_lineup(self):
+        self.assertIsNone(LineupIndex({}, {}).choose(PASSING_POSITIONS_SAMPLER, random.Random(3)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest, itertools
+import numpy as np
+import settings
+from types import SimpleNamespace
+from utils.matchBatch import goalProbabilityArrays, foulProbabilityArrays, injuryProbabilityArrays, GOAL_EVENTS, FOUL_EVENTS, INJURY_EVENTS, SEVERITY_FACTORS, NO_KEEPER, OUTFIELD_KEEPER, GOALKEEPER
+from utils.util_functions import goalProbabilities, foulProbabilities, injuryProbabilities
+
+LEVELS = [0, 20, 45, 60, 80, 100, 140]
+CONDITIONS = [0, 10, 35, 50, 75, 100]
+
+KEEPERS = [
+    (NO_KEEPER, None),
+    (OUTFIELD_KEEPER, SimpleNamespace(position = "defender", current_ability = 120, sharpness = 80)),
+] + [(GOALKEEPER, SimpleNamespace(position = "goalkeeper", current_ability = ability, sharpness = sharpness)) for ability in (20, 100, 200) for sharpness in (10, 60, 100)]
+
+class TestProbabilityArrays(unittest.TestCase):
+    """
+    The array versions in MatchBatch repeat the formulas of the scalar functions, so they are checked against them
+    over a grid of inputs.
+    """
+
+    def test_goal_probabilities(self):
+        rows, expected = [], []
+        for (keeperType, keeper), attacking, defending, sharpness, morale, boost in itertools.product(KEEPERS, LEVELS, LEVELS, CONDITIONS, CONDITIONS, (1.0, 1.5)):
+            keeperModifier = (keeper.current_ability / 200) * (keeper.sharpness / 100) if keeperType == GOALKEEPER else 0.0
+            rows.append((attacking, defending, sharpness, morale, keeperType, keeperModifier, boost))
+
+            events, probs = goalProbabilities(attacking, defending, sharpness, morale, keeper, boost)
+            self.assertEqual(tuple(events), GOAL_EVENTS)
+            expected.append(probs)
+
+        columns = np.array(rows).T
+        for boost in (1.0, 1.5):
+            mask = columns[6] == boost
+            arrays = goalProbabilityArrays(*columns[:4, mask], columns[4, mask].astype(np.int8), columns[5, mask], boost)
+            np.testing.assert_allclose(arrays, np.array(expected)[mask], rtol = 0, atol = 1e-12)
+
+    def test_foul_probabilities(self):
+        sharpness = np.array([s for s in range(0, 101, 5) for _ in SEVERITY_FACTORS], dtype = float)
+        severities = [severity for _ in range(0, 101, 5) for severity in SEVERITY_FACTORS]
+
+        arrays = foulProbabilityArrays(sharpness, np.array([SEVERITY_FACTORS[severity] for severity in severities]))
+        for row, (value, severity) in enumerate(zip(sharpness, severities)):
+            events, probs = foulProbabilities(value, severity)
+            self.assertEqual(tuple(events), FOUL_EVENTS)
+            np.testing.assert_allclose(arrays[row], probs, rtol = 0, atol = 1e-12)
+
+    def test_injury_probabilities(self):
+        fitness = np.array(range(0, 101), dtype = float)
+
+        arrays = injuryProbabilityArrays(fitness)
+        for row, value in enumerate(fitness):
+            events, probs = injuryProbabilities(value)
+            if value == 0: # no injury possible: the scalar version leaves the outcome out
+                events, probs = INJURY_EVENTS, list(probs) + [0.0]
+            self.assertEqual(tuple(events), INJURY_EVENTS)
+            np.testing.assert_allclose(arrays[row], probs, rtol = 0, atol = 1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest, random, math, datetime
+import settings
+from settings import EVENT_CHANGES, DAILY_SHARPNESS_DECAY, DAILY_FITNESS_RECOVERY_RATE, MIN_SHARPNESS
+from utils.playerConditionStore import PlayerConditionStore
+
+EVENT_TYPES = list(EVENT_CHANGES) + ["Team Building", "Match"]
+
+# The dict based updates moveDate made before the store, player by player (the reference for the store)
+
+def apply_attribute_changes(fitness_map, sharpness_map, time_in_between):
+    hours = int(time_in_between.total_seconds() // 3600)
+    if hours <= 0:
+        return
+
+    sharpness_decay_factor = (1 - DAILY_SHARPNESS_DECAY / 24.0) ** hours
+    fitness_recovery_factor = (1 - DAILY_FITNESS_RECOVERY_RATE / 24.0) ** hours
+
+    for pid, sharpness in sharpness_map.items():
+        new_sharpness = sharpness * sharpness_decay_factor
+        if new_sharpness < MIN_SHARPNESS:
+            new_sharpness = MIN_SHARPNESS
+        sharpness_map[pid] = int(round(new_sharpness))
+
+    for pid, (fitness, injured) in fitness_map.items():
+        if injured:
+            continue
+
+        new_fitness = 100 - (100 - fitness) * fitness_recovery_factor
+        fitness_map[pid] = [int(math.ceil(min(100, new_fitness))), injured]
+
+def update_dict_values(values_dict, amount, min_value, max_value):
+    for k, v in values_dict.items():
+        values_dict[k] = int(round(min(max(v + amount, min_value), max_value)))
+
+def update_fitness_dict_values(values_dict, amount, min_value, max_value):
+    for k, (v, injured) in values_dict.items():
+        if not injured:
+            values_dict[k] = [int(round(min(max(v + amount, min_value), max_value))), injured]
+
+def apply_events(fitnesses, sharpnesses, morales, eventTypes):
+    for eventType in eventTypes:
+        if eventType == "Team Building":
+            update_dict_values(morales, 10, 0, 100)
+        elif eventType in EVENT_CHANGES:
+            fitness, sharpness = EVENT_CHANGES[eventType]
+            update_fitness_dict_values(fitnesses, fitness, 0, 100)
+            update_dict_values(sharpnesses, sharpness, 10, 100)
+
+class TestPlayerConditionStore(unittest.TestCase):
+    def setUp(self):
+        """
+        Three teams of players with values at and near the limits (0, 10, 100) as well as in between, some of them
+        injured.
+        """
+
+        rng = random.Random(11)
+        edges = [0, 1, 5, 10, 11, 50, 95, 99, 100]
+
+        self.rows, self.injured = [], set()
+        for i in range(60):
+            team = f"t{i % 3}"
+            values = [rng.choice(edges) if rng.random() < 0.5 else rng.randint(0, 100) for _ in range(3)]
+            self.rows.append((f"p{i}", team, *values))
+            if rng.random() < 0.25:
+                self.injured.add(f"p{i}")
+
+        self.rng = rng
+
+    def reference(self):
+        """
+        The per-team dicts of the old moveDate.
+        """
+
+        teams = {}
+        for player_id, team_id, fitness, sharpness, morale in self.rows:
+            fitnesses, sharpnesses, morales = teams.setdefault(team_id, ({}, {}, {}))
+            fitnesses[player_id] = [fitness, player_id in self.injured]
+            sharpnesses[player_id] = sharpness
+            morales[player_id] = morale
+
+        return teams
+
+    def assertSameAsReference(self, store, teams):
+        for row, player_id in enumerate(store.ids):
+            team_id = self.rows[row][1]
+            fitnesses, sharpnesses, morales = teams[team_id]
+
+            self.assertEqual(int(store.fitness[row]), fitnesses[player_id][0], player_id)
+            self.assertEqual(int(store.sharpness[row]), sharpnesses[player_id], player_id)
+            self.assertEqual(int(store.morale[row]), morales[player_id], player_id)
+
+    def test_matches_dict_updates(self):
+        store = PlayerConditionStore(self.rows, self.injured)
+        teams = self.reference()
+
+        for _ in range(40):
+            timeInBetween = datetime.timedelta(hours = self.rng.choice([0, 1, 3, 7, 24, 50]), minutes = self.rng.choice([0, 30]))
+
+            teamEvents = []
+            for team_id in sorted(teams):
+                if self.rng.random() < 0.5:
+                    # no events: the team rests over the interval
+                    apply_attribute_changes(teams[team_id][0], teams[team_id][1], timeInBetween)
+                    store.rest([team_id], timeInBetween)
+                else:
+                    eventTypes = [self.rng.choice(EVENT_TYPES) for _ in range(self.rng.randint(1, 3))]
+                    apply_events(*teams[team_id], eventTypes)
+                    teamEvents.extend((i, team_id, eventType) for i, eventType in enumerate(eventTypes))
+
+            # the teams' events interleaved, each team's in order (the clamps make the order matter)
+            teamEvents.sort(key = lambda event: event[0])
+            store.applyEvents([(team_id, eventType) for _, team_id, eventType in teamEvents])
+
+            self.assertSameAsReference(store, teams)
+
+    def test_injured_fitness_unchanged(self):
+        store = PlayerConditionStore(self.rows, self.injured)
+        store.rest(["t0", "t1", "t2"], datetime.timedelta(days = 3))
+        store.applyEvents([("t0", "Recovery"), ("t1", "Intense Training"), ("t2", "Medium Training")])
+
+        for row, (player_id, _, fitness, _, _) in enumerate(self.rows):
+            if player_id in self.injured:
+                self.assertEqual(int(store.fitness[row]), fitness)
+
+    def test_clamps(self):
+        rows = [("low", "t", 0, 10, 0), ("high", "t", 100, 100, 100)]
+        store = PlayerConditionStore(rows, set())
+
+        store.applyEvents([("t", "Intense Training"), ("t", "Team Building"), ("t", "Team Building")])
+        self.assertEqual(store.fitness.tolist(), [0, 85])
+        self.assertEqual(store.sharpness.tolist(), [25, 100])
+        self.assertEqual(store.morale.tolist(), [20, 100])
+
+        store.applyEvents([("t", "Recovery")] * 6)
+        self.assertEqual(store.fitness.tolist(), [100, 100])
+
+        store.rest(["t"], datetime.timedelta(days = 400))
+        self.assertEqual(store.sharpness.tolist(), [MIN_SHARPNESS, MIN_SHARPNESS])
+
+    def test_changes(self):
+        store = PlayerConditionStore(self.rows, self.injured)
+        self.assertEqual(store.changes(), [])
+
+        store.applyEvents([("t1", "Team Building")])
+        changed = {change["player_id"] for change in store.changes()}
+        self.assertEqual(changed, {row[0] for row in self.rows if row[1] == "t1" and row[4] < 100})
+
+if __name__ == "__main__":
+    unittest.main()
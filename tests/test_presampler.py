@@ -0,0 +1,67 @@
+import unittest, random
+import numpy as np
+from utils.presampler import TickPresampler
+from utils.util_functions import goalProbabilities, foulProbabilities, injuryProbabilities
+
+# chi-square critical values at p = 0.001, by degrees of freedom
+CHI_SQUARE_CRITICAL = {1: 10.83, 2: 13.82, 3: 16.27, 4: 18.47, 5: 20.52, 6: 22.46}
+
+DRAWS = 200000
+
+def chiSquare(counts, probs, draws):
+    """
+    Chi-square statistic of the observed counts of each event against the expected ones.
+    """
+
+    total = sum(probs)
+    return sum((counts.get(i, 0) - draws * p / total) ** 2 / (draws * p / total) for i, p in enumerate(probs))
+
+class TestTickPresampler(unittest.TestCase):
+    def checkTable(self, name, events, probs):
+        """
+        Draw the table with the presampler and with random.choices, and check both fit the probabilities and each other.
+        """
+
+        presampler = TickPresampler(np.random.default_rng(7))
+        rng = random.Random(7)
+        index = {event: i for i, event in enumerate(events)}
+
+        presampled, choices = {}, {}
+        for _ in range(DRAWS):
+            event = index[presampler.draw(("home", name), lambda: (events, probs))]
+            presampled[event] = presampled.get(event, 0) + 1
+
+            event = index[rng.choices(events, weights = probs, k = 1)[0]]
+            choices[event] = choices.get(event, 0) + 1
+
+        critical = CHI_SQUARE_CRITICAL[len(events) - 1]
+        self.assertLess(chiSquare(presampled, probs, DRAWS), critical, f"{name}: presampled {presampled}")
+        self.assertLess(chiSquare(choices, probs, DRAWS), critical, f"{name}: random.choices {choices}")
+
+        # the two samples come from the same distribution (two-sample chi-square)
+        statistic = sum((presampled.get(i, 0) - choices.get(i, 0)) ** 2 / (presampled.get(i, 0) + choices.get(i, 0)) for i in range(len(events)) if presampled.get(i, 0) + choices.get(i, 0))
+        self.assertLess(statistic, critical, f"{name}: {presampled} vs {choices}")
+
+    def test_goal_table(self):
+        events, probs = goalProbabilities(60, 55, 70, 60, None)
+        self.checkTable("goal", events, probs)
+
+    def test_foul_table(self):
+        events, probs = foulProbabilities(70, "high")
+        self.checkTable("foul", events, probs)
+
+    def test_injury_table(self):
+        events, probs = injuryProbabilities(40)
+        self.checkTable("injury", events, probs)
+
+    def test_discard_recompiles(self):
+        presampler = TickPresampler(np.random.default_rng(1))
+
+        self.assertEqual(presampler.draw(("home", "goal"), lambda: (["a", "b"], [1, 0])), "a")
+        self.assertEqual(presampler.draw(("home", "goal"), lambda: (["a", "b"], [0, 1])), "a") # still compiled
+
+        presampler.discard(("home", "goal"))
+        self.assertEqual(presampler.draw(("home", "goal"), lambda: (["a", "b"], [0, 1])), "b")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest, os, tempfile, datetime, random
+import settings
+from settings import FORMATIONS_POSITIONS
+from data.database import DatabaseManager, League, Matches, Players, TeamLineup, TeamsOfTheWeek
+
+POSITIONS = FORMATIONS_POSITIONS["4-3-3 DM"]
+
+class TestTeamOfTheWeek(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a save in a temporary directory with one league, two teams and a played matchday: both teams play
+        twice, every player starts in a "4-3-3 DM" position with a random rating, and some come off the bench.
+        """
+
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.makedirs("data")
+
+        self.db = DatabaseManager()
+        self.db.copy_active = False
+        self.db.set_database("test", create_tables = True)
+
+        rng = random.Random(3)
+        session = self.db.get_session()
+        session.add(League(id = "league", name = "League", year = 2025, promotion = 0, relegation = 0, loaded = True, to_be_loaded = False))
+
+        matches = [("m1", "home", "away", 1), ("m2", "away", "home", 1), ("m3", "home", "away", 2)]
+        for match_id, home_id, away_id, matchday in matches:
+            session.add(Matches(id = match_id, league_id = "league", home_id = home_id, away_id = away_id, matchday = matchday, date = datetime.datetime(2025, 8, matchday)))
+
+        for team_id in ("home", "away"):
+            for i, position in enumerate(POSITIONS + ["Striker Left", "Goalkeeper"]):
+                player_id = f"{team_id}{i}"
+                session.add(Players(
+                    id = player_id, team_id = team_id, first_name = "A", last_name = player_id, current_ability = 100, potential_ability = 100, number = i + 1,
+                    position = "midfielder", specific_positions = "CM", date_of_birth = datetime.date(2000, 1, 1), age = 25, nationality = "A", player_role = "First Team"
+                ))
+
+                for match_id in ("m1", "m2"):
+                    if position in POSITIONS:
+                        session.add(TeamLineup(match_id = match_id, player_id = player_id, start_position = position, end_position = position, rating = rng.uniform(4, 9)))
+                    else:
+                        session.add(TeamLineup(match_id = match_id, player_id = player_id, start_position = None, end_position = position, rating = rng.uniform(4, 9)))
+
+        session.commit()
+        session.close()
+
+    def tearDown(self):
+        self.db.scoped_session.remove()
+        self.db.engine.dispose()
+        self.db.copy_active = False
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def savedRows(self, matchday):
+        session = self.db.get_session()
+        try:
+            return session.query(TeamsOfTheWeek).filter(TeamsOfTheWeek.matchday == matchday).count()
+        finally:
+            session.close()
+
+    def test_cached_matches_fresh(self):
+        fresh = League.team_of_the_week("league", 1, team = "home")
+        self.assertEqual(self.savedRows(1), 0)
+
+        computed = League.team_of_the_week("league", 1, team = "home", cache = True)
+        self.assertEqual(self.savedRows(1), len(POSITIONS))
+
+        cached = League.team_of_the_week("league", 1, team = "home")
+        self.assertTrue(all(player for player, _ in fresh[0].values()))
+        self.assertEqual(computed, fresh)
+        self.assertEqual(cached, fresh)
+
+    def test_incomplete_matchday_not_cached(self):
+        League.team_of_the_week("league", 2, cache = True)
+        self.assertEqual(self.savedRows(2), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest, os, tempfile, datetime
+import settings
+from settings import EVENT_TIMES
+from data.database import DatabaseManager, Matches, create_events_for_teams, plan_week_slots
+
+START = datetime.datetime(2025, 8, 4) # a Monday
+MATCH_DAYS = (datetime.datetime(2025, 8, 6, 15), datetime.datetime(2025, 8, 9, 15)) # Wednesday and Saturday
+
+HOME_TEAMS = [f"h{i}" for i in range(4)]
+AWAY_TEAMS = [f"a{i}" for i in range(4)]
+
+class TestWeekEvents(unittest.TestCase):
+    def setUp(self):
+        """
+        Create a save in a temporary directory with eight teams paired up for two matches in the week: the home teams all
+        share one pattern of match days and the away teams another.
+        """
+
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.makedirs("data")
+
+        self.db = DatabaseManager()
+        self.db.copy_active = False
+        self.db.set_database("test", create_tables = True)
+
+        session = self.db.get_session()
+        for matchday, date in enumerate(MATCH_DAYS, 1):
+            for home_id, away_id in zip(HOME_TEAMS, AWAY_TEAMS):
+                session.add(Matches(id = f"{home_id}{matchday}", league_id = "league", home_id = home_id, away_id = away_id, matchday = matchday, date = date))
+
+        session.commit()
+        session.close()
+
+    def tearDown(self):
+        self.db.scoped_session.remove()
+        self.db.engine.dispose()
+        self.db.copy_active = False
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def weeks(self, team_ids, seed = 1):
+        weeks = {team_id: {} for team_id in team_ids}
+        for team_id, event_type, start_date, end_date, travel in create_events_for_teams(team_ids, START, seed = seed):
+            weeks[team_id].setdefault(start_date.date(), []).append((event_type, start_date, end_date, travel))
+
+        return weeks
+
+    def assertValidWeek(self, week, slots):
+        """
+        The team's events fit the slots of its week: nothing on match days, at most three events a day at the event
+        times, the review and preparation around the matches, and at least two recoveries.
+        """
+
+        kinds = {day: (kind, is_home) for day, kind, is_home in slots}
+        for date in MATCH_DAYS:
+            self.assertNotIn(date.date(), week)
+
+        recoveries = 0
+        for day, events in week.items():
+            self.assertIn(day, kinds)
+            self.assertLessEqual(len(events), 3)
+
+            for i, (event_type, start_date, end_date, travel) in enumerate(events):
+                self.assertEqual((start_date.hour, end_date.hour), tuple(EVENT_TIMES[i]))
+                self.assertEqual(travel, event_type == "Travel")
+                recoveries += event_type == "Recovery"
+
+            names = [event[0] for event in events]
+            kind, is_home = kinds[day]
+            if kind == "review":
+                self.assertIn("Match Review", names)
+            elif kind == "prep":
+                self.assertEqual(names[-1], "Match Preparation")
+            if kind != "training":
+                self.assertEqual("Travel" in names, not is_home)
+
+        self.assertGreaterEqual(recoveries, 2)
+
+    def test_same_pattern_drawn_per_team(self):
+        weeks = self.weeks(HOME_TEAMS + AWAY_TEAMS)
+
+        for teams in (HOME_TEAMS, AWAY_TEAMS):
+            homes = {date.date(): teams is HOME_TEAMS for date in MATCH_DAYS}
+            slots = plan_week_slots(START, sum(1 << date.weekday() for date in MATCH_DAYS), homes)
+
+            for team_id in teams:
+                self.assertValidWeek(weeks[team_id], slots)
+
+            # the same slots, but not the same picks for every team
+            self.assertGreater(len({repr(sorted(weeks[team_id].items())) for team_id in teams}), 1)
+
+    def test_team_week_independent_of_other_teams(self):
+        weeks = self.weeks(HOME_TEAMS + AWAY_TEAMS)
+
+        for team_id in (HOME_TEAMS[1], AWAY_TEAMS[2]):
+            self.assertEqual(self.weeks([team_id])[team_id], weeks[team_id])
+
+        self.assertNotEqual(self.weeks(HOME_TEAMS, seed = 2), self.weeks(HOME_TEAMS))
+
+if __name__ == "__main__":
+    unittest.main()
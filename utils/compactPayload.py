@@ -0,0 +1,216 @@
+import uuid, datetime
+import numpy as np
+
+# Column kinds, with the dtype of their values (a column of another kind is kept as a plain list, kind "o")
+STRING, INT, FLOAT, NUMBER, DATE, OBJECT = "s", "i", "f", "n", "d", "o"
+NUMBER_TYPES = (None, int, float) # the types of the values of a NUMBER column, by type code
+
+class CompactPayload():
+    def __init__(self):
+        """
+        Columnar form of the payloads of several matches (see Match.getPayload), for sending them from a simulation
+        worker to the main process.
+
+        Each payload key is kept as one column per tuple position, with the rows of all the matches one after the
+        other. Strings (ids, event types, stat names, positions) are stored once in a shared table and the columns
+        only hold their index in it (-1 for None). Numbers and dates are NumPy arrays, anything else is kept as a list.
+        When pickled, the arrays are sent as raw bytes and the ids in the table as 16 bytes instead of 36 characters.
+
+        Parts from several workers are joined with concat and turned back into the usual lists of tuples, ready for
+        the bulk inserts of process_payload, with toPayload.
+        """
+
+        self.strings = []
+        self.codes = {} # string -> index in strings
+        self.columns = {} # payload key -> list of (kind, values), one per position in the rows
+
+    @classmethod
+    def fromPayloads(cls, payloads):
+        """
+        Pack the payloads of a set of matches, keeping the order of their rows.
+
+        Args:
+            payloads (list): The payload dicts of the matches.
+        """
+
+        compact = cls()
+
+        for key in {key: None for payload in payloads for key in payload}:
+            rows = [row for payload in payloads for row in payload.get(key, [])]
+            compact.columns[key] = [compact.encodeColumn(values) for values in zip(*rows)]
+
+        return compact
+
+    @classmethod
+    def concat(cls, parts):
+        """
+        Join packed payloads into one, the rows of each part following those of the previous one. The string tables
+        are merged and the string columns remapped with one NumPy lookup per column.
+
+        Args:
+            parts (list): The CompactPayloads to join, in order.
+        """
+
+        compact = cls()
+        mappings = [np.array([compact.intern(string) for string in part.strings] + [-1], dtype = np.int32) for part in parts]
+
+        for key in {key: None for part in parts for key in part.columns}:
+            # the parts with rows for this key
+            keyParts = [(part, mapping) for part, mapping in zip(parts, mappings) if part.columns.get(key)]
+
+            joined = []
+            for position in range(len(keyParts[0][0].columns[key]) if keyParts else 0):
+                columns = [(part, part.columns[key][position], mapping) for part, mapping in keyParts]
+                kinds = {kind for _, (kind, _), _ in columns}
+
+                if kinds == {STRING}:
+                    # -1 (None) picks the -1 added at the end of each mapping
+                    joined.append((STRING, np.concatenate([mapping[values] for _, (_, values), mapping in columns])))
+                elif len(kinds) == 1 and kinds <= {INT, FLOAT, DATE}:
+                    joined.append((kinds.pop(), np.concatenate([values for _, (_, values), _ in columns])))
+                else:
+                    values = []
+                    for part, column, _ in columns:
+                        values.extend(part.decodeColumn(column))
+                    joined.append(compact.encodeColumn(values))
+
+            compact.columns[key] = joined
+
+        return compact
+
+    def intern(self, string):
+        """
+        Get the index of a string in the table, adding it if needed (-1 for None).
+
+        Args:
+            string (str): The string.
+        """
+
+        if string is None:
+            return -1
+
+        code = self.codes.get(string)
+        if code is None:
+            code = len(self.strings)
+            self.codes[string] = code
+            self.strings.append(string)
+
+        return code
+
+    def encodeColumn(self, values):
+        """
+        Pack one column of rows.
+
+        Args:
+            values (tuple): The values of the column, one per row.
+        """
+
+        types = {type(value) for value in values}
+
+        if types <= {str, type(None)}:
+            return (STRING, np.array([self.intern(value) for value in values], dtype = np.int32))
+        if types == {int}:
+            return (INT, np.array(values, dtype = np.int64))
+        if types == {float}:
+            return (FLOAT, np.array(values, dtype = np.float64))
+        if types <= {int, float, type(None)}:
+            # float values, with the type of each value to give back ints as ints and None as None
+            typeCodes = np.array([NUMBER_TYPES.index(None if value is None else type(value)) for value in values], dtype = np.int8)
+            return (NUMBER, (np.array([value if value is not None else 0 for value in values], dtype = np.float64), typeCodes))
+        if types <= {datetime.datetime, type(None)}:
+            return (DATE, np.array(values, dtype = "datetime64[us]")) # None is NaT
+
+        return (OBJECT, list(values))
+
+    def decodeColumn(self, column):
+        """
+        Unpack one column into a list of values.
+
+        Args:
+            column (tuple): The (kind, values) of the column.
+        """
+
+        kind, values = column
+
+        if kind == STRING:
+            table = self.strings + [None]
+            return [table[code] for code in values.tolist()]
+        if kind == NUMBER:
+            numbers, typeCodes = values
+            return [NUMBER_TYPES[code](number) if code else None for number, code in zip(numbers.tolist(), typeCodes.tolist())]
+        if kind == OBJECT:
+            return values
+
+        return values.tolist()
+
+    def toPayload(self):
+        """
+        Unpack into a payload dict of lists of tuples.
+        """
+
+        return {key: list(zip(*(self.decodeColumn(column) for column in columns))) for key, columns in self.columns.items()}
+
+    def __getstate__(self):
+        """
+        Pickle the arrays as raw bytes and the ids of the string table as 16 bytes each.
+        """
+
+        ids, others, isID = [], [], []
+        for string in self.strings:
+            try:
+                isUUID = len(string) == 36 and str(uuid.UUID(string)) == string
+            except ValueError:
+                isUUID = False
+
+            isID.append(isUUID)
+            if isUUID:
+                ids.append(uuid.UUID(string).bytes)
+            else:
+                others.append(string)
+
+        def packArray(array):
+            # whole numbers are sent in the smallest integer type they fit in (string codes, stats, fitness, ...)
+            packed = array
+            if array.size and array.dtype.kind in "iuf" and np.isfinite(array).all() and (array == np.round(array)).all():
+                packed = array.astype(np.result_type(np.min_scalar_type(int(array.min())), np.min_scalar_type(int(array.max()))))
+            return (array.dtype.str, packed.dtype.str, packed.tobytes())
+
+        columns = {}
+        for key, keyColumns in self.columns.items():
+            columns[key] = []
+            for kind, values in keyColumns:
+                if kind == NUMBER:
+                    values = (packArray(values[0]), packArray(values[1]))
+                elif kind != OBJECT:
+                    values = packArray(values)
+                columns[key].append((kind, values))
+
+        return {"isID": np.array(isID, dtype = bool).tobytes(), "ids": b"".join(ids), "others": others, "columns": columns}
+
+    def __setstate__(self, state):
+        """
+        Rebuild the string table and the arrays from the pickled state (see __getstate__).
+
+        Args:
+            state (dict): The pickled state.
+        """
+
+        ids = iter(state["ids"][i:i + 16] for i in range(0, len(state["ids"]), 16))
+        others = iter(state["others"])
+
+        self.strings = [str(uuid.UUID(bytes = next(ids))) if isUUID else next(others) for isUUID in np.frombuffer(state["isID"], dtype = bool).tolist()]
+        self.codes = {string: code for code, string in enumerate(self.strings)}
+
+        def unpackArray(packed):
+            dtype, packedDtype, data = packed
+            return np.frombuffer(data, dtype = packedDtype).astype(dtype)
+
+        self.columns = {}
+        for key, keyColumns in state["columns"].items():
+            self.columns[key] = []
+            for kind, values in keyColumns:
+                if kind == NUMBER:
+                    values = (unpackArray(values[0]), unpackArray(values[1]))
+                elif kind != OBJECT:
+                    values = unpackArray(values)
+                self.columns[key].append((kind, values))
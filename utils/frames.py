@@ -3243,7 +3243,7 @@ class SubstitutePlayer(ctk.CTkFrame):
         self.configure(border_color = PIE_RED, border_width = 2)
 
 class MatchDayMatchFrame(ctk.CTkFrame):
-    def __init__(self, parent, match, fgColor, height, width, imageSize = 40, relx = 0, rely = 0, anchor = "nw", border_width = None, border_color = None, pack = True):
+    def __init__(self, parent, match, fgColor, height, width, imageSize = 40, relx = 0, rely = 0, anchor = "nw", border_width = None, border_color = None, pack = True, context = None):
         """
         Frame representing a match in-game (frames on the right when playing a game), found in-game.
 
@@ -3260,6 +3260,8 @@ class MatchDayMatchFrame(ctk.CTkFrame):
             border_width (int, optional): The border width of the frame. Defaults to None.
             border_color (str, optional): The border color of the frame. Defaults to None.
             pack (bool, optional): Whether to pack the frame or place it. Defaults to True.
+            context (SimulationContext, optional): The save-wide values of the matchday, shared by all its matches.
+                Built for this match if not given. Defaults to None.
         """
 
         super().__init__(parent, fg_color = fgColor, width = width, height = height, border_width = border_width, border_color = border_color)
@@ -3274,7 +3276,7 @@ class MatchDayMatchFrame(ctk.CTkFrame):
 
         self.score = "0 - 0"
 
-        currDate = Game.get_game_date(Managers.get_all_user_managers()[0].id)
+        currDate = context.currDate if context else Game.get_game_date(Managers.get_all_user_managers()[0].id)
         self.played = Matches.check_game_played(match, currDate)
 
         if currDate + timedelta(hours = 2) < match.date:
@@ -3284,7 +3286,7 @@ class MatchDayMatchFrame(ctk.CTkFrame):
 
         # Create match instance only if the match is not played and not a later game
         if not self.played and not self.laterGame:
-            self.matchInstance = Match(self.match, teamMatch = not self.packFrame)
+            self.matchInstance = Match(self.match, teamMatch = not self.packFrame, context = context)
         else:
             self.matchInstance = None
 
@@ -3509,6 +3511,8 @@ class FormGraph(ctk.CTkCanvas):
         # Ensure minimum scale of 5 for better visibility
         scale_max = max(max_rating + 1, 5)
 
+        gameTimes = MatchEvents.get_game_times(self.player.id, [match.id for match in self.last5])
+
         for i, match in enumerate(reversed(self.last5)):
             lineup = TeamLineup.get_lineup_by_match(match.id)
             playerIDs = [player.player_id for player in lineup]
@@ -3525,7 +3529,7 @@ class FormGraph(ctk.CTkCanvas):
             playerLineupData = [player for player in lineup if player.player_id == self.player.id][0]
             rating = playerLineupData.rating
 
-            timePlayed = MatchEvents.get_player_game_time(self.player.id, match.id)
+            timePlayed = gameTimes[match.id]
 
             # Determine bar color based on rating
             if rating >= 7:
@@ -4894,7 +4898,7 @@ class TeamOTW(ctk.CTkFrame):
         self.league_id = league_id
         self.matchday = matchday
 
-        self.team = League.team_of_the_week(self.league_id, self.matchday)[0]
+        self.team = League.team_of_the_week(self.league_id, self.matchday, cache = True)[0]
         self.pitch = FootballPitchTeamOTW(self, self.team, 300, 550, 0.5, 0.5, "center", GREY_BACKGROUND, "green")
 
 class DataPolygon(ctk.CTkCanvas):
@@ -0,0 +1,84 @@
+import bisect, itertools
+from utils.sampler import TableSampler
+
+class LineupIndex():
+    def __init__(self, lineup, playerOBJs):
+        """
+        The players of a lineup grouped by general position, with the cumulative effective ability weights of each
+        group, so a weighted pick does not filter the whole lineup every time.
+
+        Position tables (TableSampler) are pruned to the positions present in the lineup the first time they are
+        used with this index, so a pick never has to retry because the drawn position is empty.
+
+        Args:
+            lineup (dict): Current lineup with positions as keys and player IDs as values.
+            playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
+        """
+
+        self.key = tuple(lineup.values())
+        self.players = {pid: p for pid, p in playerOBJs.items() if pid in self.key} # lineup players only
+
+        groups = {}
+        for playerID in self.key:
+            groups.setdefault(playerOBJs[playerID].position, []).append(playerID)
+
+        self.positions = {position: self.weigh(playerIDs, playerOBJs) for position, playerIDs in groups.items()}
+        self.everyone = self.weigh(list(self.key), playerOBJs) if self.key else None # when no weighted position is left
+
+
+        self.samplers = {} # full table sampler -> sampler pruned to the positions in the lineup (None if nothing is left)
+
+    @staticmethod
+    def weigh(playerIDs, playerOBJs):
+        """
+        Get the (player ids, cumulative weights, total, last index) of a group of players, weighted by effective
+        ability (evenly if they all have none).
+
+        Args:
+            playerIDs (list): The IDs of the players.
+            playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
+        """
+
+        weights = [playerOBJs[playerID].effective_ability for playerID in playerIDs]
+        if sum(weights) == 0:
+            weights = [1] * len(playerIDs)
+
+        cumulative = list(itertools.accumulate(weights))
+        return (playerIDs, cumulative, cumulative[-1] + 0.0, len(playerIDs) - 1)
+
+    def matches(self, lineup):
+        """
+        Check if the index was built from the same players as the given lineup.
+
+        Args:
+            lineup (dict): Current lineup with positions as keys and player IDs as values.
+        """
+
+        return self.key == tuple(lineup.values())
+
+    def choose(self, sampler, rng):
+        """
+        Pick a player: a position from the pruned table, then a player of that position weighted by effective ability.
+        If none of the positions of the table with a weight are in the lineup (e.g. after red cards and injuries), any
+        player of the lineup is picked by effective ability instead. Returns None only if the lineup is empty.
+
+        Args:
+            sampler (TableSampler): The position weights (e.g. PASSING_POSITIONS_SAMPLER).
+            rng: Anything with a random() method returning a float in [0, 1).
+        """
+
+        if sampler in self.samplers:
+            pruned = self.samplers[sampler]
+        else:
+            table = {position: weight for position, weight in zip(*sampler.probabilities()) if position in self.positions and weight > 0}
+            pruned = TableSampler(table) if table else None
+            self.samplers[sampler] = pruned
+
+        if pruned is None:
+            if self.everyone is None:
+                return None
+            playerIDs, cumulative, total, last = self.everyone
+        else:
+            playerIDs, cumulative, total, last = self.positions[pruned.sample(rng)]
+
+        return playerIDs[bisect.bisect(cumulative, rng.random() * total, 0, last)]
@@ -1,32 +1,51 @@
 import threading, logging
+import numpy as np
 from settings import *
 from data.database import *
 from data.gamesDatabase import *
 from utils.util_functions import *
+from utils.timeline import MatchTimeline
+from utils.presampler import TickPresampler
+from utils.lineupIndex import LineupIndex
 
 logger = logging.getLogger(__name__)
 class Match():
-    def __init__(self, match, auto = False, teamMatch = False):
+    def __init__(self, match, auto = False, teamMatch = False, seed = None, context = None):
         """
         Class for a football match, either a simulation or a team management match.
 
         Args:
-            match (Match): The match object containing all relevant match data.
+            match (Match): The match object containing all relevant match data, or a MatchBundle to play the match
+                without reading the database (simulation workers).
             auto (bool): Whether the match is automated (simulation) or not (team management/other matches during team management match).
             teamMatch (bool): Whether the match is the team management match or not.
+            seed (int): The save-level simulation seed, taken from the context if not given.
+            context (SimulationContext): The save-wide values of the simulation run (date, user team, leagues,
+                referees). Built for this match if not given.
         """
 
         self.match = match
         self.auto = auto
+        self.context = context if context else SimulationContext.build()
+        self.bundle = match if isinstance(match, MatchBundle) else None
 
-        self.homeTeam = Teams.get_team_by_id(self.match.home_id)
-        self.awayTeam = Teams.get_team_by_id(self.match.away_id)
-        self.league = LeagueTeams.get_league_by_team(self.homeTeam.id)
-        self.referee = Referees.get_referee_by_id(self.match.referee_id)
+        if self.bundle:
+            self.homeTeam = self.bundle.homeTeam
+            self.awayTeam = self.bundle.awayTeam
+        else:
+            self.homeTeam = Teams.get_team_by_id(self.match.home_id)
+            self.awayTeam = Teams.get_team_by_id(self.match.away_id)
+        self.leagueID = self.context.leagueByTeam[self.homeTeam.id]
+        self.refereeSeverity = self.context.refereeSeverities[self.match.referee_id]
         self.matchday = self.match.matchday
 
-        self.homePlayersOBJ = {p.id: p for p in Players.get_all_players_by_team(self.homeTeam.id)}
-        self.awayPlayersOBJ = {p.id: p for p in Players.get_all_players_by_team(self.awayTeam.id)}
+        # Snapshots of the squads (PlayerSimState), read by the engine instead of the ORM rows
+        if self.bundle:
+            self.homePlayersOBJ = {p.id: p for p in self.bundle.squads[self.homeTeam.id]}
+            self.awayPlayersOBJ = {p.id: p for p in self.bundle.squads[self.awayTeam.id]}
+        else:
+            self.homePlayersOBJ = {p.id: p for p in Players.get_sim_states_by_team(self.homeTeam.id)}
+            self.awayPlayersOBJ = {p.id: p for p in Players.get_sim_states_by_team(self.awayTeam.id)}
 
         self.homeFinalLineup = []
         self.awayFinalLineup = []
@@ -38,10 +57,10 @@ class Match():
         self.homeSubs = 0
         self.awaySubs = 0
 
-        self.homeEvents = {}
-        self.awayEvents = {}
-        self.homeProcessedEvents = {}
-        self.awayProcessedEvents = {}
+        self.homeEvents = MatchTimeline()
+        self.awayEvents = MatchTimeline()
+        self.homeProcessedEvents = MatchTimeline()
+        self.awayProcessedEvents = MatchTimeline()
 
         self.homeRatings = {}
         self.awayRatings = {}
@@ -61,6 +80,20 @@ class Match():
         self.homeFitness = {}
         self.awayFitness = {}
 
+        self.homeAggregates = None
+        self.awayAggregates = None
+        self.homeLineupIndex = None
+        self.awayLineupIndex = None
+
+        # Every random draw of the match comes from its own generators, seeded from the save seed and the match id,
+        # so a match can be replayed exactly and matches can be simulated side by side without sharing state
+        self.seed = self.context.seed if seed is None else seed
+        self.rng = random.Random(f"{self.seed}:{self.match.id}")
+        self.npRng = np.random.default_rng(self.rng.getrandbits(64))
+        self.presampler = TickPresampler(self.npRng) if PRESAMPLE_TICKS else None
+        self.tickRandom = self.presampler if self.presampler else self.rng # source of the uniform draws for the per-tick table samplers
+        self.batchOutcomes = None # outcomes of the per-tick chances drawn by a MatchBatch for the current TICK
+
         self.homeStats = {stat: {} for stat in PLAYER_STATS}
         for stat in MATCH_STATS:
             if stat not in PLAYER_STATS:
@@ -85,6 +118,8 @@ class Match():
         self.awayPassesAttempted = 0
 
         self.score = [0, 0]
+        self.payload = None
+        self.timerThread = None
 
         if self.auto:
             self.seconds, self.minutes = 0, 0
@@ -113,10 +148,11 @@ class Match():
         """
 
         opponentID = self.match.away_id if home else self.match.home_id
-        nonBanned = PlayerBans.get_all_non_banned_players_for_comp(teamID, self.league.league_id)
-        nonBannedYouth = PlayerBans.get_all_non_banned_youth_players_for_comp(teamID, self.league.league_id)
-        lineup = getProposedLineup(teamID, opponentID, self.league.league_id, Game.get_game_date(Managers.get_all_user_managers()[0].id), nonBanned, nonBannedYouth)
-        substitutes = getSubstitutes(teamID, lineup, self.league.league_id, nonBanned, nonBannedYouth)
+        bans = self.bundle if self.bundle else PlayerBans
+        nonBanned = bans.get_all_non_banned_players_for_comp(teamID, self.leagueID)
+        nonBannedYouth = bans.get_all_non_banned_youth_players_for_comp(teamID, self.leagueID)
+        lineup = getProposedLineup(teamID, opponentID, self.leagueID, self.context.currDate, nonBanned, nonBannedYouth, self.bundle)
+        substitutes = getSubstitutes(teamID, lineup, self.leagueID, nonBanned, nonBannedYouth, self.rng, self.bundle)
 
         if home:
             self.homeCurrentLineup = lineup
@@ -135,180 +171,255 @@ class Match():
         """
 
         self.timerThread_running = True
-        self.timerThread = threading.Thread(target = self.gameLoop)
+        self.timerThread = threading.Thread(target = self.eventLoop if EVENT_DRIVEN_CLOCK else self.gameLoop)
         self.timerThread.daemon = True
         self.timerThread.start()
 
+    def simulate(self):
+        """
+        Runs the whole match in the calling thread (no timer thread) and returns the payload.
+        """
+
+        self.timerThread_running = True
+
+        if EVENT_DRIVEN_CLOCK:
+            self.eventLoop()
+        else:
+            self.gameLoop()
+
+        return self.payload
+
     def gameLoop(self):
         """
-        The main game loop that runs the match, updating time, generating events, and processing them.
+        The main game loop that runs the match second by second, updating time, generating events, and processing them.
         """
 
         while self.timerThread_running:
-            # prepare a bracketed match id prefix for logs
-            prefix = f"[{getattr(self.match, 'id', None)}]"
-
             # Update the game time
-            total_seconds = self.minutes * 60 + self.seconds
-            logger.debug("%s gameLoop tick: minutes=%s seconds=%s total_seconds=%s", prefix, self.minutes, self.seconds, total_seconds)
             if self.seconds == 59:
                 self.minutes += 1
                 self.seconds = 0
             else:
                 self.seconds += 1
 
-            """
-            FITNESS - Every 90 seconds, reduce the fitness of every player on the pitch
-            - Reduce fitness of players who are currently on the pitch for team game as well as other matches
-            - Reduce fitness based on player's fitness attribute and current fitness level (lower fitness = lower drop)
-            """
+            self.processSecond()
+
+    def eventLoop(self):
+        """
+        Event-driven version of the game loop. Instead of stepping through every second, the clock jumps straight
+        to the next second where something can happen (TICK, fitness, half/full time or a scheduled event).
+        """
+
+        while self.timerThread_running:
             total_seconds = self.minutes * 60 + self.seconds
-            if total_seconds % 90 == 0:
-                for playerID, fitness in self.homeFitness.items():
-                    if fitness > 0 and playerID in self.homeCurrentLineup.values():
-                        self.homeFitness[playerID] = fitness - getFitnessDrop(self.homePlayersOBJ[playerID], fitness)
+            self.minutes, self.seconds = divmod(self.nextActiveSecond(total_seconds), 60)
 
-                        if self.homeFitness[playerID] < 0:
-                            self.homeFitness[playerID] = 0
+            self.processSecond()
 
-                        logger.debug("%s fitness reduced: player_id=%s new_fitness=%s", prefix, playerID, self.homeFitness[playerID])
+    def nextActiveSecond(self, total_seconds):
+        """
+        Get the next second after total_seconds at which processSecond has any work to do.
 
-                for playerID, fitness in self.awayFitness.items():
-                    if fitness > 0 and playerID in self.awayCurrentLineup.values():
-                        self.awayFitness[playerID] = fitness - getFitnessDrop(self.awayPlayersOBJ[playerID], fitness)
+        Args:
+            total_seconds (int): The current match time in seconds.
+        """
 
-                        if self.awayFitness[playerID] < 0:
-                            self.awayFitness[playerID] = 0
+        candidates = [
+            (total_seconds // TICK + 1) * TICK,
+            (total_seconds // 90 + 1) * 90,
+        ]
 
-                        logger.debug("%s fitness reduced: player_id=%s new_fitness=%s", prefix, playerID, self.awayFitness[playerID])
+        for boundary in (45 * 60, 90 * 60):
+            if boundary > total_seconds:
+                candidates.append(boundary)
 
-            """
-            HALF TIME - First Half time procedure
-            - Calculate extra time for every match based on events that have happened (team match and other matches)
-            - Get the maximum extra time from all matches and set that as the extra time for the first half
-            """
-            if self.minutes == 45 and self.seconds == 0:
+        if self.halfTime:
+            candidates.append((45 + self.extraTimeHalf) * 60)
+        if self.fullTime:
+            candidates.append((90 + self.extraTimeFull) * 60)
 
-                self.halfTime = True
+        for events in (self.homeEvents, self.awayEvents):
+            eventSeconds = events.nextTime()
+            if eventSeconds is not None:
+                candidates.append(eventSeconds)
 
-                logger.info("%s Half time reached at %02d:%02d", prefix, self.minutes, self.seconds)
+        return min(candidate for candidate in candidates if candidate > total_seconds)
 
-                eventsExtraTime, firstHalfEvents, maxMinute = 0, 0, 0
-                combined_events = {**self.homeEvents, **self.awayEvents}
-                for event_time, event_details in list(combined_events.items()):
-                    minute = int(event_time.split(":")[0])
-                    if event_details["extra"] and minute < 90: # first half extra time events
-                        eventsExtraTime += 1
-                        
-                        if minute + 1 > maxMinute:
-                            maxMinute = minute + 1
+    def getExtraTime(self, firstHalf):
+        """
+        Calculate the extra time for a half from the events of both teams: one minute per event played in the half (max 5),
+        or until the last extra time event if that is later.
 
-                    elif minute < 45 and event_details["type"] != "substitution":
-                        firstHalfEvents += 1
+        Args:
+            firstHalf (bool): True for the first half, False for the second half.
+        """
 
-                if maxMinute - 45 < firstHalfEvents:
-                    extraTime = min(firstHalfEvents, 5)
-                else:
-                    extraTime = maxMinute - 45
+        endMinute = 45 if firstHalf else 90
+        halfEvents = self.homeEvents.halfEventCount(firstHalf) + self.awayEvents.halfEventCount(firstHalf)
+        maxMinute = max(self.homeEvents.lastExtraMinute(firstHalf), self.awayEvents.lastExtraMinute(firstHalf))
 
-                self.extraTimeHalf = extraTime
+        if maxMinute - endMinute < halfEvents:
+            return min(halfEvents, 5)
+        else:
+            return maxMinute - endMinute
 
-                logger.debug("%s Computed extraTimeHalf=%s", prefix, self.extraTimeHalf)
+    def processSecond(self):
+        """
+        Carry out everything that happens at the current match time: fitness drops, half/full time, event generation and event processing.
+        """
 
-            """
-            HALF TIME - Second Half time procedure
-            - Set half time as false and reset minutes and seconds to 45:00
-            """
-            if self.halfTime and self.minutes == 45 + self.extraTimeHalf and self.seconds == 0:
-                self.halfTime = False
-                self.minutes = 45
-                self.seconds = 0
+        tick = self.beginSecond()
+        self.finishSecond(tick)
 
-                logger.info("%s End of half time, resume at %02d:%02d", prefix, self.minutes, self.seconds)
+    def beginSecond(self):
+        """
+        First part of processSecond: fitness drops and the half/full time procedures. Returns True if events are
+        generated at the current match time (a TICK that is not the final whistle).
 
-            """
-            FULL TIME - First Full time procedure
-            - Calculate extra time for every match based on events that have happened (team match and other matches)
-            - Get the maximum extra time from all matches and set that as the extra time for the full time
-            """
-            if self.minutes == 90 and self.seconds == 0:
+        MatchBatch calls the two parts separately, so the chances of every fixture at a TICK can be drawn together
+        before the events are generated.
+        """
 
-                self.fullTime = True
+        # prepare a bracketed match id prefix for logs
+        prefix = f"[{getattr(self.match, 'id', None)}]"
 
-                logger.info("%s Full time reached at %02d:%02d", prefix, self.minutes, self.seconds)
+        total_seconds = self.minutes * 60 + self.seconds
+        logger.debug("%s processSecond: minutes=%s seconds=%s total_seconds=%s", prefix, self.minutes, self.seconds, total_seconds)
 
-                eventsExtraTime, secondHalfEvents, maxMinute = 0, 0, 0
-                combined_events = {**self.homeEvents, **self.awayEvents}
-                for event_time, event_details in list(combined_events.items()):
-                    minute = int(event_time.split(":")[0])
-                    if event_details["extra"] and minute > 90: # second half extra time events
-                        eventsExtraTime += 1
-                        
-                        if minute + 1 > maxMinute:
-                            maxMinute = minute + 1
+        """
+        FITNESS - Every 90 seconds, reduce the fitness of every player on the pitch
+        - Reduce fitness of players who are currently on the pitch for team game as well as other matches
+        - Reduce fitness based on player's fitness attribute and current fitness level (lower fitness = lower drop)
+        """
+        if total_seconds % 90 == 0:
+            for playerID, fitness in self.homeFitness.items():
+                if fitness > 0 and playerID in self.homeCurrentLineup.values():
+                    self.homeFitness[playerID] = fitness - getFitnessDrop(self.homePlayersOBJ[playerID], fitness, self.rng)
 
-                    elif minute > 45 and not event_details["extra"] and event_details["type"] != "substitution":
-                        secondHalfEvents += 1
+                    if self.homeFitness[playerID] < 0:
+                        self.homeFitness[playerID] = 0
 
-                if maxMinute - 90 < secondHalfEvents:
-                    extraTime = min(secondHalfEvents, 5)
-                else:
-                    extraTime = maxMinute - 90
+                    logger.debug("%s fitness reduced: player_id=%s new_fitness=%s", prefix, playerID, self.homeFitness[playerID])
+
+            for playerID, fitness in self.awayFitness.items():
+                if fitness > 0 and playerID in self.awayCurrentLineup.values():
+                    self.awayFitness[playerID] = fitness - getFitnessDrop(self.awayPlayersOBJ[playerID], fitness, self.rng)
+
+                    if self.awayFitness[playerID] < 0:
+                        self.awayFitness[playerID] = 0
+
+                    logger.debug("%s fitness reduced: player_id=%s new_fitness=%s", prefix, playerID, self.awayFitness[playerID])
+
+            self.invalidateAggregates(True, fitnessOnly = True)
+            self.invalidateAggregates(False, fitnessOnly = True)
+
+        """
+        HALF TIME - First Half time procedure
+        - Calculate extra time for every match based on events that have happened (team match and other matches)
+        - Get the maximum extra time from all matches and set that as the extra time for the first half
+        """
+        if self.minutes == 45 and self.seconds == 0:
+
+            self.halfTime = True
+
+            logger.info("%s Half time reached at %02d:%02d", prefix, self.minutes, self.seconds)
+
+            self.extraTimeHalf = self.getExtraTime(firstHalf = True)
+
+            logger.debug("%s Computed extraTimeHalf=%s", prefix, self.extraTimeHalf)
+
+        """
+        HALF TIME - Second Half time procedure
+        - Set half time as false and reset minutes and seconds to 45:00
+        """
+        if self.halfTime and self.minutes == 45 + self.extraTimeHalf and self.seconds == 0:
+            self.halfTime = False
+            self.minutes = 45
+            self.seconds = 0
+
+            # the clock goes back to 45:00, so events skipped during the extra time can be played again
+            self.homeEvents.rewind(45 * 60)
+            self.awayEvents.rewind(45 * 60)
+
+            logger.info("%s End of half time, resume at %02d:%02d", prefix, self.minutes, self.seconds)
+
+        """
+        FULL TIME - First Full time procedure
+        - Calculate extra time for every match based on events that have happened (team match and other matches)
+        - Get the maximum extra time from all matches and set that as the extra time for the full time
+        """
+        if self.minutes == 90 and self.seconds == 0:
 
-                self.extraTimeFull = extraTime
+            self.fullTime = True
 
-                logger.debug("%s Computed extraTimeFull=%s", prefix, self.extraTimeFull)
+            logger.info("%s Full time reached at %02d:%02d", prefix, self.minutes, self.seconds)
+
+            self.extraTimeFull = self.getExtraTime(firstHalf = False)
+
+            logger.debug("%s Computed extraTimeFull=%s", prefix, self.extraTimeFull)
+
+        return not self.isFinalWhistle() and total_seconds % TICK == 0
+
+    def finishSecond(self, tick):
+        """
+        Second part of processSecond: save the match at the final whistle, otherwise generate the events of both teams
+        (if tick) and process the events due at the current match time.
+
+        Args:
+            tick (bool): Whether events are generated at the current match time, as returned by beginSecond.
+        """
+
+        prefix = f"[{getattr(self.match, 'id', None)}]"
+
+        """
+        FULL TIME - Second Full time procedure
+        - Set full time as false and save match data
+        - If not full time, generate events and update possession every TICK seconds, and process events for both teams
+        """
+        if self.isFinalWhistle():
+            self.fullTime = False
+            self.saveData()
+        else:
+            if tick:
+                logger.debug("%s TICK: generating events and updating possession at %02d:%02d", prefix, self.minutes, self.seconds)
+                self.generateEvents("home")
+                self.generateEvents("away")
+                passesAndPossession(self)
 
             """
-            FULL TIME - Second Full time procedure
-            - Set full time as false and save match data
-            - If not full time, generate events and update possession every TICK seconds, and process events for both teams
+            EVENTS - Home
+            - Check the home events that need to be processed at the current time
             """
-            if self.fullTime and self.minutes == 90 + self.extraTimeFull and self.seconds == 0:
-                self.fullTime = False
-                self.saveData()
-            else:
-                if total_seconds % TICK == 0:
-                    logger.debug("%s TICK: generating events and updating possession at %02d:%02d", prefix, self.minutes, self.seconds)
-                    self.generateEvents("home")
-                    self.generateEvents("away")
-                    passesAndPossession(self)
-
-                """
-                EVENTS - Home
-                - Check the home events that need to be processed at the current time
-                """
-                for event_time, event_details in list(self.homeEvents.items()):
-                    if event_time == str(self.minutes) + ":" + str(self.seconds) and event_time not in self.homeProcessedEvents:
-                        logger.debug("%s Processing home event at %s: %s", prefix, event_time, event_details)
-                        if event_details["extra"]:
-                            if self.halfTime or self.fullTime:
-                                self.getEventPlayer(event_details, True, event_time)
-                                self.homeProcessedEvents[event_time] = event_details
-                                logger.info("%s Processed extra home event: %s at %s", prefix, event_details.get("type"), event_time)
-                        else:
-                            if not (self.halfTime or self.fullTime):
-                                self.getEventPlayer(event_details, True, event_time)
-                                self.homeProcessedEvents[event_time] = event_details
-                                logger.info("%s Processed home event: %s at %s", prefix, event_details.get("type"), event_time)
-
-                """
-                EVENTS - Away
-                - Check the away events that need to be processed at the current time
-                """
-                for event_time, event_details in list(self.awayEvents.items()):
-                    if event_time == str(self.minutes) + ":" + str(self.seconds) and event_time not in self.awayProcessedEvents:
-                        logger.debug("%s Processing away event at %s: %s", prefix, event_time, event_details)
-                        if event_details["extra"]:
-                            if self.halfTime or self.fullTime:
-                                self.getEventPlayer(event_details, False, event_time)
-                                self.awayProcessedEvents[event_time] = event_details
-                                logger.info("%s Processed extra away event: %s at %s", prefix, event_details.get("type"), event_time)
-                        else:
-                            if not (self.halfTime or self.fullTime):
-                                self.getEventPlayer(event_details, False, event_time)
-                                self.awayProcessedEvents[event_time] = event_details
-                                logger.info("%s Processed away event: %s at %s", prefix, event_details.get("type"), event_time)
+            for event_time, event_details in self.homeEvents.popDue(self.minutes * 60 + self.seconds):
+                logger.debug("%s Processing home event at %s: %s", prefix, event_time, event_details)
+                if event_details["extra"] == (self.halfTime or self.fullTime):
+                    self.getEventPlayer(event_details, True, event_time)
+                    self.homeProcessedEvents[event_time] = event_details
+                    logger.info("%s Processed %shome event: %s at %s", prefix, "extra " if event_details["extra"] else "", event_details.get("type"), event_time)
+                else:
+                    # wrong part of the game (e.g. a normal time event during extra time), it may be played after a rewind
+                    self.homeEvents.defer(event_time)
+
+            """
+            EVENTS - Away
+            - Check the away events that need to be processed at the current time
+            """
+            for event_time, event_details in self.awayEvents.popDue(self.minutes * 60 + self.seconds):
+                logger.debug("%s Processing away event at %s: %s", prefix, event_time, event_details)
+                if event_details["extra"] == (self.halfTime or self.fullTime):
+                    self.getEventPlayer(event_details, False, event_time)
+                    self.awayProcessedEvents[event_time] = event_details
+                    logger.info("%s Processed %saway event: %s at %s", prefix, "extra " if event_details["extra"] else "", event_details.get("type"), event_time)
+                else:
+                    # wrong part of the game (e.g. a normal time event during extra time), it may be played after a rewind
+                    self.awayEvents.defer(event_time)
+
+    def isFinalWhistle(self):
+        """
+        Check if the current match time is the end of the full time extra time, where the match is saved.
+        """
+
+        return self.fullTime and self.minutes == 90 + self.extraTimeFull and self.seconds == 0
 
     def generateEvents(self, side):
         """
@@ -338,36 +449,28 @@ class Match():
 
 
         # ------------------ STATS CALCULATION ------------------
-        sharpness = [playerOBJs[playerID].sharpness for playerID in lineup.values()]
-        avgSharpnessWthKeeper = sum(sharpness) / len(sharpness)
-
-        if "Goalkeeper" in lineup:
-            avgSharpness = (sum(sharpness) - playerOBJs[lineup["Goalkeeper"]].sharpness) / (len(sharpness) - 1)
-        else:
-            avgSharpness = avgSharpnessWthKeeper
-
-        avgFitness = sum(fitness[playerID] for playerID in lineup.values()) / len(lineup)
+        aggregates = self.getAggregates(side == "home")
+        oppAggregates = self.getAggregates(side != "home")
 
-        morale = [playerOBJs[playerID].morale for pos, playerID in lineup.items() if pos != "Goalkeeper"]
-        avgMorale = sum(morale) / len(morale)
+        avgSharpnessWthKeeper = aggregates["avgSharpnessWthKeeper"]
+        avgSharpness = aggregates["avgSharpness"]
+        avgFitness = aggregates["avgFitness"]
+        avgMorale = aggregates["avgMorale"]
 
         oppKeeper = oppPlayersOBJs.get(oppLineup["Goalkeeper"]) if "Goalkeeper" in oppLineup else None
 
-        attackingPlayers = [playerID for pos, playerID in lineup.items() if pos in ATTACKING_POSITIONS]
-        defendingPlayers = [playerID for pos, playerID in oppLineup.items() if pos in DEFENSIVE_POSITIONS]
-
-        attackingLevel = teamStrength(attackingPlayers, "attack", playerOBJs)
-        defendingLevel = teamStrength(defendingPlayers, "defend", oppPlayersOBJs)
+        attackingLevel = aggregates["attackingLevel"]
+        defendingLevel = oppAggregates["defendingLevel"]
 
         # ------------------ GOALS ------------------
-        event = goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper)
+        event = self.drawOutcome(side, "goal", lambda: goalProbabilities(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper))
 
         if event == "goal":
 
-            goalType = random.choices(list(GOAL_TYPE_CHANCES.keys()), weights = list(GOAL_TYPE_CHANCES.values()), k = 1)[0]
+            goalType = GOAL_TYPE_SAMPLER.sample(self.rng)
 
             if goalType == "penalty":
-                if random.random() < PENALTY_SCORE_CHANCE or "Goalkeeper" not in oppLineup:
+                if self.rng.random() < PENALTY_SCORE_CHANCE or "Goalkeeper" not in oppLineup:
                     goalType = "penalty_goal"
                     self.appendScore(1, True if side == "home" else False)
                 else:
@@ -377,13 +480,13 @@ class Match():
 
             eventsToAdd.append(goalType)
 
-            if random.random() < GOAL_BIG_CHANCE:
+            if self.rng.random() < GOAL_BIG_CHANCE:
                 statsToAdd.append("Big chances created")
         elif event != "nothing":
             statsToAdd.append(event)
 
         # ------------------ FOULS ------------------
-        event = foulChances(avgSharpnessWthKeeper, self.referee.severity)
+        event = self.drawOutcome(side, "foul", lambda: foulProbabilities(avgSharpnessWthKeeper, self.refereeSeverity))
 
         if event in ["yellow_card", "red_card"]:
             eventsToAdd.append(event)
@@ -391,19 +494,19 @@ class Match():
             statsToAdd.append(event)
         else:
             # If nothing, get tackles and interceptions
-            tacklesInterceptions = random.choices(population = list(DEFENSIVE_ACTIONS_CHANCES.keys()), weights = list(DEFENSIVE_ACTIONS_CHANCES.values()), k = 1)[0]
+            tacklesInterceptions = DEFENSIVE_ACTIONS_SAMPLER.sample(self.tickRandom)
 
             if tacklesInterceptions != "nothing":
                 statsToAdd.append(tacklesInterceptions)
 
         # ------------------ INJURIES ------------------
-        event = injuryChances(avgFitness)
+        event = self.drawOutcome(side, "injury", lambda: injuryProbabilities(avgFitness))
 
         if event == "injury":
             eventsToAdd.append(event)
 
         # ------------------ SUBSTITUTIONS ------------------
-        subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, self.minutes, fitness, playerOBJs, ratings)
+        subsChosen = substitutionChances(lineup, subsCount, subs.copy(), events, self.minutes, fitness, playerOBJs, ratings, self.rng)
 
         for _ in range(len(subsChosen)):
             eventsToAdd.append("substitution")
@@ -430,29 +533,25 @@ class Match():
         subsChosenCount = 0
         for event in eventsToAdd:
             try:
-                eventTotalSecs = random.randint(currTotalSecs + 10, endTotalSecs)
+                eventTotalSecs = self.rng.randint(currTotalSecs + 10, endTotalSecs)
             except ValueError:
                 break
 
-            # Convert back to mm:ss
-            eventMin = eventTotalSecs // 60
-            eventSec = eventTotalSecs % 60
-            eventTime = f"{eventMin}:{eventSec:02d}"
-
             if event == "substitution":
                 # substitution event needs entries such as player off/on and positions
-                matchEvents[eventTime] = {"type": "substitution", "extra": extraTime, "player_off": subsChosen[subsChosenCount][0], "player_on": subsChosen[subsChosenCount][2], "old_position": subsChosen[subsChosenCount][1], "new_position": subsChosen[subsChosenCount][3]}
+                matchEvents.add(eventTotalSecs, {"type": "substitution", "extra": extraTime, "player_off": subsChosen[subsChosenCount][0], "player_on": subsChosen[subsChosenCount][2], "old_position": subsChosen[subsChosenCount][1], "new_position": subsChosen[subsChosenCount][3]})
                 subsChosenCount += 1
             elif event == "penalty_miss":
                 # penalty miss needs to know the opponent keeper
-                matchEvents[eventTime] = {"type": event, "extra": extraTime, "keeper": oppLineup["Goalkeeper"] if "Goalkeeper" in oppLineup else None}
+                matchEvents.add(eventTotalSecs, {"type": event, "extra": extraTime, "keeper": oppLineup["Goalkeeper"] if "Goalkeeper" in oppLineup else None})
             else:
-                matchEvents[eventTime] = {"type": event, "extra": extraTime}
+                matchEvents.add(eventTotalSecs, {"type": event, "extra": extraTime})
 
+        lineupIndex = self.getLineupIndex(side == "home")
         for stat in statsToAdd:
             if stat in PLAYER_STATS:
                 # Get the player associated with the stat
-                playerID, rating = getStatPlayer(stat, lineup, playerOBJs)
+                playerID, rating = getStatPlayer(stat, lineup, playerOBJs, self.rng, lineupIndex)
                 ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                 if not playerID:
@@ -467,23 +566,23 @@ class Match():
                     case "Shots":
                         # For shots, get the direction, outcome, xG and big chance created/missed
 
-                        shotDirection = random.choices(population = list(SHOT_DIRECTION_CHANCES.keys()), weights = list(SHOT_DIRECTION_CHANCES.values()), k = 1)[0]
+                        shotDirection = SHOT_DIRECTION_SAMPLER.sample(self.tickRandom)
                         if not playerID in stats[shotDirection]:
                             stats[shotDirection][playerID] = 0
 
                         stats[shotDirection][playerID] += 1
 
-                        shotOutcome = random.choices(population = list(SHOT_CHANCES.keys()), weights = list(SHOT_CHANCES.values()), k = 1)[0]
+                        shotOutcome = SHOT_SAMPLER.sample(self.tickRandom)
                         if shotOutcome != "wide":
                             stats[shotOutcome] += 1
 
-                        if random.random() < SHOT_BIG_CHANCE:
+                        if self.rng.random() < SHOT_BIG_CHANCE:
                             if not playerID in stats["Big chances missed"]:
                                 stats["Big chances missed"][playerID] = 0
 
                             stats["Big chances missed"][playerID] += 1
 
-                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs)
+                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs, self.rng, lineupIndex)
                             ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                             if not playerID in stats["Big chances created"]:
@@ -491,7 +590,7 @@ class Match():
 
                             stats["Big chances created"][playerID] += 1
 
-                        stats["xG"] += round(random.uniform(0.02, MAX_XG), 2)
+                        stats["xG"] += round(self.rng.uniform(0.02, MAX_XG), 2)
                         stats["xG"] = round(stats["xG"], 2)
                     case "Shots on target":
                         # For shots on target, add to shots, xG, big chance created/missed, and add a save to opponent keeper stats
@@ -501,19 +600,19 @@ class Match():
                         
                         stats["Shots"][playerID] += 1
 
-                        shotDirection = random.choices(population = list(SHOT_DIRECTION_CHANCES.keys()), weights = list(SHOT_DIRECTION_CHANCES.values()), k = 1)[0]
+                        shotDirection = SHOT_DIRECTION_SAMPLER.sample(self.tickRandom)
                         if not playerID in stats[shotDirection]:
                             stats[shotDirection][playerID] = 0
 
                         stats[shotDirection][playerID] += 1
 
-                        if random.random() < SHOT_BIG_CHANCE:
+                        if self.rng.random() < SHOT_BIG_CHANCE:
                             if not playerID in stats["Big chances missed"]:
                                 stats["Big chances missed"][playerID] = 0
 
                             stats["Big chances missed"][playerID] += 1
 
-                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs)
+                            playerID, rating = getStatPlayer("Big chances created", lineup, playerOBJs, self.rng, lineupIndex)
                             ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                             if not playerID in stats["Big chances created"]:
@@ -522,7 +621,7 @@ class Match():
                             stats["Big chances created"][playerID] += 1
 
                         # Opponent keeper stats
-                        playerID, rating = getStatPlayer("Saves", oppLineup, oppPlayersOBJs)
+                        playerID, rating = getStatPlayer("Saves", oppLineup, oppPlayersOBJs, self.rng)
                         if playerID:
                             if playerID not in oppStats["Saves"]:
                                 oppStats["Saves"][playerID] = 0
@@ -530,11 +629,164 @@ class Match():
 
                             oppRatings[playerID] = min(10, max(0, round(oppRatings.get(playerID, 0) + rating, 2)))
 
-                        stats["xG"] += round(random.uniform(0.02, MAX_XG), 2)
+                        stats["xG"] += round(self.rng.uniform(0.02, MAX_XG), 2)
                         stats["xG"] = round(stats["xG"], 2)
             else:
                 stats[stat] += 1
 
+    def drawOutcome(self, side, chance, probabilities):
+        """
+        Pick the outcome of a per-tick chance, using the presampler if PRESAMPLE_TICKS is on, otherwise the match generator.
+        When the match is run by a MatchBatch, the outcomes of the current TICK were already drawn for every fixture.
+
+        Args:
+            side (str): "home" or "away".
+            chance (str): The name of the chance, e.g. "goal" or "foul".
+            probabilities (function): Returns the (events, probabilities) of the chance.
+        """
+
+        if self.batchOutcomes is not None:
+            return self.batchOutcomes[(side, chance)]
+
+        if self.presampler is None:
+            events, probs = probabilities()
+            return self.rng.choices(events, weights = probs, k = 1)[0]
+
+        return self.presampler.draw((side, chance), probabilities)
+
+    def getAggregates(self, home):
+        """
+        Get the lineup averages and strengths used to generate events for a team. They are cached and only
+        recalculated after the lineup (cards, injuries, substitutions) or the fitness changed.
+
+        Args:
+            home (bool): Whether the team is the home team or away team.
+        """
+
+        aggregates = self.homeAggregates if home else self.awayAggregates
+        lineup = self.homeCurrentLineup if home else self.awayCurrentLineup
+        playerOBJs = self.homePlayersOBJ if home else self.awayPlayersOBJ
+
+        if aggregates is None:
+            sharpness = [playerOBJs[playerID].sharpness for playerID in lineup.values()]
+            avgSharpnessWthKeeper = sum(sharpness) / len(sharpness)
+
+            if "Goalkeeper" in lineup:
+                avgSharpness = (sum(sharpness) - playerOBJs[lineup["Goalkeeper"]].sharpness) / (len(sharpness) - 1)
+            else:
+                avgSharpness = avgSharpnessWthKeeper
+
+            morale = [playerOBJs[playerID].morale for pos, playerID in lineup.items() if pos != "Goalkeeper"]
+
+            attackingPlayers = [playerID for pos, playerID in lineup.items() if pos in ATTACKING_POSITIONS]
+            defendingPlayers = [playerID for pos, playerID in lineup.items() if pos in DEFENSIVE_POSITIONS]
+
+            aggregates = {
+                "avgSharpnessWthKeeper": avgSharpnessWthKeeper,
+                "avgSharpness": avgSharpness,
+                "avgMorale": sum(morale) / len(morale),
+                "attackingLevel": teamStrength(attackingPlayers, "attack", playerOBJs),
+                "defendingLevel": teamStrength(defendingPlayers, "defend", playerOBJs),
+                "avgFitness": None,
+            }
+
+            if home:
+                self.homeAggregates = aggregates
+            else:
+                self.awayAggregates = aggregates
+
+        if aggregates["avgFitness"] is None:
+            fitness = self.homeFitness if home else self.awayFitness
+            aggregates["avgFitness"] = sum(fitness[playerID] for playerID in lineup.values()) / len(lineup)
+
+        return aggregates
+
+    def invalidateAggregates(self, home, fitnessOnly = False):
+        """
+        Mark the cached aggregates of a team as out of date.
+
+        Args:
+            home (bool): Whether the team is the home team or away team.
+            fitnessOnly (bool): Whether only the fitness changed (the lineup is the same).
+        """
+
+        aggregates = self.homeAggregates if home else self.awayAggregates
+        side, oppSide = ("home", "away") if home else ("away", "home")
+
+        if fitnessOnly and aggregates is not None:
+            aggregates["avgFitness"] = None
+        elif home:
+            self.homeAggregates = None
+        else:
+            self.awayAggregates = None
+
+        # the presampled chances calculated with the old values are no longer valid
+        if self.presampler:
+            if fitnessOnly:
+                self.presampler.discard((side, "injury"))
+            else:
+                self.presampler.discard((side, "goal"), (side, "foul"), (side, "injury"), (oppSide, "goal"))
+
+    def getLineupIndex(self, home):
+        """
+        Get the position index of a team's current lineup, used for the weighted player picks. It is rebuilt when the
+        players in the lineup change, however they were changed (engine substitutions or the matchday screen).
+
+        Args:
+            home (bool): Whether the team is the home team or away team.
+        """
+
+        index = self.homeLineupIndex if home else self.awayLineupIndex
+        lineup = self.homeCurrentLineup if home else self.awayCurrentLineup
+
+        if index is None or not index.matches(lineup):
+            index = LineupIndex(lineup, self.homePlayersOBJ if home else self.awayPlayersOBJ)
+
+            if home:
+                self.homeLineupIndex = index
+            else:
+                self.awayLineupIndex = index
+
+        return index
+
+    def getTeamAverage(self, home):
+        """
+        Get the average current ability of a team's squad (youths included), like Teams.get_team_average_current_ability
+        but from the snapshots taken at kick off.
+
+        Args:
+            home (bool): Whether the team is the home team or away team.
+        """
+
+        playerOBJs = self.homePlayersOBJ if home else self.awayPlayersOBJ
+        if not playerOBJs:
+            return 0.0
+
+        return round(sum(p.current_ability for p in playerOBJs.values()) / len(playerOBJs), 2)
+
+    def isBanned(self, playerID):
+        """
+        Check if a player is banned (injured, or suspended in the match's league).
+
+        Args:
+            playerID (str): The ID of the player.
+        """
+
+        if self.bundle:
+            return self.bundle.check_bans_for_player(playerID, self.leagueID)
+
+        return PlayerBans.check_bans_for_player(playerID, self.leagueID)
+
+    def getOverthrowThreshold(self):
+        """
+        Get the overthrow threshold of the match's league (see get_overthrow_threshold).
+        """
+
+        if self.bundle:
+            return self.bundle.overthrowThreshold
+
+        return get_overthrow_threshold(self.match.league_id)
+
     def join(self):
         """
         Joins the timer thread to wait for its completion.
@@ -571,24 +823,23 @@ class Match():
         playerOBJs = self.homePlayersOBJ if home else self.awayPlayersOBJ
         oppPlayerOBJs = self.awayPlayersOBJ if home else self.homePlayersOBJ
 
-        # Fetch all players in the lineup with a single query
-        players_dict = {p.id: p for p in playerOBJs.values() if p.id in lineup.values()}
+        players_dict = self.getLineupIndex(home).players
 
         try:
             if event["type"] == "goal":
                 ## ---- scorer
-                scorerPosition = random.choices(list(SCORER_CHANCES.keys()), weights = list(SCORER_CHANCES.values()), k = 1)[0]
+                scorerPosition = SCORER_SAMPLER.sample(self.rng)
                 players = [player.id for player in players_dict.values() if player.position == scorerPosition]
 
                 while len(players) == 0:
-                    scorerPosition = random.choices(list(SCORER_CHANCES.keys()), weights = list(SCORER_CHANCES.values()), k = 1)[0]
+                    scorerPosition = SCORER_SAMPLER.sample(self.rng)
                     players = [player.id for player in players_dict.values() if player.position == scorerPosition]
 
-                weights = [effective_ability(players_dict[playerID]) for playerID in players]
+                weights = [players_dict[playerID].effective_ability for playerID in players]
                 if sum(weights) == 0:
                     weights = [1] * len(players)
 
-                playerID = random.choices(players, weights = weights, k = 1)[0]
+                playerID = self.rng.choices(players, weights = weights, k = 1)[0]
                 event["player"] = playerID
 
                 # Add the stats for the scorer
@@ -602,71 +853,71 @@ class Match():
                 
                 stats["Shots"][playerID] += 1
 
-                shotDirection = random.choices(population = list(SHOT_DIRECTION_CHANCES.keys()), weights = list(SHOT_DIRECTION_CHANCES.values()), k = 1)[0]
+                shotDirection = SHOT_DIRECTION_SAMPLER.sample(self.rng)
                 if playerID not in stats[shotDirection]:
                     stats[shotDirection][playerID] = 0
                 
                 stats[shotDirection][playerID] += 1
 
-                stats["xG"] += round(random.uniform(0.02, MAX_XG), 2)
+                stats["xG"] += round(self.rng.uniform(0.02, MAX_XG), 2)
                 stats["xG"] = round(stats["xG"], 2)
 
                 # Add rating for scoring
-                rating = random.uniform(GOAL_RATINGS[0], GOAL_RATINGS[1])
+                rating = self.rng.uniform(GOAL_RATINGS[0], GOAL_RATINGS[1])
                 ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
                 # Reduce rating for the opposition defence and keeper
-                oppKeeperRating = random.uniform(GOAL_CONCEDED_KEEPER_RATING[0], GOAL_CONCEDED_KEEPER_RATING[1])
+                oppKeeperRating = self.rng.uniform(GOAL_CONCEDED_KEEPER_RATING[0], GOAL_CONCEDED_KEEPER_RATING[1])
                 if "Goalkeeper" in oppLineup:
                     oppKeeperID = oppLineup["Goalkeeper"]
                     oppRatings[oppKeeperID] = min(10, max(0, round(oppRatings.get(oppKeeperID, 0) + oppKeeperRating, 2)))
 
                 for pos, playerID in oppLineup.items():
                     if pos in DEFENDER_POSITIONS:
-                        defenderRating = random.uniform(GOAL_CONCEDED_DEFENCE_RATING[0], GOAL_CONCEDED_DEFENCE_RATING[1])
+                        defenderRating = self.rng.uniform(GOAL_CONCEDED_DEFENCE_RATING[0], GOAL_CONCEDED_DEFENCE_RATING[1])
                         oppRatings[playerID] = min(10, max(0, round(oppRatings.get(playerID, 0) + defenderRating, 2)))
 
                 ## ---- assister
-                assisterPosition = random.choices(list(ASSISTER_CHANCES.keys()), weights = list(ASSISTER_CHANCES.values()), k = 1)[0]
+                assisterPosition = ASSISTER_SAMPLER.sample(self.rng)
                 players = [player.id for player in players_dict.values() if player.position == assisterPosition]
 
                 while len(players) == 0:
-                    assisterPosition = random.choices(list(ASSISTER_CHANCES.keys()), weights = list(ASSISTER_CHANCES.values()), k = 1)[0]
+                    assisterPosition = ASSISTER_SAMPLER.sample(self.rng)
                     players = [player.id for player in players_dict.values() if player.position == assisterPosition]
                 
-                weights = [effective_ability(players_dict[playerID]) for playerID in players]
+                weights = [players_dict[playerID].effective_ability for playerID in players]
                 if sum(weights) == 0:
                     weights = [1] * len(players)
 
-                playerID = random.choices(players, weights = weights, k = 1)[0]
+                playerID = self.rng.choices(players, weights = weights, k = 1)[0]
 
                 # make sure player doesnt assist themselves
                 if assisterPosition == scorerPosition and len(players) == 1: 
                     available_positions = [pos for pos in ASSISTER_CHANCES.keys() if pos != assisterPosition]
-                    assisterPosition = random.choices(available_positions, weights = [ASSISTER_CHANCES[pos] for pos in available_positions], k = 1)[0]
+                    assisterPosition = self.rng.choices(available_positions, weights = [ASSISTER_CHANCES[pos] for pos in available_positions], k = 1)[0]
                 while playerID == event["player"]:
                     players = [player.id for player in players_dict.values() if player.position == assisterPosition]
 
-                    weights = [effective_ability(players_dict[playerID]) for playerID in players]
+                    weights = [players_dict[playerID].effective_ability for playerID in players]
                     if sum(weights) == 0:
                         weights = [1] * len(players)
 
-                    playerID = random.choices(players, weights = weights, k = 1)[0]
+                    playerID = self.rng.choices(players, weights = weights, k = 1)[0]
 
                 event["assister"] = playerID
 
-                rating = random.uniform(ASSIST_RATINGS[0], ASSIST_RATINGS[1])
+                rating = self.rng.uniform(ASSIST_RATINGS[0], ASSIST_RATINGS[1])
                 ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
             elif event["type"] == "penalty_goal" or event["type"] == "penalty_miss":
-                penaltyPosition = random.choices(list(PENALTY_TAKER_CHANCES.keys()), weights = list(PENALTY_TAKER_CHANCES.values()), k = 1)[0]
+                penaltyPosition = PENALTY_TAKER_SAMPLER.sample(self.rng)
                 players = [player.id for player in players_dict.values() if player.position == penaltyPosition]
 
                 while len(players) == 0:
-                    penaltyPosition = random.choices(list(PENALTY_TAKER_CHANCES.keys()), weights = list(PENALTY_TAKER_CHANCES.values()), k = 1)[0]
+                    penaltyPosition = PENALTY_TAKER_SAMPLER.sample(self.rng)
                     players = [player.id for player in players_dict.values() if player.position == penaltyPosition]
 
-                playerID = random.choices(players, k = 1)[0]
+                playerID = self.rng.choices(players, k = 1)[0]
                 event["player"] = playerID
 
                 if playerID not in stats["Shots on target"]:
@@ -696,7 +947,7 @@ class Match():
                 stats["xG"] += 0.8
 
             elif event["type"] == "own_goal":
-                ownGoalPosition = random.choices(list(OWN_GOAL_CHANCES.keys()), weights = list(OWN_GOAL_CHANCES.values()), k = 1)[0]
+                ownGoalPosition = OWN_GOAL_SAMPLER.sample(self.rng)
                 oppositionLineup = self.homeCurrentLineup if lineup == self.awayCurrentLineup else self.awayCurrentLineup
                 
                 players = [p for p in oppPlayerOBJs.values() if p.id in oppositionLineup.values()]
@@ -706,20 +957,20 @@ class Match():
                     players_in_position = players
                     
                 weights = [ownGoalFoulWeight(p) for p in players_in_position]
-                playerID = random.choices(players_in_position, weights = weights, k = 1)[0].id
+                playerID = self.rng.choices(players_in_position, weights = weights, k = 1)[0].id
 
                 event["player"] = playerID
 
-                rating = random.uniform(OWN_GOAL_RATINGS[0], OWN_GOAL_RATINGS[1])
+                rating = self.rng.uniform(OWN_GOAL_RATINGS[0], OWN_GOAL_RATINGS[1])
                 oppRatings[playerID] = min(10, max(0, round(oppRatings.get(playerID, 0) + rating, 2)))
 
             elif event["type"] == "yellow_card":
                 weights = [ownGoalFoulWeight(player) for player in players_dict.values()]
-                playerID = random.choices(list(players_dict.values()), weights = weights, k = 1)[0].id
+                playerID = self.rng.choices(list(players_dict.values()), weights = weights, k = 1)[0].id
                 event["player"] = playerID
                 stats["Yellow cards"] += 1
 
-                if random.random() < CARD_FOUL_CHANCE:
+                if self.rng.random() < CARD_FOUL_CHANCE:
                     if playerID not in stats["Fouls"]:
                         stats["Fouls"][playerID] = 0
                     
@@ -747,33 +998,33 @@ class Match():
                         if playerPosition == "Goalkeeper" and not managing_team:
                             self.keeperSub(subsCount, lineup, players_dict, processedEvents, time, events, teamMatch, subs, home)
 
-                        rating = random.uniform(RED_CARD_RATINGS[0], RED_CARD_RATINGS[1])
+                        rating = self.rng.uniform(RED_CARD_RATINGS[0], RED_CARD_RATINGS[1])
                         ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
                         break
 
                 if not secondYellow:
-                    rating = random.uniform(YELLOW_CARD_RATINGS[0], YELLOW_CARD_RATINGS[1])
+                    rating = self.rng.uniform(YELLOW_CARD_RATINGS[0], YELLOW_CARD_RATINGS[1])
                     ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
             elif event["type"] == "red_card":
                 
-                redCardPosition = random.choices(list(RED_CARD_CHANCES.keys()), weights = list(RED_CARD_CHANCES.values()), k = 1)[0]
+                redCardPosition = RED_CARD_SAMPLER.sample(self.rng)
                 players = [player for player in players_dict.values() if player.position == redCardPosition]
 
                 while len(players) == 0:
-                    redCardPosition = random.choices(list(RED_CARD_CHANCES.keys()), weights = list(RED_CARD_CHANCES.values()), k = 1)[0]
+                    redCardPosition = RED_CARD_SAMPLER.sample(self.rng)
                     players = [player for player in players_dict.values() if player.position == redCardPosition]
 
                 weights = [ownGoalFoulWeight(player) for player in players]
 
-                playerID = random.choices(players, weights = weights, k = 1)[0].id
+                playerID = self.rng.choices(players, weights = weights, k = 1)[0].id
                 event["player"] = playerID
                 stats["Red cards"] += 1
 
-                rating = random.uniform(RED_CARD_RATINGS[0], RED_CARD_RATINGS[1])
+                rating = self.rng.uniform(RED_CARD_RATINGS[0], RED_CARD_RATINGS[1])
                 ratings[playerID] = min(10, max(0, round(ratings.get(playerID, 0) + rating, 2)))
 
-                if random.random() < CARD_FOUL_CHANCE:
+                if self.rng.random() < CARD_FOUL_CHANCE:
                     if playerID not in stats["Fouls"]:
                         stats["Fouls"][playerID] = 0
                     
@@ -794,7 +1045,7 @@ class Match():
 
                 weights = [fitnessWeight(fitness[player.id]) for player in players_dict.values()]
 
-                injuredPlayerID = random.choices(list(players_dict.values()), weights = weights, k = 1)[0].id
+                injuredPlayerID = self.rng.choices(list(players_dict.values()), weights = weights, k = 1)[0].id
                 event["player"] = injuredPlayerID
 
                 playerPosition = list(lineup.keys())[list(lineup.values()).index(injuredPlayerID)]
@@ -837,6 +1088,10 @@ class Match():
         except Exception as e:
             logger.error("ERROR processing event %s at %s: %s", event, time, e)
             return None
+        finally:
+            # cards, injuries and substitutions change the lineup
+            if event["type"] in ("yellow_card", "red_card", "injury", "substitution"):
+                self.invalidateAggregates(home)
 
         if teamMatch:
             return event
@@ -885,9 +1140,9 @@ class Match():
             subsCount (int): The number of substitutions already made by the team.
             lineup (dict): The current lineup of the team.
             players_dict (dict): A dictionary of player objects for the team.
-            processedEvents (dict): The events that have already been processed for the team.
+            processedEvents (MatchTimeline): The events that have already been processed for the team.
             time (str): The time of the event in "mm:ss" format.
-            events (dict): The events for the team.
+            events (MatchTimeline): The events for the team.
             teamMatch (bool): Whether the match is a team management match or not.
             subs (list): The list of available substitutes for the team.
             home (bool): Whether the team is the home team or away team.
@@ -902,9 +1157,9 @@ class Match():
             players = [player.id for player in players_dict.values() if player.position == "forward"]
 
             if len(players) == 0:
-                newKeeper = random.choices(list(lineup.values()), k = 1)[0]
+                newKeeper = self.rng.choices(list(lineup.values()), k = 1)[0]
             else:
-                newKeeper = random.choices(list(players), k = 1)[0]
+                newKeeper = self.rng.choices(list(players), k = 1)[0]
 
             newKeeperPosition = list(lineup.keys())[list(lineup.values()).index(newKeeper)]
             lineup.pop(newKeeperPosition)
@@ -926,9 +1181,9 @@ class Match():
         Args:
             lineup (dict): The current lineup of the team.
             players_dict (dict): A dictionary of player objects for the team.
-            processedEvents (dict): The events that have already been processed for the team.
+            processedEvents (MatchTimeline): The events that have already been processed for the team.
             time (str): The time of the event in "mm:ss" format.
-            events (dict): The events for the team.
+            events (MatchTimeline): The events for the team.
             playerOffID (str): The ID of the player being substituted off. If None, will be determined.
             subs (list): The list of available substitutes for the team.
             home (bool): Whether the team is the home team or away team.
@@ -937,9 +1192,7 @@ class Match():
             playerPos (str): The position of the player being substituted off, if known.
         """
 
-        minute = int(time.split(":")[0])
-        seconds = int(time.split(":")[1])
-        currTotalSecs = minute * 60 + seconds
+        currTotalSecs = parse_event_time(time)
         extraTime = self.halfTime or self.fullTime
 
         if extraTime:
@@ -957,30 +1210,28 @@ class Match():
 
         # Create the substitution event
         if subTotalSecs <= maxTotalSecs:
-            subMin = subTotalSecs // 60
-            subSec = subTotalSecs % 60
-            sub_time = f"{subMin}:{subSec:02d}"
+            sub_time = subTotalSecs
         elif (extraTime and self.halfTime) or maxTotalSecs == 45*60:
-            sub_time = "45:10"
+            sub_time = 45 * 60 + 10
 
         if keeperSub:
             # If it's a keeper coming on, select an outfield player to go off
             players = [player.id for player in players_dict.values() if player.position == "forward"]
 
             if len(players) == 0:
-                playerOffID = random.choices(list(lineup.values()), k = 1)[0]
+                playerOffID = self.rng.choices(list(lineup.values()), k = 1)[0]
             else:
-                playerOffID = random.choices(list(players), k = 1)[0]
+                playerOffID = self.rng.choices(list(players), k = 1)[0]
 
             playerOffID = self.checkPlayerOff(playerOffID, processedEvents, time, lineup, home)
             playerPos = "Goalkeeper"
 
         # Get the substitute choice
-        subChoice = find_substitute(lineup, [(1, playerOffID, playerPos)], subs, 1, playerOBJs)[0]
+        subChoice = find_substitute(lineup, [(1, playerOffID, playerPos)], subs, 1, playerOBJs, self.rng)[0]
         playerOnID = subChoice[2]
         newPosition = subChoice[3]
 
-        events[sub_time] = {
+        events.add(sub_time, {
             "type": "substitution",
             "player": None,
             "player_off": playerOffID,
@@ -988,7 +1239,7 @@ class Match():
             "old_position": list(lineup.keys())[list(lineup.values()).index(playerOffID)],
             "new_position": newPosition,
             "extra": extraTime,
-        }
+        })
 
     def checkPlayerOff(self, playerID, processEvents, time, lineup, home, checked_players = None):
         """
@@ -996,7 +1247,7 @@ class Match():
         
         Args:
             playerID (str): The ID of the player being substituted off.
-            processEvents (dict): The events that have already been processed for the team.
+            processEvents (MatchTimeline): The events that have already been processed for the team.
             time (str): The time of the event in "mm:ss" format.
             lineup (dict): The current lineup of the team.
             home (bool): Whether the team is the home team or away team.
@@ -1008,24 +1259,23 @@ class Match():
         if checked_players is None:
             checked_players = set()
 
-        for event_time, event_data in processEvents.items():
-            if event_data["type"] == "substitution" and event_data["player_on"] == playerID:
-                eventMinute = int(event_time.split(":")[0])
-                currMinute = int(time.split(":")[0])
-                if eventMinute < currMinute - 30:
-                    return playerID  # Found a valid player
-                else:
-                    checked_players.add(playerID)
+        eventMinute = processEvents.subOnMinute(playerID)
+        if eventMinute is not None:
+            currMinute = parse_event_time(time) // 60
+            if eventMinute < currMinute - 30:
+                return playerID  # Found a valid player
+            else:
+                checked_players.add(playerID)
 
-                    players_dict = {p.id: p for p in playerOBJs.values() if p.id in lineup.values()}
+                players_dict = {p.id: p for p in playerOBJs.values() if p.id in lineup.values()}
 
-                    available_players = [player.id for player in players_dict.values() if player.position != "goalkeeper" and player.id not in checked_players]
-                    if not available_players:
-                        return random.choices(list(lineup.values()), k = 1)[0]  # No available players, return a random player
-                    
-                    # Recursively check a new player
-                    new_player = random.choices(available_players, k = 1)[0]
-                    return self.checkPlayerOff(new_player, processEvents, time, lineup, home, checked_players = checked_players)
+                available_players = [player.id for player in players_dict.values() if player.position != "goalkeeper" and player.id not in checked_players]
+                if not available_players:
+                    return self.rng.choices(list(lineup.values()), k = 1)[0]  # No available players, return a random player
+                
+                # Recursively check a new player
+                new_player = self.rng.choices(available_players, k = 1)[0]
+                return self.checkPlayerOff(new_player, processEvents, time, lineup, home, checked_players = checked_players)
 
         return playerID  # No substitution event found for the player
 
@@ -1055,6 +1305,7 @@ class Match():
 
         if not managing_event:
             lineup[playerPosition] = playerOnID # add the player on to the lineup
+            self.invalidateAggregates(home)
         else:
             # Update the event with substitution details
             managing_event["player_on"] = playerOnID
@@ -1095,7 +1346,7 @@ class Match():
         prefix = f"[{getattr(self.match, 'id', None)}]:"
 
         try:
-            currDate = Game.get_game_date(Managers.get_all_user_managers()[0].id)
+            currDate = self.context.currDate
 
             try:
                 # Reconcile score from processed events in case of discrepancies
@@ -1157,9 +1408,6 @@ class Match():
 
             totalCards = 0
 
-            homeManager = Managers.get_manager_by_id(self.homeTeam.manager_id)
-            awayManager = Managers.get_manager_by_id(self.awayTeam.manager_id)
-
             # LeagueTeams updates
             payload["team_updates"].append((
                 self.homeTeam.id,
@@ -1183,25 +1431,25 @@ class Match():
 
             # Managers updates
             payload["manager_updates"].append((
-                homeManager.id,
+                self.homeTeam.manager_id,
                 1 if self.winner == self.homeTeam else 0,
                 1 if self.winner == self.awayTeam else 0
             ))
 
             payload["manager_updates"].append((
-                awayManager.id,
+                self.awayTeam.manager_id,
                 1 if self.winner == self.awayTeam else 0,
                 1 if self.winner == self.homeTeam else 0
             ))
 
             # Match events
             events_to_add = []
-            for t, event in self.homeProcessedEvents.items():
+            for eventSeconds, event in self.homeProcessedEvents.entries():
                 player_id = event.get("player") or None
                 assister_id = event.get("assister") or None
                 player_off_id = event.get("player_off") or None
                 player_on_id = event.get("player_on") or None
-                minute = int(t.split(":")[0]) + 1
+                minute = eventSeconds // 60 + 1
 
                 if event["extra"]:
                     if minute <= 50:
@@ -1239,7 +1487,7 @@ class Match():
                     events_to_add.append((self.match.id, "sub_on", minute, player_on_id))
                 elif event["type"] in ("injury", "red_card"):
                     events_to_add.append((self.match.id, event["type"], minute, player_id))
-                    ban = get_player_ban(event["type"], currDate)
+                    ban = get_player_ban(event["type"], currDate, self.rng)
                     logger.debug(f"{prefix} Computed ban length={ban} for player={player_id} type={event['type']}")
                     payload["player_bans"].append((player_id, self.match.league_id if event["type"] == "red_card" else None, ban, event["type"], currDate))
 
@@ -1256,12 +1504,12 @@ class Match():
                     events_to_add.append((self.match.id, event["type"], minute, player_id))
                     logger.debug(f"{prefix} Home event queued: event={event["type"]}, match={self.match.id}, player={player_id}, minute={minute}")
 
-            for t, event in self.awayProcessedEvents.items():
+            for eventSeconds, event in self.awayProcessedEvents.entries():
                 player_id = event.get("player") or None
                 assister_id = event.get("assister") or None
                 player_off_id = event.get("player_off") or None
                 player_on_id = event.get("player_on") or None
-                minute = int(t.split(":")[0]) + 1
+                minute = eventSeconds // 60 + 1
 
                 if event["extra"]:
                     if minute <= 50:
@@ -1299,7 +1547,7 @@ class Match():
                     events_to_add.append((self.match.id, "sub_on", minute, player_on_id))
                 elif event["type"] in ("injury", "red_card"):
                     events_to_add.append((self.match.id, event["type"], minute, player_id))
-                    ban = get_player_ban(event["type"], currDate)
+                    ban = get_player_ban(event["type"], currDate, self.rng)
                     logger.debug(f"{prefix} Computed ban length={ban} for player={player_id} type={event['type']}")
                     payload["player_bans"].append((player_id, self.match.league_id if event["type"] == "red_card" else None, ban, event["type"], currDate))
                     
@@ -1347,18 +1595,18 @@ class Match():
             if self.winner:
                 if self.winner.id == self.homeTeam.id:
                     # check for overthrow on the away team 
-                    homeAverage = Teams.get_team_average_current_ability(self.homeTeam.id)
-                    awayAverage = Teams.get_team_average_current_ability(self.awayTeam.id)
+                    homeAverage = self.getTeamAverage(True)
+                    awayAverage = self.getTeamAverage(False)
 
-                    if awayAverage - homeAverage >= get_overthrow_threshold(self.match.league_id):
+                    if awayAverage - homeAverage >= self.getOverthrowThreshold():
                         payload["news_to_add"].append(("overthrow", (self.match.date + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), self.match.league_id, self.match.matchday, None, self.match.id, None, None, self.homeTeam.id))
 
                 elif self.winner.id == self.awayTeam.id:
                     # check for overthrow on the home team
-                    homeAverage = Teams.get_team_average_current_ability(self.homeTeam.id)
-                    awayAverage = Teams.get_team_average_current_ability(self.awayTeam.id)
+                    homeAverage = self.getTeamAverage(True)
+                    awayAverage = self.getTeamAverage(False)
 
-                    if homeAverage - awayAverage >= get_overthrow_threshold(self.match.league_id):
+                    if homeAverage - awayAverage >= self.getOverthrowThreshold():
                         payload["news_to_add"].append(("overthrow", (self.match.date + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0), self.match.league_id, self.match.matchday, None, self.match.id, None, None, self.awayTeam.id))
 
             payload["form_to_check"].append((self.homeTeam.id, self.match.id, self.match.league_id))
@@ -1452,7 +1700,7 @@ class Match():
                     )
 
                     if player.player_role != "Youth Team" and not playerAdded:
-                        if PlayerBans.check_bans_for_player(player.id, self.league.league_id):
+                        if self.isBanned(player.id):
                             # Player unavailable (injury, suspension, etc.)
                             reason = "unavailable"
                         else:
@@ -1546,7 +1794,7 @@ class Match():
                     )
 
                 if player.player_role != "Youth Team" and not playerAdded:
-                    if PlayerBans.check_bans_for_player(player.id, self.league.league_id):
+                    if self.isBanned(player.id):
                         # Player unavailable (injury, suspension, etc.)
                         reason = "unavailable"
                     else:
@@ -1616,7 +1864,7 @@ class Match():
         
         Args:
             playerID (str): The ID of the player.
-            events (dict): The match events.
+            events (MatchTimeline): The match events.
         """
 
         sub_off_time = None
@@ -1624,18 +1872,20 @@ class Match():
         red_card_time = None
         injury_time = None
 
-        for time, event in events.items():
+        for eventSeconds, event in events.entries():
+            minute = eventSeconds // 60
+
             if event["type"] == "sub_on" and event["player"] == playerID:
-                sub_on_time = parse_time(time.split(":")[0])
+                sub_on_time = minute
 
             if event["type"] == "sub_off" and event["player"] == playerID:
-                sub_off_time = parse_time(time.split(":")[0])
+                sub_off_time = minute
 
             if event["type"] == "red_card" and event["player"] == playerID:
-                red_card_time = parse_time(time.split(":")[0])
+                red_card_time = minute
 
             if event["type"] == "injury" and event["player"] == playerID:
-                injury_time = parse_time(time.split(":")[0])
+                injury_time = minute
 
         playedEnough = False
         game_time = 0
@@ -1680,7 +1930,7 @@ class Match():
             morales_to_update (list): The list to append morale updates to.
             lineups_to_add (list): The list to append lineup entries to.
             sharpnesses_to_update (list): The list to append sharpness updates to.
-            processed_events (dict): The processed match events for the team.
+            processed_events (MatchTimeline): The processed match events for the team.
             winner (Team or None): The winning team, or None for a draw.
             team (Team): The team the player belongs to.
             goal_diff (int): The goal difference for the team.
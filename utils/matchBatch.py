@@ -0,0 +1,251 @@
+import numpy as np
+from settings import *
+from utils.match import Match
+
+GOAL_EVENTS = ("nothing", "Shots", "Shots on target", "goal")
+FOUL_EVENTS = ("nothing", "Fouls", "yellow_card", "red_card")
+INJURY_EVENTS = ("nothing", "injury")
+SEVERITY_FACTORS = {"low": 0.8, "medium": 1.0, "high": 1.2}
+SIDES = ("home", "away")
+
+# The keeper a side shoots at (see goalProbabilities)
+NO_KEEPER, OUTFIELD_KEEPER, GOALKEEPER = 0, 1, 2
+
+def goalProbabilityArrays(attackingLevel, defendingLevel, avgSharpness, avgMorale, keeperType, keeperModifier, goalBoost = 1.0):
+    """
+    Array version of goalProbabilities, for many sides at once. Returns the probabilities in the order of GOAL_EVENTS
+    along the last axis.
+
+    Args:
+        attackingLevel (np.ndarray): The attacking levels of the sides.
+        defendingLevel (np.ndarray): The defending levels of the opponents.
+        avgSharpness (np.ndarray): The average sharpness of the sides, keepers excluded (0 to 100).
+        avgMorale (np.ndarray): The average morale of the sides, keepers excluded (0 to 100).
+        keeperType (np.ndarray): The opponent keeper of each side (NO_KEEPER, OUTFIELD_KEEPER or GOALKEEPER).
+        keeperModifier (np.ndarray): The keeper modifier of the opponent keepers (only used for GOALKEEPER).
+        goalBoost (float): A multiplier for goal chances (default is 1.0).
+    """
+
+    attackRatio = 0.5 + 1 / (1 + np.exp(-(attackingLevel - defendingLevel) / 20))
+
+    combined_form = (0.25 * (avgSharpness / 100)) + (0.75 * (avgMorale / 100))
+    attackModifier = np.minimum(combined_form ** 0.5, 1.05)
+
+    ratio_factor = attackRatio / (attackRatio + 1) # attackRatio is always above 0.5
+
+    weight_ratio = 0.8
+    weight_modifier = 1 - weight_ratio
+    effective_attack = attackRatio * weight_ratio + attackModifier * weight_modifier * goalBoost
+
+    keeper = [keeperType == GOALKEEPER, keeperType == OUTFIELD_KEEPER]
+
+    shotProb = np.select(keeper, [
+        np.clip(BASE_SHOT * effective_attack * 0.4 * (1 - keeperModifier * 0.3), 0.01, MAX_SHOT_PROB),
+        np.clip(BASE_SHOT * effective_attack * 0.6, 0.08, 0.55),
+    ], np.clip(BASE_SHOT * effective_attack * 0.7, 0.15, 0.6))
+
+    onTargetProb = np.select(keeper, [
+        np.clip(BASE_ON_TARGET * effective_attack * 0.7 * (1 - keeperModifier * 0.25), 0.10, MAX_TARGET_PROB),
+        np.clip(BASE_ON_TARGET * effective_attack * 0.9, 0.25, 0.7),
+    ], np.clip(BASE_ON_TARGET * effective_attack * 1.0, 0.40, 0.75))
+
+    goalProb = np.select(keeper, [
+        np.clip(BASE_GOAL * effective_attack * ratio_factor * (1 - keeperModifier), 0.01, MAX_GOAL_PROB),
+        np.clip(BASE_GOAL * effective_attack * 1.2, 0.35, 0.8),
+    ], np.clip(BASE_GOAL * effective_attack * 1.5, 0.65, 0.9))
+
+    return np.stack([
+        1 - shotProb,
+        shotProb * (1 - onTargetProb),
+        shotProb * onTargetProb * (1 - goalProb),
+        shotProb * onTargetProb * goalProb,
+    ], axis = -1)
+
+def foulProbabilityArrays(avgSharpnessWthKeeper, severity):
+    """
+    Array version of foulProbabilities. Returns the probabilities in the order of FOUL_EVENTS along the last axis.
+
+    Args:
+        avgSharpnessWthKeeper (np.ndarray): The average sharpness of the sides, keepers included (0 to 100).
+        severity (np.ndarray): The severity factors of the referees (see SEVERITY_FACTORS).
+    """
+
+    sf = np.clip(((100.0 - avgSharpnessWthKeeper) / 50.0) ** 0.5, 0.5, 2.0)
+
+    foulProb = np.clip(BASE_FOUL * sf, 0.01, 0.20)
+    yellowProb = np.clip(BASE_YELLOW * sf * severity, 0.002, 0.05)
+    redProb = np.clip(BASE_RED * sf * severity, 0.0001, 0.02)
+
+    # ensure total <= 1
+    total = foulProb + yellowProb + redProb
+    scale = np.where(total > 1, 1.0 / total, 1.0)
+    foulProb, yellowProb, redProb = foulProb * scale, yellowProb * scale, redProb * scale
+
+    return np.stack([1.0 - (foulProb + yellowProb + redProb), foulProb, yellowProb, redProb], axis = -1)
+
+def injuryProbabilityArrays(avgFitness):
+    """
+    Array version of injuryProbabilities. Returns the probabilities in the order of INJURY_EVENTS along the last axis
+    (no injury possible for a side with no fitness left).
+
+    Args:
+        avgFitness (np.ndarray): The average fitness of the sides (0 to 100).
+    """
+
+    fitness = np.where(avgFitness > 0, avgFitness, 100.0)
+    injuryProb = np.where(avgFitness > 0, np.clip(BASE_INJURY * (100 / fitness), 0.0001, MAX_INJURY_PROB), 0.0)
+
+    return np.stack([1 - injuryProb, injuryProb], axis = -1)
+
+def pickOutcomes(probabilities, uniforms):
+    """
+    Map uniform draws through the cumulative probabilities along the last axis, the same way random.choices does.
+    Returns the index of the outcome picked for each row.
+
+    Args:
+        probabilities (np.ndarray): The probabilities, outcomes along the last axis.
+        uniforms (np.ndarray): One uniform draw in [0, 1) per row.
+    """
+
+    cumulative = np.cumsum(probabilities, axis = -1)
+    x = uniforms * cumulative[..., -1]
+    return (cumulative[..., :-1] <= x[..., None]).sum(axis = -1)
+
+class MatchBatch():
+    BLOCK_TICKS = 64 # the number of ticks of uniform draws made at once for each fixture
+
+    def __init__(self, games, context):
+        """
+        Simulates a set of fixtures in lockstep: every fixture is advanced to its next TICK, the goal, foul and injury
+        chances of all of them are worked out and drawn together with NumPy, then each fixture generates and processes
+        its events as usual.
+
+        The per-side values the chances depend on are kept as rows of arrays (one row per fixture, one column per
+        side). Everything else (player picks, substitutions, ratings, the payload) is done by each fixture's Match, so
+        the payloads are the same format as a single simulation. The draws of a fixture only come from its own
+        generator, so a fixture gets the same result whichever fixtures it is batched with.
+
+        Args:
+            games (list): The Matches rows (or MatchBundles) of the fixtures.
+            context (SimulationContext): The save-wide values of the simulation run, shared by all fixtures.
+        """
+
+        self.matches = [Match(game, auto = True, context = context) for game in games]
+        n = len(self.matches)
+
+        self.attackingLevel = np.zeros((n, 2))
+        self.defendingLevel = np.zeros((n, 2)) # of the opponent
+        self.avgSharpness = np.zeros((n, 2))
+        self.avgSharpnessWthKeeper = np.zeros((n, 2))
+        self.avgMorale = np.zeros((n, 2))
+        self.avgFitness = np.zeros((n, 2))
+        self.keeperType = np.zeros((n, 2), dtype = np.int8) # of the opponent
+        self.keeperModifier = np.zeros((n, 2)) # of the opponent
+        self.severity = np.array([SEVERITY_FACTORS.get(match.refereeSeverity, 1.0) for match in self.matches])
+
+        self.uniforms = np.zeros((n, self.BLOCK_TICKS, 2, 3)) # fixture, tick, side, chance (goal, foul, injury)
+
+    def run(self):
+        """
+        Simulate all the fixtures to full time and return their payloads, in the order of the games.
+        """
+
+        for match in self.matches:
+            match.timerThread_running = True
+
+        pending = self.advance(range(len(self.matches)))
+        step = 0
+
+        while pending:
+            # every pending fixture uses one tick of draws per step, so they all refill at the same time
+            slot = step % self.BLOCK_TICKS
+            if slot == 0:
+                for i in pending:
+                    self.uniforms[i] = self.matches[i].npRng.random((self.BLOCK_TICKS, 2, 3))
+
+            for i in pending:
+                self.refreshRow(i)
+
+            rows = np.array(pending)
+            uniforms = self.uniforms[rows, slot]
+
+            goals = pickOutcomes(goalProbabilityArrays(
+                self.attackingLevel[rows], self.defendingLevel[rows], self.avgSharpness[rows], self.avgMorale[rows],
+                self.keeperType[rows], self.keeperModifier[rows]
+            ), uniforms[..., 0])
+            fouls = pickOutcomes(foulProbabilityArrays(self.avgSharpnessWthKeeper[rows], self.severity[rows, None]), uniforms[..., 1])
+            injuries = pickOutcomes(injuryProbabilityArrays(self.avgFitness[rows]), uniforms[..., 2])
+
+            for j, i in enumerate(pending):
+                match = self.matches[i]
+                match.batchOutcomes = {}
+                for s, side in enumerate(SIDES):
+                    match.batchOutcomes[(side, "goal")] = GOAL_EVENTS[goals[j, s]]
+                    match.batchOutcomes[(side, "foul")] = FOUL_EVENTS[fouls[j, s]]
+                    match.batchOutcomes[(side, "injury")] = INJURY_EVENTS[injuries[j, s]]
+
+                match.finishSecond(True)
+                match.batchOutcomes = None
+
+            pending = self.advance(pending)
+            step += 1
+
+        return [match.payload for match in self.matches]
+
+    def advance(self, indices):
+        """
+        Run each fixture through its event-driven clock until its next TICK (left to be finished by run) or full time.
+        Returns the indices of the fixtures waiting at a TICK.
+
+        Args:
+            indices (iterable): The indices of the fixtures to advance.
+        """
+
+        pending = []
+        for i in indices:
+            match = self.matches[i]
+
+            while match.timerThread_running:
+                total_seconds = match.minutes * 60 + match.seconds
+                match.minutes, match.seconds = divmod(match.nextActiveSecond(total_seconds), 60)
+
+                if match.beginSecond():
+                    pending.append(i)
+                    break
+
+                match.finishSecond(False)
+
+        return pending
+
+    def refreshRow(self, i):
+        """
+        Copy the current lineup values of a fixture into its rows of the arrays. The values come from the match's
+        cached aggregates, so this is only a few lookups unless the lineups or fitness changed.
+
+        Args:
+            i (int): The index of the fixture.
+        """
+
+        match = self.matches[i]
+        aggregates = (match.getAggregates(True), match.getAggregates(False))
+        lineups = (match.homeCurrentLineup, match.awayCurrentLineup)
+        playerOBJs = (match.homePlayersOBJ, match.awayPlayersOBJ)
+
+        for s in range(2):
+            o = 1 - s
+
+            self.attackingLevel[i, s] = aggregates[s]["attackingLevel"]
+            self.defendingLevel[i, s] = aggregates[o]["defendingLevel"]
+            self.avgSharpness[i, s] = aggregates[s]["avgSharpness"]
+            self.avgSharpnessWthKeeper[i, s] = aggregates[s]["avgSharpnessWthKeeper"]
+            self.avgMorale[i, s] = aggregates[s]["avgMorale"]
+            self.avgFitness[i, s] = aggregates[s]["avgFitness"]
+
+            oppKeeper = playerOBJs[o].get(lineups[o]["Goalkeeper"]) if "Goalkeeper" in lineups[o] else None
+            if not oppKeeper:
+                self.keeperType[i, s] = NO_KEEPER
+            elif oppKeeper.position == "goalkeeper":
+                self.keeperType[i, s] = GOALKEEPER
+                self.keeperModifier[i, s] = (oppKeeper.current_ability / 200) * (oppKeeper.sharpness / 100)
+            else:
+                self.keeperType[i, s] = OUTFIELD_KEEPER
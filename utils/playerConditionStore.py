@@ -0,0 +1,155 @@
+import numpy as np
+from settings import *
+
+class PlayerConditionStore():
+    def __init__(self, rows, injuredIDs):
+        """
+        The fitness, sharpness and morale of a set of players kept in NumPy arrays (one row per player), so the rest
+        and event changes of moveDate are applied to every player concerned in one vector operation instead of player
+        by player through dicts. Changes are rounded the same way as before after every step, so the results match.
+
+        Args:
+            rows (list): (player ID, team ID, fitness, sharpness, morale) rows.
+            injuredIDs (set): The IDs of the injured players (their fitness does not change).
+        """
+
+        self.ids = [row[0] for row in rows]
+
+        self.teamCodes = {} # team ID -> code in teams
+        self.teams = np.array([self.teamCodes.setdefault(row[1], len(self.teamCodes)) for row in rows], dtype = np.int32)
+
+        # whole numbers kept as floats, so the updates do not need to convert back and forth
+        self.fitness = np.array([row[2] for row in rows], dtype = np.float64)
+        self.sharpness = np.array([row[3] for row in rows], dtype = np.float64)
+        self.morale = np.array([row[4] for row in rows], dtype = np.float64)
+        self.injured = np.array([playerID in injuredIDs for playerID in self.ids], dtype = bool)
+
+        self.original = (self.fitness.copy(), self.sharpness.copy(), self.morale.copy())
+
+    @classmethod
+    def fromTeams(cls, team_ids, youths = True):
+        """
+        Load the players of the given teams and the injured players from the database.
+
+        Args:
+            team_ids (list): The IDs of the teams.
+            youths (bool, optional): Include the youth team players. Defaults to True.
+        """
+
+        from data.database import Players, PlayerBans
+
+        return cls(Players.get_conditions_by_teams(team_ids, youths = youths), PlayerBans.get_injured_player_ids())
+
+    def teamMask(self, teamIDs):
+        """
+        Get the mask of the rows of the players of the given teams.
+
+        Args:
+            teamIDs (iterable): The IDs of the teams.
+        """
+
+        codes = [self.teamCodes[teamID] for teamID in teamIDs if teamID in self.teamCodes]
+        return np.isin(self.teams, codes)
+
+    def rest(self, teamIDs, timeInBetween):
+        """
+        Rest the players of the given teams over a time interval: sharpness decays and fitness (of the players that
+        are not injured) recovers exponentially with the number of whole hours.
+
+        Args:
+            teamIDs (iterable): The IDs of the teams.
+            timeInBetween (timedelta): The time interval.
+        """
+
+        hours = int(timeInBetween.total_seconds() // 3600)
+        if hours <= 0:
+            return
+
+        mask = self.teamMask(teamIDs)
+        if not mask.any():
+            return
+
+        sharpnessDecayFactor = (1 - DAILY_SHARPNESS_DECAY / 24.0) ** hours
+        fitnessRecoveryFactor = (1 - DAILY_FITNESS_RECOVERY_RATE / 24.0) ** hours
+
+        self.sharpness = np.where(mask, np.round(np.maximum(self.sharpness * sharpnessDecayFactor, MIN_SHARPNESS)), self.sharpness)
+
+        mask &= ~self.injured
+        self.fitness = np.where(mask, np.ceil(np.minimum(100, 100 - (100 - self.fitness) * fitnessRecoveryFactor)), self.fitness)
+
+    def applyEvent(self, teamIDs, eventType):
+        """
+        Apply the changes of an event (morale for team building, fitness and sharpness for the ones in EVENT_CHANGES)
+        to the players of the given teams.
+
+        Args:
+            teamIDs (iterable): The IDs of the teams.
+            eventType (str): The type of the event.
+        """
+
+        if eventType != "Team Building" and eventType not in EVENT_CHANGES:
+            return
+
+        mask = self.teamMask(teamIDs)
+        if not mask.any():
+            return
+
+        if eventType == "Team Building":
+            self.morale = np.where(mask, np.clip(self.morale + 10, 0, 100), self.morale)
+        else:
+            fitness, sharpness = EVENT_CHANGES[eventType]
+            self.sharpness = np.where(mask, np.clip(self.sharpness + sharpness, 10, 100), self.sharpness)
+
+            mask &= ~self.injured
+            self.fitness = np.where(mask, np.clip(self.fitness + fitness, 0, 100), self.fitness)
+
+    def applyEvents(self, teamEvents):
+        """
+        Apply the events of an interval, one vector operation per event type. A team with several events in the
+        interval gets them in order: its first events are applied first, then its second ones, and so on.
+
+        Args:
+            teamEvents (list): (team ID, event type) pairs, in order.
+        """
+
+        rounds = [] # one {event type: [team IDs]} per round
+        counts = {}
+        for teamID, eventType in teamEvents:
+            count = counts.get(teamID, 0)
+            counts[teamID] = count + 1
+
+            if count == len(rounds):
+                rounds.append({})
+            rounds[count].setdefault(eventType, []).append(teamID)
+
+        for events in rounds:
+            for eventType, teamIDs in events.items():
+                self.applyEvent(teamIDs, eventType)
+
+    def changes(self):
+        """
+        Get the rows of the players whose fitness, sharpness or morale changed, as {"player_id", "fitness",
+        "sharpness", "morale"} dicts.
+        """
+
+        fitness, sharpness, morale = self.original
+        changed = np.flatnonzero((self.fitness != fitness) | (self.sharpness != sharpness) | (self.morale != morale))
+
+        return [
+            {"player_id": self.ids[row], "fitness": int(self.fitness[row]), "sharpness": int(self.sharpness[row]), "morale": int(self.morale[row])}
+            for row in changed.tolist()
+        ]
+
+    def save(self):
+        """
+        Write the changed rows back to the database in one statement, and return how many were written.
+        """
+
+        from data.database import Players
+
+        changes = self.changes()
+        if changes:
+            Players.batch_update_conditions(changes)
+
+        self.original = (self.fitness.copy(), self.sharpness.copy(), self.morale.copy())
+        return len(changes)
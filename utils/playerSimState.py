@@ -0,0 +1,58 @@
+class PlayerSimState():
+    # The player columns the match engine needs, in the order the constructor takes them
+    COLUMNS = ("id", "first_name", "last_name", "position", "specific_positions", "player_role", "current_ability", "morale", "fitness", "sharpness")
+
+    __slots__ = COLUMNS + ("positionCodes", "effective_ability")
+
+    def __init__(self, id, first_name, last_name, position, specific_positions, player_role, current_ability, morale, fitness, sharpness):
+        """
+        A read-only snapshot of a player for the match engine, taken when the match starts.
+
+        Plain attributes instead of an ORM row (no flag BLOB, no instrumented attribute reads). The specific positions
+        are split once and the effective ability is worked out once, as neither changes during a match: fitness,
+        ratings and lineups are tracked by the match itself and only written back through the payload.
+
+        Args:
+            id (str): The ID of the player.
+            first_name (str): The first name of the player.
+            last_name (str): The last name of the player.
+            position (str): The general position of the player ("goalkeeper", "defender", ...).
+            specific_positions (str): The comma separated position codes the player can play.
+            player_role (str): The role of the player in the squad.
+            current_ability (int): The current ability of the player.
+            morale (int): The morale of the player at kick off.
+            fitness (int): The fitness of the player at kick off.
+            sharpness (int): The sharpness of the player at kick off.
+        """
+
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.position = position
+        self.specific_positions = specific_positions
+        self.player_role = player_role
+        self.current_ability = current_ability
+        self.morale = morale
+        self.fitness = fitness
+        self.sharpness = sharpness
+
+        self.positionCodes = tuple(specific_positions.split(","))
+
+        # Same formula as util_functions.effective_ability: morale 20%, fitness 40%, sharpness 40%
+        weighted = (0.2 * morale + 0.4 * fitness + 0.4 * sharpness) / 100.0
+        multiplier = 0.75 + (weighted * 0.5)
+        self.effective_ability = current_ability * multiplier
+
+    @classmethod
+    def fromPlayer(cls, player):
+        """
+        Take a snapshot of a player row (or anything with the same attributes).
+
+        Args:
+            player (Players): The player to take the snapshot of.
+        """
+
+        return cls(*(getattr(player, column) for column in cls.COLUMNS))
+
+    def __repr__(self):
+        return f"PlayerSimState({self.id}, {self.first_name} {self.last_name}, {self.position})"
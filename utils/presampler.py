@@ -0,0 +1,64 @@
+import bisect, itertools
+
+class TickPresampler():
+    def __init__(self, generator, poolSize = 1024):
+        """
+        Picks the outcomes of the per-tick chances (goals, fouls, injuries, ...) of a match without a random.choices
+        call each time.
+
+        The uniform draws are made with NumPy in one block (roughly a half's worth) and mapped through the cumulative
+        probabilities of each chance, the same way random.choices does, so the outcome distribution is unchanged.
+        The cumulative probabilities are kept until something changes them (lineup or fitness), at which point the
+        chance is discarded and compiled again from the new values on its next draw.
+
+        Args:
+            generator (numpy.random.Generator): The generator used for the uniform draws.
+            poolSize (int): The number of uniform draws made at once.
+        """
+
+        self.generator = generator
+        self.poolSize = poolSize
+        self.uniforms = []
+        self.chances = {} # key -> (events, cumulative probabilities, total, last index)
+
+    def draw(self, key, probabilities):
+        """
+        Get the next outcome for a chance.
+
+        Args:
+            key (tuple): The key of the chance, e.g. ("home", "goal").
+            probabilities (function): Returns the (events, probabilities) of the chance. Only called when the chance
+                is not compiled yet or was discarded.
+        """
+
+        chance = self.chances.get(key)
+
+        if chance is None:
+            events, probs = probabilities()
+            cumulative = list(itertools.accumulate(probs))
+            chance = (events, cumulative, cumulative[-1], len(cumulative) - 1)
+            self.chances[key] = chance
+
+        events, cumulative, total, last = chance
+        return events[bisect.bisect(cumulative, self.random() * total, 0, last)]
+
+    def random(self):
+        """
+        Get the next presampled uniform draw in [0, 1), so the presampler can also be passed to TableSampler.sample.
+        """
+
+        if not self.uniforms:
+            self.uniforms = self.generator.random(self.poolSize).tolist()
+
+        return self.uniforms.pop()
+
+    def discard(self, *keys):
+        """
+        Forget the probabilities of the given chances, because the values they were calculated from changed.
+
+        Args:
+            keys (tuple): The keys of the chances.
+        """
+
+        for key in keys:
+            self.chances.pop(key, None)
@@ -0,0 +1,49 @@
+import bisect, itertools, random
+from settings import *
+
+class TableSampler():
+    def __init__(self, table):
+        """
+        A weighted table ({outcome: weight}) compiled once into a cumulative weight array, so picking from it does
+        not rebuild the lists every time. Picks exactly like random.choices(keys, weights = values)[0]: one random()
+        call mapped through the cumulative weights.
+
+        Args:
+            table (dict): The outcomes and their weights.
+        """
+
+        self.events = list(table.keys())
+        self.weights = list(table.values())
+        self.cumulative = list(itertools.accumulate(self.weights))
+        self.total = self.cumulative[-1] + 0.0
+        self.last = len(self.events) - 1
+
+    def sample(self, rng = random):
+        """
+        Pick an outcome.
+
+        Args:
+            rng: Anything with a random() method returning a float in [0, 1) (the random module by default).
+        """
+
+        return self.events[bisect.bisect(self.cumulative, rng.random() * self.total, 0, self.last)]
+
+    def probabilities(self):
+        """
+        Get the outcomes and their weights.
+        """
+
+        return self.events, self.weights
+
+GOAL_TYPE_SAMPLER = TableSampler(GOAL_TYPE_CHANCES)
+SCORER_SAMPLER = TableSampler(SCORER_CHANCES)
+ASSISTER_SAMPLER = TableSampler(ASSISTER_CHANCES)
+PENALTY_TAKER_SAMPLER = TableSampler(PENALTY_TAKER_CHANCES)
+OWN_GOAL_SAMPLER = TableSampler(OWN_GOAL_CHANCES)
+RED_CARD_SAMPLER = TableSampler(RED_CARD_CHANCES)
+SHOT_SAMPLER = TableSampler(SHOT_CHANCES)
+SHOT_DIRECTION_SAMPLER = TableSampler(SHOT_DIRECTION_CHANCES)
+DEFENSIVE_ACTIONS_SAMPLER = TableSampler(DEFENSIVE_ACTIONS_CHANCES)
+PASSING_POSITIONS_SAMPLER = TableSampler(PASSING_POSITIONS)
+DEFENSIVE_ACTION_POSITIONS_SAMPLER = TableSampler(DEFENSIVE_ACTION_POSITIONS)
+BIG_CHANCES_POSITIONS_SAMPLER = TableSampler(BIG_CHANCES_POSITIONS)
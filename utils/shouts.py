@@ -51,7 +51,7 @@ class ShoutFrame(ctk.CTkFrame):
         """
 
         events = self.match.homeEvents if home else self.match.awayEvents
-        type_ = random.choices(list(GOAL_TYPE_CHANCES.keys()), weights = [GOAL_TYPE_CHANCES[goalType] for goalType in GOAL_TYPE_CHANCES])[0]
+        type_ = GOAL_TYPE_SAMPLER.sample()
         if type_ == "penalty":
             type_ = "penalty_goal"
 
@@ -62,7 +62,7 @@ class ShoutFrame(ctk.CTkFrame):
         if minute >= 90:
             extra = True
 
-        events[str(minute) + ":" + str(second)] = {"type": type_, "extra": extra}
+        events.add(minute * 60 + second, {"type": type_, "extra": extra})
         self.match.appendScore(1, home)
 
     def removeGoal(self, home):
@@ -75,8 +75,8 @@ class ShoutFrame(ctk.CTkFrame):
 
         events = self.match.homeEvents if home else self.match.awayEvents
         
-        for event_time, event_data in events.items():
-            eventMinute = int(event_time.split(":")[0])
+        for event_time, event_data in list(events.items()):
+            eventMinute = events.timeOf(event_time) // 60
             if eventMinute < self.currMinute + 10 and eventMinute > self.currMinute and (event_data["type"] == "goal" or event_data["type"] == "penalty_goal" or event_data["type"] == "own_goal"):
                 del events[event_time]
                 self.match.appendScore(-1, home)
@@ -118,48 +118,29 @@ class ShoutFrame(ctk.CTkFrame):
         teamEvents = self.match.homeEvents if self.home else self.match.awayEvents
         oppEvents = self.match.awayEvents if self.home else self.match.homeEvents
 
-        teamScore = 0
-        oppScore = 0
-        wasWinning = False
+        # only check the last 10 minutes, up to when the shout was made
+        start, end = (self.currMinute - 10) * 60, self.currMinute * 60
+        goals = [(seconds, True) for seconds, event in teamEvents.between(start, end) if event["type"] in ["goal", "penalty_goal", "own_goal"]]
+        goals += [(seconds, False) for seconds, event in oppEvents.between(start, end) if event["type"] in ["goal", "penalty_goal", "own_goal"]]
+        goals.sort(key = lambda goal: goal[0])
 
-        if managingTeam:
-            for time in sorted(teamEvents.keys()):
-                minute = int(time.split(":")[0])
-                if minute < self.currMinute - 10: # only check the last 10 minutes
-                    continue
-                if minute >= self.currMinute: # stop checking when the shout was made
-                    break
-
-                if teamEvents[time]["type"] in ["goal", "penalty_goal", "own_goal"]:
-                    teamScore += 1
-                if oppEvents.get(time) and oppEvents[time]["type"] in ["goal", "penalty_goal", "own_goal"]:
-                    oppScore += 1
-
-                if teamScore > oppScore:
-                    wasWinning = True
-                elif teamScore == oppScore and wasWinning:
-                    return True
-
-            return False
-        else:
-            for time in sorted(oppEvents.keys()):
-                minute = int(time.split(":")[0])
-                if minute < self.currMinute - 10: # only check the last 10 minutes
-                    continue
-                if minute >= self.currMinute: # stop checking when the shout was made
-                    break
+        # the leading side is the shouting team if managing, otherwise the opponent
+        leadingScore = 0
+        chasingScore = 0
+        wasWinning = False
 
-                if oppEvents[time]["type"] in ["goal", "penalty_goal", "own_goal"]:
-                    oppScore += 1
-                if teamEvents.get(time) and teamEvents[time]["type"] in ["goal", "penalty_goal", "own_goal"]:
-                    teamScore += 1
+        for _, teamGoal in goals:
+            if teamGoal == managingTeam:
+                leadingScore += 1
+            else:
+                chasingScore += 1
 
-                if oppScore > teamScore:
-                    wasWinning = True
-                elif oppScore == teamScore and wasWinning:
-                    return True
+            if leadingScore > chasingScore:
+                wasWinning = True
+            elif leadingScore == chasingScore and wasWinning:
+                return True
 
-            return False
+        return False
 
     def opponentScoredLast5(self):
         """
@@ -168,11 +149,8 @@ class ShoutFrame(ctk.CTkFrame):
         
         oppEvents = self.match.awayEvents if self.home else self.match.homeEvents
 
-        for time in sorted(oppEvents.keys(), reverse = True):
-            minute = int(time.split(":")[0])
-            if minute < self.currMinute - 5:
-                break
-            if oppEvents[time]["type"] in ["goal", "penalty_goal", "own_goal"]:
+        for _, event in oppEvents.between((self.currMinute - 5) * 60, float("inf")):
+            if event["type"] in ["goal", "penalty_goal", "own_goal"]:
                 return True
 
         return False
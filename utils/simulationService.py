@@ -0,0 +1,129 @@
+import os, logging, time, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from settings import *
+
+logger = logging.getLogger(__name__)
+
+class SimulationService:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SimulationService, cls).__new__(cls)
+            cls._instance.executor = None
+            cls._instance.context = None
+            cls._instance.db_path = None
+            cls._instance.workers = 0
+            cls._instance.failed = False
+        return cls._instance
+
+    def get_executor(self, db_path):
+        """
+        Get the simulation worker pool, starting it the first time it is needed. The same workers are used for every
+        simulation run of the session, so the workers' start up (imports, name generators, ...) is only paid once.
+        The pool is restarted if the save it was started for changed, or if it stopped working: after a task failed
+        (see report_failure), the workers are checked before the pool is handed out again.
+
+        Args:
+            db_path (str): The path of the save database file the workers read from.
+        """
+
+        if self.executor is not None and db_path != self.db_path:
+            logger.info("Restarting the simulation workers for %s", db_path)
+            self.shutdown()
+        elif self.executor is not None and self.failed:
+            self.failed = False
+            if not self.is_healthy():
+                # a stuck worker would never finish, so the workers are not waited for
+                logger.warning("Restarting the simulation workers (workers not responding)")
+                self.shutdown(wait = False)
+
+        if self.executor is None:
+            from utils.util_functions import _init_worker
+
+            self.workers = SIMULATION_WORKERS or max(1, os.cpu_count() - 1)
+            self.context = WorkerContext()
+            self.executor = ProcessPoolExecutor(max_workers = self.workers, mp_context = self.context, initializer = _init_worker, initargs = (db_path,))
+            self.db_path = db_path
+            logger.info("Started %d simulation workers for %s", self.workers, db_path)
+
+        return self.executor
+
+    def report_failure(self):
+        """
+        Note that submitting to the pool or getting a result from it failed, so the next get_executor checks the
+        workers still respond before handing the pool out.
+        """
+
+        self.failed = True
+
+    def is_healthy(self):
+        """
+        Check that the pool still accepts and runs work (a worker that died breaks the whole pool).
+        """
+
+        try:
+            return self.executor.submit(_ping_worker).result(timeout = SIMULATION_HEALTH_TIMEOUT)
+        except Exception:
+            logger.exception("Simulation worker health check failed")
+            return False
+
+    def shutdown(self, wait = True):
+        """
+        Stop the workers, cancelling anything still queued. Called when the app closes, and when the pool is restarted.
+
+        Args:
+            wait (bool, optional): Give the workers SIMULATION_SHUTDOWN_TIMEOUT seconds to finish what they are running
+                (clean exit). Either way, the workers still running after that are terminated, so a stuck worker
+                never blocks the caller. Defaults to True.
+        """
+
+        if self.executor is None:
+            return
+
+        processes = list(self.context.processes)
+
+        try:
+            self.executor.shutdown(wait = False, cancel_futures = True)
+        except Exception:
+            logger.exception("Could not shut down the simulation workers cleanly")
+
+        deadline = time.monotonic() + (SIMULATION_SHUTDOWN_TIMEOUT if wait else 0)
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+
+            if process.is_alive():
+                logger.warning("Terminating simulation worker %d", process.pid)
+                process.terminate()
+                process.join(1)
+
+        self.executor = None
+        self.context = None
+        self.db_path = None
+        self.workers = 0
+        self.failed = False
+
+class WorkerContext:
+    def __init__(self):
+        """
+        The multiprocessing context of the simulation pool: the default context, keeping a handle on every worker
+        process the pool starts, so the workers can be joined and terminated when the pool is stopped.
+        """
+
+        self.base = multiprocessing.get_context()
+        self.processes = []
+
+    def Process(self, *args, **kwargs):
+        process = self.base.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+    def __getattr__(self, name):
+        return getattr(self.base, name)
+
+def _ping_worker():
+    """
+    Health check task: returns True from a worker.
+    """
+
+    return True
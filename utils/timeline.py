@@ -0,0 +1,263 @@
+import heapq, itertools
+from collections import Counter
+from collections.abc import MutableMapping
+
+class MatchTimeline(MutableMapping):
+    def __init__(self):
+        """
+        The events of one side of a match, stored by total seconds.
+
+        Behaves like the old "mm:ss" keyed dictionary so the GUI code can keep reading and writing it, but also
+        keeps a heap of the events still to be played and running counters used for the extra time calculation.
+        Events added with add() never overwrite each other: a second event on the same second gets the key
+        "mm:ss#1", "mm:ss#2", ...
+        """
+
+        self.events = {} # key -> (seconds, seq, details), in insertion order
+        self.pending = [] # heap of (seconds, seq, key) for events not yet played
+        self.deferred = set() # keys that were due but could not be played yet (extra time mismatch)
+        self.sequence = itertools.count()
+
+        self.regularEvents = [0, 0] # non substitution, non extra events in the [first half, second half]
+        self.extraMinutes = [Counter(), Counter()] # minutes of the extra time events for the [first half, second half]
+        self.subOnMinutes = {} # player id -> minute they were subbed on (first substitution only)
+
+    # ------------------ MAPPING ------------------
+    def __getitem__(self, key):
+        return self.events[self.normaliseKey(key)][2]
+
+    def __setitem__(self, key, details):
+        key = self.normaliseKey(key)
+
+        if key in self.events:
+            self.removeEntry(key)
+
+        self.insertEntry(key, self.keySeconds(key), details)
+
+    def __delitem__(self, key):
+        key = self.normaliseKey(key)
+
+        if key not in self.events:
+            raise KeyError(key)
+
+        self.removeEntry(key)
+
+    def __iter__(self):
+        return iter(list(self.events))
+
+    def __len__(self):
+        return len(self.events)
+
+    def __contains__(self, key):
+        try:
+            return self.normaliseKey(key) in self.events
+        except (AttributeError, ValueError):
+            return False
+
+    def __repr__(self):
+        return f"MatchTimeline({dict(self.items())})"
+
+    # ------------------ TYPED API ------------------
+    def add(self, seconds, details):
+        """
+        Add an event at the given time without overwriting any event already on that second.
+
+        Args:
+            seconds (int): The time of the event in total seconds.
+            details (dict): The event details.
+        """
+
+        key = self.makeKey(seconds)
+        index = 0
+        while key in self.events:
+            index += 1
+            key = self.makeKey(seconds, index)
+
+        self.insertEntry(key, seconds, details)
+        return key
+
+    def timeOf(self, key):
+        """
+        Get the time in total seconds of the event stored under key.
+
+        Args:
+            key (str): The event key.
+        """
+
+        return self.events[self.normaliseKey(key)][0]
+
+    def entries(self):
+        """
+        Get (seconds, details) for every event, in the order they were added.
+        """
+
+        return [(seconds, details) for seconds, _, details in self.events.values()]
+
+    def between(self, start, end):
+        """
+        Get (seconds, details) for the events with start <= seconds < end, in time order.
+
+        Args:
+            start (int): The start of the window in total seconds.
+            end (int): The end of the window in total seconds (exclusive).
+        """
+
+        window = [entry for entry in self.events.values() if start <= entry[0] < end]
+        return [(seconds, details) for seconds, _, details in sorted(window, key = lambda entry: entry[:2])]
+
+    def popDue(self, seconds):
+        """
+        Remove and return the pending events due at exactly this second as (key, details), in the order they were added.
+        Pending events whose time has already passed are deferred.
+
+        Args:
+            seconds (int): The current match time in total seconds.
+        """
+
+        due = []
+        while self.pending and self.pending[0][0] <= seconds:
+            eventSeconds, seq, key = heapq.heappop(self.pending)
+
+            entry = self.events.get(key)
+            if not entry or entry[1] != seq:
+                continue # removed or replaced since it was scheduled
+
+            if eventSeconds == seconds:
+                due.append((key, entry[2]))
+            else:
+                self.deferred.add(key)
+
+        return due
+
+    def defer(self, key):
+        """
+        Put back an event returned by popDue that could not be played. It will only be due again after a rewind.
+
+        Args:
+            key (str): The event key.
+        """
+
+        self.deferred.add(key)
+
+    def rewind(self, seconds):
+        """
+        The clock went back (end of the first half extra time): reschedule the deferred events from this time onwards.
+
+        Args:
+            seconds (int): The new match time in total seconds.
+        """
+
+        for key in list(self.deferred):
+            entry = self.events.get(key)
+            if not entry:
+                self.deferred.discard(key)
+            elif entry[0] >= seconds:
+                self.deferred.discard(key)
+                heapq.heappush(self.pending, (entry[0], entry[1], key))
+
+    def nextTime(self):
+        """
+        Get the time in total seconds of the next pending event, or None if there is none.
+        """
+
+        while self.pending:
+            seconds, seq, key = self.pending[0]
+            entry = self.events.get(key)
+
+            if entry and entry[1] == seq:
+                return seconds
+
+            heapq.heappop(self.pending)
+
+        return None
+
+    def halfEventCount(self, firstHalf):
+        """
+        Get the number of non substitution events played in normal time of a half.
+
+        Args:
+            firstHalf (bool): True for the first half, False for the second half.
+        """
+
+        return self.regularEvents[0 if firstHalf else 1]
+
+    def lastExtraMinute(self, firstHalf):
+        """
+        Get the minute after the last extra time event of a half (0 if there are none).
+
+        Args:
+            firstHalf (bool): True for the first half, False for the second half.
+        """
+
+        minutes = self.extraMinutes[0 if firstHalf else 1]
+        return max(minutes) + 1 if minutes else 0
+
+    def subOnMinute(self, playerID):
+        """
+        Get the minute a player was subbed on, or None if they were not.
+
+        Args:
+            playerID (str): The ID of the player.
+        """
+
+        return self.subOnMinutes.get(playerID)
+
+    # ------------------ INTERNALS ------------------
+    @staticmethod
+    def makeKey(seconds, index = 0):
+        key = f"{seconds // 60}:{seconds % 60:02d}"
+        return f"{key}#{index}" if index else key
+
+    @staticmethod
+    def keySeconds(key):
+        minutes, seconds = key.split("#")[0].split(":")
+        return int(minutes) * 60 + int(seconds)
+
+    def normaliseKey(self, key):
+        """
+        Convert any "m:s" style key (padded or not) to the canonical "mm:ss" form.
+        """
+
+        index = int(key.split("#")[1]) if "#" in key else 0
+        return self.makeKey(self.keySeconds(key), index)
+
+    def insertEntry(self, key, seconds, details):
+        seq = next(self.sequence)
+        self.events[key] = (seconds, seq, details)
+        heapq.heappush(self.pending, (seconds, seq, key))
+        self.count(seconds, details, 1)
+
+    def removeEntry(self, key):
+        seconds, _, details = self.events.pop(key)
+        self.deferred.discard(key)
+        self.count(seconds, details, -1)
+
+    def count(self, seconds, details, change):
+        """
+        Keep the extra time counters and the sub on minutes up to date when an event is added (1) or removed (-1).
+        The rules mirror the extra time calculation done at half and full time.
+        """
+
+        minute = seconds // 60
+
+        if details.get("extra"):
+            if minute < 90:
+                self.extraMinutes[0][minute] += change
+                if self.extraMinutes[0][minute] <= 0:
+                    del self.extraMinutes[0][minute]
+            elif minute > 90:
+                self.extraMinutes[1][minute] += change
+                if self.extraMinutes[1][minute] <= 0:
+                    del self.extraMinutes[1][minute]
+        elif details.get("type") != "substitution":
+            if minute < 45:
+                self.regularEvents[0] += change
+            elif minute > 45:
+                self.regularEvents[1] += change
+
+        if details.get("type") == "substitution" and details.get("player_on"):
+            playerID = details["player_on"]
+            if change > 0:
+                self.subOnMinutes.setdefault(playerID, minute)
+            elif self.subOnMinutes.get(playerID) == minute:
+                del self.subOnMinutes[playerID]
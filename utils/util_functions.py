@@ -1,6 +1,9 @@
 import calendar, math, random, os, zipfile
 from datetime import timedelta
 from settings import *
+from utils.sampler import *
+from utils.playerSimState import PlayerSimState
+from utils.lineupIndex import LineupIndex
 
 def get_objective_for_level(teamAverages, teamID):
     """
@@ -136,13 +139,14 @@ def get_fan_message(fan_reaction):
 
     return FAN_MESSAGES.get(fan_reaction, "The fans aren't sure how to react.")
 
-def get_player_ban(ban_type, curr_date):
+def get_player_ban(ban_type, curr_date, rng = random):
     """
     Generate a ban duration based on the type of ban.
     
     Args:
         ban_type (str): The type of ban ("injury" or "red card").
         curr_date (datetime): The current date to calculate the ban end date from.
+        rng (random.Random): The random number generator to use (the random module by default).
     """
     
     if ban_type == "injury":
@@ -151,13 +155,13 @@ def get_player_ban(ban_type, curr_date):
         max_days = 180  
 
         # Bias toward smaller durations by squaring a uniform random
-        r = random.random() ** 2   # 0..1, but skewed toward 0
+        r = rng.random() ** 2   # 0..1, but skewed toward 0
         days = min_days + int(r * (max_days - min_days))
 
         return (curr_date + datetime.timedelta(days = days)).replace(hour = 0, minute = 0, second = 0, microsecond = 0)
 
     else:  # red card
-        games = random.randint(1, 3)
+        games = rng.randint(1, 3)
         return games
     
 def get_morale_change(match_result, player_rating, goal_difference):
@@ -297,6 +301,18 @@ def parse_time(time_str, reverse = False):
     stoppage_time = int(parts[1].strip()) if len(parts) > 1 else 0
     return main_time + stoppage_time
 
+def parse_event_time(event_time):
+    """
+    Convert a match event key like "12:05" (or the unpadded "12:5") into the total number of seconds.
+    Keys of events sharing a second ("12:05#1") are accepted as well.
+
+    Args:
+        event_time (str): The event time in the format "minutes:seconds".
+    """
+
+    minutes, seconds = event_time.split("#")[0].split(":")
+    return int(minutes) * 60 + int(seconds)
+
 def player_reaction(score_for, score_against, player_events):
     """
     Calculate player reaction score based on match outcome and individual events for the half time talks.
@@ -771,13 +787,14 @@ def player_gametime(avg_minutes, player):
 
     return False
 
-def getFitnessDrop(player, fitness):
+def getFitnessDrop(player, fitness, rng = random):
     """
     Calculate fitness drop during a match based on player position and fitness level.
     
     Args:
         player (Player): The player object with a 'position' attribute.
         fitness (float): The current fitness level of the player (0 to 100).
+        rng (random.Random): The random number generator to use (the random module by default).
     """
 
     position_ranges = {
@@ -788,7 +805,7 @@ def getFitnessDrop(player, fitness):
     }
 
     # return a random float in the range for that position
-    drop = random.uniform(*position_ranges[player.position])
+    drop = rng.uniform(*position_ranges[player.position])
     scaled_drop = drop * (fitness / 100.0) ** 0.25
     return scaled_drop
 
@@ -831,9 +848,27 @@ def fitnessWeight(fitness):
     fitness_factor = (100 - fitness) / 100.0
     return max(fitness_factor, 0.01)  # avoid 0 prob
 
-def goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper, goalBoost = 1.0):
+def goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper, goalBoost = 1.0, rng = random):
+    """
+    Pick the outcome of an attack based on team levels, sharpness, morale, and opponent keeper.
+    
+    Args:
+        attackingLevel (float): The attacking team's level.
+        defendingLevel (float): The defending team's level.
+        avgSharpness (float): The average sharpness of the attacking team (0 to 100).
+        avgMorale (float): The average morale of the attacking team (0 to 100).
+        oppKeeper (Player or None): The opponent's goalkeeper player object, or None if no keeper.
+        goalBoost (float): A multiplier for goal chances (default is 1.0).
+        rng (random.Random): The random number generator to use (the random module by default).
+    """
+
+    events, probs = goalProbabilities(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper, goalBoost)
+    return rng.choices(events, weights = probs, k = 1)[0]
+
+def goalProbabilities(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeeper, goalBoost = 1.0):
     """
     Calculate the chances of scoring a goal based on team levels, sharpness, morale, and opponent keeper.
+    Returns the possible outcomes and their probabilities.
     
     Args:
         attackingLevel (float): The attacking team's level.
@@ -895,11 +930,25 @@ def goalChances(attackingLevel, defendingLevel, avgSharpness, avgMorale, oppKeep
     events = ["nothing", "Shots", "Shots on target", "goal"]
     probs  = [pNothing, pShotOff, pShotSaved, pGoal]
 
-    return random.choices(events, weights = probs, k = 1)[0]
+    return events, probs
+
+def foulChances(avgSharpnessWthKeeper, severity, rng = random):
+    """
+    Pick a foul outcome based on average sharpness and severity.
+    
+    Args:
+        avgSharpnessWthKeeper (float): The average sharpness of the team including the goalkeeper (0 to 100).
+        severity (str): The severity level ("low", "medium", "high").
+        rng (random.Random): The random number generator to use (the random module by default).
+    """
+
+    events, probs = foulProbabilities(avgSharpnessWthKeeper, severity)
+    return rng.choices(events, weights = probs, k = 1)[0]
 
-def foulChances(avgSharpnessWthKeeper, severity):
+def foulProbabilities(avgSharpnessWthKeeper, severity):
     """
     Calculate the chances of fouls, yellow cards, and red cards based on average sharpness and severity.
+    Returns the possible outcomes and their probabilities.
     
     Args:
         avgSharpnessWthKeeper (float): The average sharpness of the team including the goalkeeper (0 to 100).
@@ -935,19 +984,35 @@ def foulChances(avgSharpnessWthKeeper, severity):
     events = ["nothing", "Fouls", "yellow_card", "red_card"]
     probs = [pNothing, foulProb, yellowProb, redProb]
 
-    return random.choices(events, weights = probs, k = 1)[0]
+    return events, probs
 
-def injuryChances(avgFitness):
+def injuryChances(avgFitness, rng = random):
     """
-    Calculate the chances of injury based on average fitness.
+    Pick an injury outcome based on average fitness.
     
     Args:
         avgFitness (float): The average fitness level of the team (0 to 100).
+        rng (random.Random): The random number generator to use (the random module by default).
     """
 
     if avgFitness == 0:
         return
 
+    events, probs = injuryProbabilities(avgFitness)
+    return rng.choices(events, weights = probs, k = 1)[0]
+
+def injuryProbabilities(avgFitness):
+    """
+    Calculate the chances of injury based on average fitness. Returns the possible outcomes and their probabilities
+    (no injury possible if the team has no fitness left).
+    
+    Args:
+        avgFitness (float): The average fitness level of the team (0 to 100).
+    """
+
+    if avgFitness == 0:
+        return ["nothing"], [1]
+
     injuryProb = BASE_INJURY * (100 / avgFitness)
     injuryProb = min(max(injuryProb, 0.0001), MAX_INJURY_PROB)
 
@@ -958,9 +1023,9 @@ def injuryChances(avgFitness):
     events = ["nothing", "injury"]
     probs = [pNothing, pInjury]
 
-    return random.choices(events, weights = probs, k = 1)[0]
+    return events, probs
 
-def substitutionChances(lineup, subsMade, subs, events, currMinute, fitness, playerOBJs, ratings):
+def substitutionChances(lineup, subsMade, subs, events, currMinute, fitness, playerOBJs, ratings, rng = random):
     """
     Determine substitutions to make during a match based on player fitness and ratings.
     
@@ -968,11 +1033,12 @@ def substitutionChances(lineup, subsMade, subs, events, currMinute, fitness, pla
         lineup (dict): Current lineup with positions as keys and player IDs as values.
         subsMade (int): Number of substitutions already made.
         subs (list): List of available substitute player IDs.   
-        events (dict): Dictionary of match events with timestamps as keys.
+        events (MatchTimeline): The processed match events of the team.
         currMinute (int): Current minute of the match.
         fitness (dict): Dictionary mapping player IDs to their fitness levels.
-        playerOBJs (dict): Dictionary mapping player IDs to Player objects.
+        playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
         ratings (dict): Dictionary mapping player IDs to their ratings.
+        rng (random.Random): The random number generator to use (the random module by default).
     """
     
     subsAvailable = MAX_SUBS - subsMade
@@ -990,10 +1056,10 @@ def substitutionChances(lineup, subsMade, subs, events, currMinute, fitness, pla
     # how many subs
     outcomes = [1, 2, 3]
     weights = [0.65, 0.25, 0.10]
-    num_to_sub = random.choices(outcomes, weights=weights, k=1)[0]
+    num_to_sub = rng.choices(outcomes, weights=weights, k=1)[0]
     num_to_sub = min(num_to_sub, subsAvailable, len(candidates))
 
-    chosen = find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs)
+    chosen = find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs, rng)
 
     return chosen
 
@@ -1004,7 +1070,7 @@ def get_sub_candidates(lineup, currMinute, events, fitness, ratings):
     Args:
         lineup (dict): Current lineup with positions as keys and player IDs as values.
         currMinute (int): Current minute of the match.
-        events (dict): Dictionary of match events with timestamps as keys.
+        events (MatchTimeline): The processed match events of the team.
         fitness (dict): Dictionary mapping player IDs to their fitness levels.
         ratings (dict): Dictionary mapping player IDs to their ratings.
     """
@@ -1012,11 +1078,9 @@ def get_sub_candidates(lineup, currMinute, events, fitness, ratings):
     candidates = []
     for pos, playerID in lineup.items():
         played_minutes = currMinute
-        for event_time, event_data in events.items():
-            if event_data["type"] == "substitution" and event_data["player_on"] == playerID:
-                eventMinute = int(event_time.split(":")[0])
-                played_minutes = currMinute - eventMinute
-                break
+        subOnMinute = events.subOnMinute(playerID)
+        if subOnMinute is not None:
+            played_minutes = currMinute - subOnMinute
 
         if played_minutes >= 30:  # don’t sub too early
             prob = sub_probability(fitness[playerID], ratings[playerID])
@@ -1025,7 +1089,7 @@ def get_sub_candidates(lineup, currMinute, events, fitness, ratings):
 
     return candidates
 
-def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs):
+def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs, rng = random):
     """
     Find suitable substitutes for the candidates.
     
@@ -1034,7 +1098,8 @@ def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs):
         candidates (list): List of tuples (probability, playerID, position) for substitution candidates.
         subs (list): List of available substitute player IDs.   
         num_to_sub (int): Number of substitutions to make.
-        playerOBJs (dict): Dictionary mapping player IDs to Player objects.
+        playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
+        rng (random.Random): The random number generator to use (the random module by default).
     """
     
     chosen = []
@@ -1042,7 +1107,7 @@ def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs):
     for prob, playerID, pos in candidates:
         if len(chosen) >= num_to_sub:
             break
-        if random.random() < prob:
+        if rng.random() < prob:
             out_code = POSITION_CODES[pos]
 
             replacement_id = None
@@ -1052,7 +1117,7 @@ def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs):
             # --- Exact / compatible replacement ---
             for subID in subs:
                 player = playerOBJs[subID]
-                subPositions = [s for s in player.specific_positions.split(",")]
+                subPositions = player.positionCodes
 
                 # Direct match: outgoing code is explicitly listed in sub's positions
                 if out_code in subPositions:
@@ -1074,7 +1139,7 @@ def find_substitute(lineup, candidates, subs, num_to_sub, playerOBJs):
             if not replacement_id and subs:
                 for subID in subs:
                     sub_player = playerOBJs[subID]
-                    subPositions = [REVERSE_POSITION_CODES[s][0] for s in sub_player.specific_positions.split(",")]
+                    subPositions = [REVERSE_POSITION_CODES[s][0] for s in sub_player.positionCodes]
 
                     # pick the first full position not already in lineup.keys()
                     for full_pos in subPositions:
@@ -1124,19 +1189,20 @@ def sub_probability(fitness, rating):
     # Clamp to [0, 1]
     return max(0.0, min(1.0, prob))
     
-def getPasses(homeOBJs, awayOBJs):
+def getPasses(homeOBJs, awayOBJs, rng = random):
     """
     Determine number of passes for home and away teams based on effective abilities.
 
     Args:
-        homeOBJs (dict): Dictionary of home team player objects.
-        awayOBJs (dict): Dictionary of away team player objects.
+        homeOBJs (dict): Dictionary of home team player snapshots (PlayerSimState).
+        awayOBJs (dict): Dictionary of away team player snapshots (PlayerSimState).
+        rng (random.Random): The random number generator to use (the random module by default).
     """
 
-    overallHome = sum(effective_ability(p) for p in homeOBJs.values())
-    overallAway = sum(effective_ability(p) for p in awayOBJs.values())
+    overallHome = sum(p.effective_ability for p in homeOBJs.values())
+    overallAway = sum(p.effective_ability for p in awayOBJs.values())
 
-    total_passes = random.randint(3, 5)
+    total_passes = rng.randint(3, 5)
     # soften big differences (alpha = 0.5)
     alpha = 0.5
     home_weight = overallHome ** alpha
@@ -1144,7 +1210,7 @@ def getPasses(homeOBJs, awayOBJs):
     p_home = home_weight / (home_weight + away_weight)
 
     # allocate passes stochastically
-    home_passes = sum(random.random() < p_home for _ in range(total_passes))
+    home_passes = sum(rng.random() < p_home for _ in range(total_passes))
     away_passes = total_passes - home_passes
 
     # cap dominance (max 80% of passes)
@@ -1187,22 +1253,21 @@ def passesAndPossession(matchInstance):
         matchInstance (Match): The match instance containing all relevant data.
     """
     
-    homeLineup = matchInstance.homeCurrentLineup
-    awayLineup = matchInstance.awayCurrentLineup
     homeStats = matchInstance.homeStats
     awayStats = matchInstance.awayStats
     homePassesAttempted = matchInstance.homePassesAttempted
     awayPassesAttempted = matchInstance.awayPassesAttempted
     homeRatings = matchInstance.homeRatings
-    homePlayersOBJs = matchInstance.homePlayersOBJ
-    awayPlayersOBJs = matchInstance.awayPlayersOBJ
+    rng = matchInstance.rng
 
-    homeOBJs = {pid: p for pid, p in homePlayersOBJs.items() if pid in homeLineup.values()}
-    awayOBJs = {pid: p for pid, p in awayPlayersOBJs.items() if pid in awayLineup.values()}
+    homeIndex = matchInstance.getLineupIndex(True)
+    awayIndex = matchInstance.getLineupIndex(False)
+    homeOBJs = homeIndex.players
+    awayOBJs = awayIndex.players
 
     awayRatings = matchInstance.awayRatings
 
-    homePasses, awayPasses = getPasses(homeOBJs, awayOBJs)
+    homePasses, awayPasses = getPasses(homeOBJs, awayOBJs, rng)
     matchInstance.homePassesAttempted = homePassesAttempted + homePasses
     matchInstance.awayPassesAttempted = awayPassesAttempted + awayPasses
 
@@ -1210,33 +1275,33 @@ def passesAndPossession(matchInstance):
     # We scale sharpness into a range [0.60, 0.90] so even low-sharpness players have at least 60%
     # and very high sharpness caps at ~90%.
     for _ in range(homePasses):
-        playerID = choosePlayerFromDict(homeLineup, PASSING_POSITIONS, homeOBJs)
+        playerID = homeIndex.choose(PASSING_POSITIONS_SAMPLER, rng)
 
         raw = homeOBJs[playerID].sharpness / 100.0
         passCompleteProb = 0.60 + raw * (0.90 - 0.60)
 
-        if random.random() < passCompleteProb:
+        if rng.random() < passCompleteProb:
             # ensure the Passes dict exists and the player key is initialized
             homeStats.setdefault("Passes", {})
             homeStats["Passes"].setdefault(playerID, 0)
             homeStats["Passes"][playerID] += 1
 
-            rating = random.uniform(PASS_RATING[0], PASS_RATING[1])
+            rating = rng.uniform(PASS_RATING[0], PASS_RATING[1])
             homeRatings[playerID] = round(homeRatings.get(playerID, 0) + rating, 2)
 
     for _ in range(awayPasses):
-        playerID = choosePlayerFromDict(awayLineup, PASSING_POSITIONS, awayOBJs)
+        playerID = awayIndex.choose(PASSING_POSITIONS_SAMPLER, rng)
 
         raw = awayOBJs[playerID].sharpness / 100.0
         passCompleteProb = 0.60 + raw * (0.90 - 0.60)
 
-        if random.random() < passCompleteProb:
+        if rng.random() < passCompleteProb:
             # ensure the Passes dict exists and the player key is initialized
             awayStats.setdefault("Passes", {})
             awayStats["Passes"].setdefault(playerID, 0)
             awayStats["Passes"][playerID] += 1
 
-            rating = random.uniform(PASS_RATING[0], PASS_RATING[1])
+            rating = rng.uniform(PASS_RATING[0], PASS_RATING[1])
             awayRatings[playerID] = round(awayRatings.get(playerID, 0) + rating, 2)
 
     homeCompleted = getStatNum(homeStats["Passes"])
@@ -1250,147 +1315,58 @@ def passesAndPossession(matchInstance):
         homeStats["Possession"] = round((homeCompleted / totalCompleted) * 100)
         awayStats["Possession"] = 100 - homeStats["Possession"]
 
-def choosePlayerFromDict(lineup, dict_, playerOBJs):
+def choosePlayerFromDict(lineup, sampler, playerOBJs, rng = random, index = None):
     """
-    Choose a player from the lineup based on position weights and effective ability.
+    Choose a player from the lineup based on position weights and effective ability. Only the positions present in
+    the lineup can be drawn.
     
     Args:
         lineup (dict): Current lineup with positions as keys and player IDs as values.
-        dict_ (dict): Dictionary mapping positions to their selection weights.
-        playerOBJs (dict): Dictionary mapping player IDs to Player objects.
+        sampler (TableSampler): The compiled position weights (e.g. PASSING_POSITIONS_SAMPLER).
+        playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
+        rng (random.Random): The random number generator to use (the random module by default).
+        index (LineupIndex, optional): The position index of the lineup (see Match.getLineupIndex). Built here if not given.
     """
     
-    playerPosition = random.choices(list(dict_.keys()), weights = list(dict_.values()), k = 1)[0]
-    players = [playerID for playerID in lineup.values() if playerOBJs[playerID].position == playerPosition]
-
-    while len(players) == 0:
-        playerPosition = random.choices(list(dict_.keys()), weights = list(dict_.values()), k = 1)[0]
-        players = [playerID for playerID in lineup.values() if playerOBJs[playerID].position == playerPosition]
+    if index is None:
+        index = LineupIndex(lineup, playerOBJs)
 
-    weights = [effective_ability(playerOBJs[playerID]) for playerID in players]
-    if sum(weights) == 0:
-        weights = [1] * len(players)
+    return index.choose(sampler, rng)
 
-    return random.choices(players, weights = weights, k = 1)[0]
-
-def getStatPlayer(stat, lineup, playerOBJs):
+def getStatPlayer(stat, lineup, playerOBJs, rng = random, index = None):
     """
     Get a player responsible for a specific stat event based on lineup and player abilities.
     
     Args:
         stat (str): The type of stat event (e.g., "Saves", "Shots", "Fouls").
         lineup (dict): Current lineup with positions as keys and player IDs as values.
-        playerOBJs (dict): Dictionary mapping player IDs to Player objects.
+        playerOBJs (dict): Dictionary mapping player IDs to their PlayerSimState snapshots.
+        rng (random.Random): The random number generator to use (the random module by default).
+        index (LineupIndex, optional): The position index of the lineup, passed on to choosePlayerFromDict.
     """
     
     if playerOBJs is None:
         from data.database import Players
-        playerOBJs = {pid: Players.get_player_by_id(pid) for pid in lineup.values()}
+        playerOBJs = {pid: PlayerSimState.fromPlayer(Players.get_player_by_id(pid)) for pid in lineup.values()}
     
     match stat:
         case "Saves":
-            rating = random.uniform(SAVE_RATING[0], SAVE_RATING[1])
+            rating = rng.uniform(SAVE_RATING[0], SAVE_RATING[1])
             return lineup["Goalkeeper"] if "Goalkeeper" in lineup else None, rating if "Goalkeeper" in lineup else 0
         case "Shots" | "Shots on target" | "Shots in the box" | "Shots outside the box":
-            rating = random.uniform(SHOT_RATING[0], SHOT_RATING[1]) if stat != "Shots on target" else random.uniform(SHOT_TARGET_RATING[0], SHOT_TARGET_RATING[1])
-            return choosePlayerFromDict(lineup, SCORER_CHANCES, playerOBJs), rating
+            rating = rng.uniform(SHOT_RATING[0], SHOT_RATING[1]) if stat != "Shots on target" else rng.uniform(SHOT_TARGET_RATING[0], SHOT_TARGET_RATING[1])
+            return choosePlayerFromDict(lineup, SCORER_SAMPLER, playerOBJs, rng, index), rating
         case "Fouls":
             weights = [ownGoalFoulWeight(playerOBJs[playerID]) for playerID in lineup.values()]
-            rating = random.uniform(FOUL_RATING[0], FOUL_RATING[1])
-            return random.choices(list(lineup.values()), weights = weights, k = 1)[0], rating
+            rating = rng.uniform(FOUL_RATING[0], FOUL_RATING[1])
+            return rng.choices(list(lineup.values()), weights = weights, k = 1)[0], rating
         case "Tackles" | "Interceptions":
-            rating = random.uniform(DEFENSIVE_ACTION_RATING[0], DEFENSIVE_ACTION_RATING[1])
-            return choosePlayerFromDict(lineup, DEFENSIVE_ACTION_POSITIONS, playerOBJs), rating
+            rating = rng.uniform(DEFENSIVE_ACTION_RATING[0], DEFENSIVE_ACTION_RATING[1])
+            return choosePlayerFromDict(lineup, DEFENSIVE_ACTION_POSITIONS_SAMPLER, playerOBJs, rng, index), rating
         case "Big chances created" | "Big chances missed":
-            rating = random.uniform(BIG_CHANCE_CREATED_RATING[0], BIG_CHANCE_CREATED_RATING[1]) if stat == "Big chances created" else random.uniform(BIG_CHANCE_MISSED_RATING[0], BIG_CHANCE_MISSED_RATING[1])
-            return choosePlayerFromDict(lineup, BIG_CHANCES_POSITIONS, playerOBJs), rating
-    
-def apply_attribute_changes(fitness_map, sharpness_map, time_in_between):
-    """
-    Apply attribute changes to player fitness and sharpness over a time interval.
-    
-    Args:
-        fitness_map (dict): A dictionary mapping player IDs to [fitness, injured] lists.
-        sharpness_map (dict): A dictionary mapping player IDs to sharpness values.
-        time_in_between (timedelta): The time interval over which to apply changes.
-    """
-
-    hours = int(time_in_between.total_seconds() // 3600)
-    if hours <= 0:
-        return
-
-    # factors
-    hourly_sharpness_decay = DAILY_SHARPNESS_DECAY / 24.0
-    sharpness_decay_factor = (1 - hourly_sharpness_decay) ** hours
-
-    hourly_fitness_recovery = DAILY_FITNESS_RECOVERY_RATE / 24.0
-    fitness_recovery_factor = (1 - hourly_fitness_recovery) ** hours
-
-    # update sharpness
-    for pid, sharpness in sharpness_map.items():
-        new_sharpness = sharpness * sharpness_decay_factor
-        if new_sharpness < MIN_SHARPNESS:
-            new_sharpness = MIN_SHARPNESS
-        sharpness_map[pid] = int(round(new_sharpness))
-
-    # update fitness
-    for pid, (fitness, injured) in fitness_map.items():
-        if injured:
-            continue  
-
-        new_fitness = 100 - (100 - fitness) * fitness_recovery_factor
-        fitness_map[pid] = [int(math.ceil(min(100, new_fitness))), injured]
-
-def update_dict_values(values_dict, amount, min_value = None, max_value = None):
-    """
-    Update values in a dictionary by a specified amount, with optional min and max bounds.
+            rating = rng.uniform(BIG_CHANCE_CREATED_RATING[0], BIG_CHANCE_CREATED_RATING[1]) if stat == "Big chances created" else rng.uniform(BIG_CHANCE_MISSED_RATING[0], BIG_CHANCE_MISSED_RATING[1])
+            return choosePlayerFromDict(lineup, BIG_CHANCES_POSITIONS_SAMPLER, playerOBJs, rng, index), rating
     
-    Args:
-        values_dict (dict): A dictionary with numeric values to update.
-        amount (float): The amount to add to each value.
-        min_value (float, optional): Minimum bound for the updated values.
-        max_value (float, optional): Maximum bound for the updated values.
-    """
-
-    for k, v in values_dict.items():
-        new_val = v + amount
-
-        if min_value is not None and new_val < min_value:
-            new_val = min_value
-        if max_value is not None and new_val > max_value:
-            new_val = max_value
-
-        values_dict[k] = int(round(new_val))
-
-    return values_dict
-
-def update_fitness_dict_values(values_dict, amount, min_value = None, max_value = None):
-    """
-    Update fitness values in a dictionary by a specified amount, with optional min and max bounds.
-    
-    Args:
-        values_dict (dict): A dictionary with [fitness, injured] lists to update.
-        amount (float): The amount to add to each fitness value.
-        min_value (float, optional): Minimum bound for the updated fitness values. Defaults to None.
-        max_value (float, optional): Maximum bound for the updated fitness values. Defaults to None.
-    """
-
-    for k, (v, injured) in values_dict.items():
-
-        if injured:
-            continue
-
-        new_val = v + amount
-
-        if min_value is not None and new_val < min_value:
-            new_val = min_value
-        if max_value is not None and new_val > max_value:
-            new_val = max_value
-
-        values_dict[k] = [int(round(new_val)), injured]
-
-    return values_dict
-
 def get_all_league_teams(jsonData, leagueName):
     """
     Get all teams belonging to a specific league from JSON data.
@@ -1417,100 +1393,137 @@ def run_match_simulation(interval, currDate, exclude_leagues = [], progress_call
         currDate (datetime): The current date for the simulation context.
         exclude_leagues (list, optional): List of league IDs to exclude from simulation. Defaults to [].
         progress_callback (function, optional): A callback function to report progress. Defaults to None.
+
+    Raises:
+        Exception: If the results could not be saved (nothing of the run is saved then).
     """
     
-    from data.database import Matches, Managers, Teams, League, Emails, LeagueTeams, PlayerBans, TeamHistory, LeagueNews, process_payload, check_player_games_happy
-    from data.gamesDatabase import Game
-    from concurrent.futures import ProcessPoolExecutor, as_completed
-    import os, time, logging, glob, traceback
+    from data.database import DatabaseManager, Matches, League, Emails, LeagueTeams, PlayerBans, TeamHistory, LeagueNews, SimulationContext, MatchBundle, process_payload, check_player_games_happy
+    from utils.simulationService import SimulationService
+    from utils.compactPayload import CompactPayload
+    from concurrent.futures import as_completed
+    import time, logging, traceback
 
     _logger = logging.getLogger(__name__)
 
     matchesToSim = Matches.get_matches_time_frame(interval[0], interval[1], exclude_leagues)
-    worker_payloads = []
     if matchesToSim:
         total_to_sim = len(matchesToSim)
         _logger.info("Preparing to simulate %d matches", total_to_sim)
         _logger.info("Starting match initialization")
 
-        CHUNK_SIZE = min(len(matchesToSim), os.cpu_count() - 1)
-        total_batches = (total_to_sim + CHUNK_SIZE - 1) // CHUNK_SIZE
-
-        _logger.info("Starting parallel match simulation in up to %d batches (chunk=%d)", total_batches, CHUNK_SIZE)
-
         sim_start = time.perf_counter()
 
-        # Run batches sequentially to respect the maximum worker count
-        matches = []
-        teams = {}
-        mgr = Managers.get_all_user_managers()[0]
-        managerTeam = Teams.get_teams_by_manager(mgr.id)[0]
-        managerLeague = LeagueTeams.get_league_by_team(managerTeam.id)
-        base_name = Game.get_games_by_manager_id(mgr.id)[0].save_name
-
-        # Create the pool once, outside the batch loop
-        with ProcessPoolExecutor(max_workers=CHUNK_SIZE, initializer=_init_worker, initargs=(base_name,)) as ex:
-            for batch_index in range(0, total_to_sim, CHUNK_SIZE):
-                batch = matchesToSim[batch_index:batch_index + CHUNK_SIZE]
-                workers = min(len(batch), CHUNK_SIZE)
-                batch_no = (batch_index // CHUNK_SIZE) + 1
-                _logger.info(
-                    "Simulating batch %d/%d: %d matches with %d workers",
-                    batch_no, total_batches, len(batch), workers
-                )
-
-                # Submit tasks to the already-running pool
-                _logger.info("Submitting %d match tasks...", len(batch))
-                futures = [ex.submit(_simulate_match, g.id) for g in batch]
-                _logger.info("All match tasks submitted.")
-
-                for fut in as_completed(futures):
-                    try:
-                        result = fut.result()
-                        match = Matches.get_match_by_id(result["id"])
-                        matches.append(Matches.get_match_by_id(result["id"]))
-                        _logger.info("Finished match %s with score %s", result["id"], result["score"])
-
-                        worker_payload = result.get("payload")
-                        if worker_payload:
-
-                            _logger.debug("Checking player game happiness for match %s", match.id)
-                            homePayload = check_player_games_happy(match.home_id, currDate)
-                            awayPayload = check_player_games_happy(match.away_id, currDate)
-        
-                            _logger.debug("Updating worker payload for match %s", match.id)
-                            worker_payload["players_to_update"] = homePayload["players_to_update"]
-                            worker_payload["players_to_update"] = awayPayload["players_to_update"]
-                            worker_payload["emails_to_send"] = homePayload["emails_to_send"]
-                            worker_payload["emails_to_send"] = awayPayload["emails_to_send"]
+        matchesByID = {match.id: match for match in matchesToSim}
+        chunkPayloads = {}
+        happinessByID = {}
+        context = SimulationContext.build(currDate)
+        managerTeamID = context.userTeamID
+        managerLeagueID = context.leagueByTeam[managerTeamID]
+        # The workers read the file this process is working on (the save's working copy during a moveDate)
+        db_path = DatabaseManager().current_path()
+
+        # Load everything the matches read from the save up front, so the workers only simulate
+        bundles = MatchBundle.build_all(matchesToSim, context)
+        _logger.info("Loaded match bundles in %.3f seconds", time.perf_counter() - sim_start)
+
+        # The workers are started once and kept for the following runs
+        service = SimulationService()
+        ex = service.get_executor(db_path)
+
+        workers = min(total_to_sim, service.workers)
+        # Small enough chunks that every worker gets several, so a slow chunk does not hold up the others
+        chunk_size = max(1, min(SIMULATION_CHUNK_SIZE, total_to_sim // (workers * 4)))
+        _logger.info("Starting parallel match simulation with %d workers (%d chunks of up to %d matches)", workers, math.ceil(total_to_sim / chunk_size), chunk_size)
+
+        # Queue every chunk at once: a worker takes the next chunk as soon as it is done with one,
+        # and the results are handled as they come back (in any order)
+        simulate_chunk = _simulate_match_batch if BATCH_SIMULATION else _simulate_matches
+
+        def submit_chunks(ex):
+            return {ex.submit(simulate_chunk, [bundles[g.id] for g in matchesToSim[i:i + chunk_size]], context): (i, min(chunk_size, total_to_sim - i)) for i in range(0, total_to_sim, chunk_size)}
+
+        try:
+            futures = submit_chunks(ex)
+        except Exception:
+            # the pool broke since the last run (e.g. a worker died while idle), in which case it is restarted
+            _logger.exception("Could not submit the match chunks, checking the simulation workers")
+            service.report_failure()
+            ex = service.get_executor(db_path)
+            futures = submit_chunks(ex)
+        _logger.info("Submitted %d match chunks", len(futures))
+
+        def handle_result(result):
+            for simulated in result["matches"]:
+                match = matchesByID[simulated["id"]]
+                _logger.info("Finished match %s with score %s", simulated["id"], simulated["score"])
+
+                if simulated["simulated"]:
+
+                    _logger.debug("Checking player game happiness for match %s", match.id)
+                    homePayload = check_player_games_happy(match.home_id, currDate)
+                    awayPayload = check_player_games_happy(match.away_id, currDate)
+
+                    _logger.debug("Updating worker payload for match %s", match.id)
+                    happiness = {"players_to_update": [], "emails_to_send": []}
+                    for teamPayload in (homePayload, awayPayload):
+                        happiness["players_to_update"].extend(teamPayload["players_to_update"])
+                        happiness["emails_to_send"].extend(teamPayload["emails_to_send"])
+
+                    happinessByID[match.id] = happiness
+
+                    if progress_callback:
+                        progress_callback()
+
+            if result["failed"]:
+                _logger.error("Could not simulate matches %s, they are left unplayed", ", ".join(result["failed"]))
+
+        retried = False
+        while futures:
+            retry = {}
+            for fut in as_completed(futures):
+                start, size = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception:
+                    service.report_failure()
+                    fixtureIDs = [match.id for match in matchesToSim[start:start + size]]
+
+                    if retried or size == 1:
+                        _logger.exception("Match worker raised an exception, matches %s are left unplayed", ", ".join(fixtureIDs))
+                        continue
+
+                    # the whole chunk failed (e.g. a worker died): its matches are simulated again one at a time
+                    _logger.exception("Match worker raised an exception, simulating matches %s again one at a time", ", ".join(fixtureIDs))
+                    retry.update((i, 1) for i in range(start, start + size))
+                    continue
 
-                            if not match.league_id in teams:
-                                teams[match.league_id] = []
+                # keyed by the position of the chunk's first fixture, so sorting the keys gives the fixture order
+                chunkPayloads[start] = result["payload"]
+                handle_result(result)
 
-                            teams[match.league_id].append(match.home_id)
-                            teams[match.league_id].append(match.away_id)
+            if retry:
+                # a worker that died breaks the whole pool, in which case it is restarted
+                ex = service.get_executor(db_path)
+                retry = {ex.submit(_simulate_matches, [bundles[matchesToSim[i].id]], context): (i, size) for i, size in retry.items()}
 
-                            worker_payloads.append(worker_payload)
+            futures = retry
+            retried = True
 
-                            if progress_callback:
-                                progress_callback()
+        # Put the results back in fixture order, so the payload does not depend on which worker finished first
+        matches = [match for match in matchesToSim if match.id in happinessByID]
 
-                    except Exception:
-                        _logger.exception("Match worker raised an exception")
-                        traceback.print_exc()
+        teams = {}
+        for match in matches:
+            if not match.league_id in teams:
+                teams[match.league_id] = []
 
-        # Remove worker DB copies
-        for f in glob.glob(f"data/{base_name}_copy_*.db"):
-            try:
-                os.remove(f)
-                _logger.debug("Removed worker DB copy %s", f)
-            except Exception:
-                _logger.warning("Could not remove DB copy %s", f)
+            teams[match.league_id].append(match.home_id)
+            teams[match.league_id].append(match.away_id)
 
         sim_end = time.perf_counter()
         elapsed = sim_end - sim_start
         _logger.info("Match simulation completed in %.3f seconds for %d matches", elapsed, total_to_sim)
-        print(f"Match simulation completed in {elapsed:.3f} seconds for {total_to_sim} matches")
 
         # After all batches complete, aggregate pooled payloads (no computation, just concatenation)
         pooled = {
@@ -1534,23 +1547,22 @@ def run_match_simulation(interval, currDate, exclude_leagues = [], progress_call
             "form_to_check": []
         }
 
-        for p in worker_payloads:
-            for k in pooled.keys():
-                val = p.get(k)
-                if not val:
-                    continue
-                # If list-like, extend; otherwise set (defensive)
-                if isinstance(p[k], list):
-                    pooled[k].extend(p[k])
-                else:
-                    # unexpected type: append the value
-                    pooled[k].append(p[k])
+        # Joining the chunks in the order of their first fixture keeps the rows in fixture order
+        compact = CompactPayload.concat([chunkPayloads[i] for i in sorted(chunkPayloads)])
+        for k, rows in compact.toPayload().items():
+            if k in pooled and k not in ("players_to_update", "emails_to_send"):
+                pooled[k].extend(rows)
+
+        for match in matches:
+            pooled["players_to_update"].extend(happinessByID[match.id]["players_to_update"])
+            pooled["emails_to_send"].extend(happinessByID[match.id]["emails_to_send"])
 
         # attach to the MainMenu instance for further processing by caller
         pooled_payload = pooled
 
-        _logger.debug("Aggregated pooled payload from %d workers", len(worker_payloads))
-        process_payload(pooled_payload)
+        _logger.debug("Aggregated pooled payload from %d chunks", len(chunkPayloads))
+        # raises if the payload could not be saved: the updates below would not see the results, so they are skipped
+        process_payload(pooled_payload, context)
         _logger.debug("Processed pooled payload")
 
         leagueIDs = list({match.league_id for match in matches})
@@ -1562,11 +1574,13 @@ def run_match_simulation(interval, currDate, exclude_leagues = [], progress_call
                 for team in LeagueTeams.get_teams_by_league(id_):
                     TeamHistory.add_team(matchday, team.team_id, team.position, team.points)
 
-                if id_ == managerLeague.league_id:
-                    _, email = League.team_of_the_week(id_, matchday, team = managerTeam.id)
- 
+                if id_ == managerLeagueID:
+                    # saved, so the news and emails read it back instead of working it out again (the other leagues'
+                    # are saved the first time they are read)
+                    _, email = League.team_of_the_week(id_, matchday, team = managerTeamID, cache = True)
+
                     if email:
-                        Emails.add_email("team_of_the_week", matchday, None, None, managerLeague.league_id, (currDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0))
+                        Emails.add_email("team_of_the_week", matchday, None, None, managerLeagueID, (currDate + timedelta(days = 1)).replace(hour = 8, minute = 0, second = 0, microsecond = 0))
 
                 # Check for lead changes, relegation changes here
                 if matchday > 20:
@@ -1579,12 +1593,13 @@ def run_match_simulation(interval, currDate, exclude_leagues = [], progress_call
         PlayerBans.reduce_suspensions_for_teams(teams)
         _logger.debug("Completed suspension reductions for teams")
 
-def _init_worker(base_name):
+def _init_worker(db_path):
     """
-    Initialize a worker process with its own database copy.
+    Initialize a simulation worker process with a read-only connection to the save database. No copy is made: the
+    workers only read, so they all share the same file.
     
     Args:
-        base_name (str): The base name of the database to copy.
+        db_path (str): The path of the save database file.
     """
     
     from data.database import DatabaseManager
@@ -1593,66 +1608,110 @@ def _init_worker(base_name):
 
     _logger = logging.getLogger(__name__)
 
-    global _worker_dbm, _worker_base_name, _worker_db_copy_path
-    _worker_base_name = base_name
-    _worker_dbm = DatabaseManager()
-    _worker_dbm.set_database(base_name)
-
-    # Each worker gets its own database copy
-    pid = os.getpid()
-    copy_path = f"data/{base_name}_copy_{pid}.db"
-    _worker_dbm.copy_path = copy_path
+    global _worker_dbm
 
     try:
-        _worker_dbm.start_copy()
+        _worker_dbm = DatabaseManager()
+        _worker_dbm.set_read_only(db_path)
     except Exception:
-        _logger.exception("Failed to start DB copy for worker %d", pid)
+        _logger.exception("Failed to open %s read-only for worker %d", db_path, os.getpid())
         _worker_dbm = None
-        _worker_db_copy_path = None
         return
 
-    _worker_db_copy_path = copy_path
-    _logger.debug("Worker %d ready with DB copy %s", pid, copy_path)
+    _logger.debug("Worker %d ready with read-only DB %s", os.getpid(), db_path)
 
-def _simulate_match(gameID):
+def _simulate_match(bundle, context):
     """
-    Simulate a single match given its game ID.
+    Simulate a single match from its bundle (no database reads).
     
     Args:
-        gameID (int): The ID of the match to simulate.
+        bundle (MatchBundle): Everything the match reads from the save.
+        context (SimulationContext): The save-wide values of the simulation run.
     """
     
-    global _worker_dbm, _worker_db_copy_path
     from utils.match import Match
-    from data.database import Matches
-    import logging, gc
+    import gc
 
-    _logger = logging.getLogger(__name__)
+    match = Match(bundle, auto=True, context=context)
+    payload = match.simulate()
+    gc.collect()
 
-    if _worker_dbm is None:
-        _logger.error("Worker database manager not initialized.")
-        return {"id": getattr(gameID, "id", None), "score": None, "payload": None}
+    return match, payload
 
-    game = Matches.get_match_by_id(gameID)
-    match = Match(game, auto=True)
-    match.startGame()
-    match.join()
+def _simulate_matches(bundles, context):
+    """
+    Simulate a chunk of matches one after the other from their bundles. A match that raises an exception is left out
+    of the results (its id is in "failed") instead of failing the whole chunk.
+    
+    Args:
+        bundles (list): The MatchBundles of the matches to simulate.
+        context (SimulationContext): The save-wide values of the simulation run.
+    """
+
+    import logging
+
+    simulated, matches, payloads, failed = [], [], [], []
+    for bundle in bundles:
+        try:
+            match, payload = _simulate_match(bundle, context)
+        except Exception:
+            logging.getLogger(__name__).exception("Could not simulate match %s", bundle.id)
+            failed.append(bundle.id)
+            continue
+
+        simulated.append(bundle)
+        matches.append(match)
+        payloads.append(payload)
+
+    return _pack_results(simulated, matches, payloads, failed)
+
+def _simulate_match_batch(bundles, context):
+    """
+    Simulate a set of matches in lockstep (MatchBatch) from their bundles (no database reads). If the batch raises an
+    exception, the matches are simulated again one at a time so only the failing ones are lost.
+    
+    Args:
+        bundles (list): The MatchBundles of the matches to simulate.
+        context (SimulationContext): The save-wide values of the simulation run.
+    """
+    
+    from utils.matchBatch import MatchBatch
+    import gc, logging
 
-    # cleanup session for next match (but not engine or db copy)
     try:
-        if _worker_dbm.scoped_session:
-            _worker_dbm.scoped_session.remove()
+        batch = MatchBatch(bundles, context)
+        payloads = batch.run()
     except Exception:
-        pass
+        logging.getLogger(__name__).exception("Match batch failed, simulating its %d matches one at a time", len(bundles))
+        batch = None
+
     gc.collect()
 
-    result = {
-        "id": getattr(game, "id", None),
-        "score": match.score,
-        "payload": getattr(match, "payload", None),
-    }
+    if batch is None:
+        return _simulate_matches(bundles, context)
 
-    return result
+    return _pack_results(bundles, batch.matches, payloads)
+
+def _pack_results(bundles, matches, payloads, failed = []):
+    """
+    Build the result of a simulation chunk sent back to the main process: the id and score of each match, the
+    payloads of all of them packed into one CompactPayload (much smaller to send than the lists of tuples), and the
+    ids of the matches that could not be simulated.
+    
+    Args:
+        bundles (list): The MatchBundles of the simulated matches.
+        matches (list): The simulated Matches, in the same order.
+        payloads (list): The payloads of the matches, in the same order.
+        failed (list, optional): The IDs of the matches of the chunk that raised an exception. Defaults to [].
+    """
+
+    from utils.compactPayload import CompactPayload
+
+    return {
+        "matches": [{"id": bundle.id, "score": match.score, "simulated": bool(payload)} for bundle, match, payload in zip(bundles, matches, payloads)],
+        "payload": CompactPayload.fromPayloads([payload for payload in payloads if payload]),
+        "failed": list(failed),
+    }
 
 def get_planet_percentage(depth):
     """
@@ -1692,30 +1751,24 @@ def add_file_with_progress(zipf, file_path, arcname, progress_callback=None):
                 if progress_callback:
                     progress_callback(read_bytes, file_size)
 
-def get_best_player_for_position(matches, position):
+def get_best_players_for_positions(lineups, positions):
     """
-    Finds the best player for a given position from a list of matches.
-    """
-
-    from data.database import TeamLineup
+    Finds the best rated player of each position from the lineup entries of a set of matches, in one pass. A player
+    counts for the position they started in, or for the position they ended in if they came off the bench.
 
-    bestRating = -1
-    bestPlayerID = None
+    Args:
+        lineups (iterable): (player ID, start position, end position, rating) rows.
+        positions (list): The positions to fill.
+    """
 
-    for match in matches:
-        lineup = TeamLineup.get_lineup_by_match(match.id)
+    best = {position: [None, -1] for position in positions}
 
-        for entry in lineup:
-            if entry.start_position == position:
-                if entry.rating and entry.rating > bestRating:
-                    bestRating = entry.rating
-                    bestPlayerID = entry.player_id
-            elif not entry.start_position and entry.end_position == position:
-                if entry.rating and entry.rating > bestRating:
-                    bestRating = entry.rating
-                    bestPlayerID = entry.player_id
+    for playerID, startPosition, endPosition, rating in lineups:
+        position = startPosition if startPosition else endPosition
+        if position in best and rating and rating > best[position][1]:
+            best[position] = [playerID, rating]
 
-    return bestPlayerID, bestRating 
+    return best
 
 def generate_news_title(news_type, **kwargs):
     """
@@ -1779,4 +1832,52 @@ def get_overthrow_threshold(league_id):
     league_spread = max(avg_ca) - min(avg_ca)
     overthrow_threshold = 0.55 * league_spread
 
-    return overthrow_threshold
\ No newline at end of file
+    return overthrow_threshold
+
+def split_intervals(start_date, end_date, cuts):
+    """
+    Split a date range into consecutive intervals, cutting it at the given dates (those outside the range are ignored).
+
+    Args:
+        start_date (datetime): The start of the range.
+        end_date (datetime): The end of the range.
+        cuts (iterable): The dates to cut the range at.
+    """
+
+    boundaries = sorted({start_date, end_date} | {cut for cut in cuts if start_date <= cut <= end_date})
+    return list(zip(boundaries, boundaries[1:]))
+
+def walk_team_events(intervals, events):
+    """
+    Walk the intervals and a team's events together: each event is carried out in the first interval it overlaps, and
+    the intervals it still covers after that are not rest time for the team.
+
+    Args:
+        intervals (list): The consecutive (start, end) intervals, as returned by split_intervals.
+        events (list): The team's calendar events in the range.
+
+    Returns:
+        tuple: The indices of the intervals the team rests in, and the events carried out in each interval by index.
+    """
+
+    pending = sorted(events, key = lambda event: event.start_date)
+    nextEvent = 0
+    busyUntil = None
+
+    resting, carriedOut = [], {}
+    for i, (start, end) in enumerate(intervals):
+        intervalEvents = []
+        while nextEvent < len(pending) and pending[nextEvent].start_date < end:
+            intervalEvents.append(pending[nextEvent])
+            nextEvent += 1
+
+        if len(intervalEvents) == 0:
+            if busyUntil is None or busyUntil <= start:
+                resting.append(i)
+            continue
+
+        carriedOut[i] = intervalEvents
+        for event in intervalEvents:
+            busyUntil = event.end_date if busyUntil is None else max(busyUntil, event.end_date)
+
+    return resting, carriedOut